@@ -6469,114 +6469,207 @@ function updateDate() {
     }
 }
 
-// Main function to load asanas from XML
-async function loadAsanasFromXML() {
+// Version of asanas.catalog.json this code understands
+const ASANA_CATALOG_VERSION = 1;
+
+// Tag -> pose and difficulty -> pose indexes from the compiled catalog, as positions in `asanas`.
+// Catalog poses come first in `asanas`; poses appended after them (custom poses) are not indexed.
+let asanaLookups = null;
+
+// Poses with a tag containing `filter` (case-insensitive), in list order
+function asanasWithTag(filter) {
+    const needle = filter.toLowerCase();
+    const hasTag = asana => asana.tags && asana.tags.some(tag => tag.toLowerCase().includes(needle));
+    if (!asanaLookups) return asanas.filter(hasTag);
+    
+    const positions = new Set();
+    Object.keys(asanaLookups.tag).forEach(tag => {
+        if (tag.toLowerCase().includes(needle)) asanaLookups.tag[tag].forEach(position => positions.add(position));
+    });
+    return [...positions].sort((a, b) => a - b).map(position => asanas[position])
+        .concat(asanas.slice(asanaLookups.count).filter(hasTag));
+}
+
+// Poses whose difficulty is one of `levels`, in list order
+function asanasWithDifficulty(levels) {
+    const hasLevel = asana => levels.includes(asana.difficulty);
+    if (!asanaLookups) return asanas.filter(hasLevel);
+    
+    const positions = levels.flatMap(level => asanaLookups.difficulty[level] || []);
+    return positions.sort((a, b) => a - b).map(position => asanas[position])
+        .concat(asanas.slice(asanaLookups.count).filter(hasLevel));
+}
+
+// Load asanas from the compiled catalog generated by scripts/asana_catalog.py.
+// Returns null when the catalog is missing or unsupported so the caller can fall back to the XML.
+async function loadAsanasFromCatalog() {
     try {
-        console.log("Loading asanas from XML...");
-        
-        // Fetch the XML file
-        const response = await fetch('asanas.xml');
-        const xmlText = await response.text();
+        const response = await fetch('asanas.catalog.json');
+        if (!response.ok) return null;
         
-        // Parse XML
-        const parser = new DOMParser();
-        const xmlDoc = parser.parseFromString(xmlText, 'text/xml');
+        const catalog = await response.json();
+        if (catalog.version !== ASANA_CATALOG_VERSION) {
+            console.warn(`Unsupported asana catalog version ${catalog.version}, falling back to XML`);
+            return null;
+        }
         
-        // Get all asana elements
-        const asanaElements = xmlDoc.getElementsByTagName('asana');
-        console.log(`Found ${asanaElements.length} asanas in XML`);
+        // Rows are positional; sides, difficulties, chakras and tags are indexes into shared string tables
+        const { sides, difficulties, chakras, tags } = catalog.strings;
+        const field = {};
+        catalog.fields.forEach((name, index) => { field[name] = index; });
         
-        // Clear existing asanas
-        asanas = [];
+        const loaded = catalog.asanas.map(row => {
+            const asana = new YogaAsana(
+                row[field.name],
+                sides[row[field.side]],
+                row[field.image],
+                row[field.description],
+                difficulties[row[field.difficulty]],
+                row[field.tags].map(index => tags[index]),
+                row[field.transitions],
+                row[field.sanskrit],
+                row[field.chakras].map(index => chakras[index]),
+                row[field.breath]
+            );
+            asana.aliases = row[field.aliases];
+            asana.cues = row[field.cues];
+            asana.history = row[field.history];
+            asana.difficultyRating = row[field.rating];
+            return asana;
+        });
         
-        // Process each asana
-        for (let i = 0; i < asanaElements.length; i++) {
-            const asanaElem = asanaElements[i];
-            
-            // Extract basic info
-            const name = asanaElem.getElementsByTagName('n')[0]?.textContent || 'Unknown Pose';
-            const sanskrit = asanaElem.getElementsByTagName('sanskrit')[0]?.textContent || '';
-            const side = asanaElem.getElementsByTagName('side')[0]?.textContent || 'Center';
-            const image = asanaElem.getElementsByTagName('image')[0]?.textContent || 'images/webp/default-pose.webp';
-            const description = asanaElem.getElementsByTagName('description')[0]?.textContent || '';
-            const difficulty = asanaElem.getElementsByTagName('difficulty')[0]?.textContent || 'Beginner';
-            const breathCue = asanaElem.getElementsByTagName('breath')[0]?.textContent || '-';
-            const rating = parseInt(asanaElem.getElementsByTagName('rating')[0]?.textContent || '0');
-            const history = asanaElem.getElementsByTagName('history')[0]?.textContent || '';
-
-            // Extract chakras (support both <chakras><chakra> and single <chakra>)
-            const chakrasWrapper = asanaElem.getElementsByTagName('chakras')[0];
-            const chakras = [];
-            if (chakrasWrapper) {
-                const chakraElems = chakrasWrapper.getElementsByTagName('chakra');
-                for (let j = 0; j < chakraElems.length; j++) {
-                    chakras.push(chakraElems[j].textContent);
-                }
-            } else {
-                const singleChakra = asanaElem.getElementsByTagName('chakra')[0]?.textContent;
-                if (singleChakra) chakras.push(singleChakra);
-            }
-
-            // Extract tags
-            const tagElements = asanaElem.getElementsByTagName('tag');
-            const tags = [];
-            for (let j = 0; j < tagElements.length; j++) {
-                tags.push(tagElements[j].textContent);
-            }
-
-            // Extract transitions
-            const transitionElements = asanaElem.getElementsByTagName('transition');
-            const transitions = [];
-            for (let j = 0; j < transitionElements.length; j++) {
-                transitions.push(transitionElements[j].textContent);
-            }
+        if (catalog.index) {
+            asanaLookups = { count: loaded.length, tag: catalog.index.tag, difficulty: catalog.index.difficulty };
+        }
+        return loaded;
+    } catch (error) {
+        console.warn('Could not load asana catalog, falling back to XML:', error);
+        return null;
+    }
+}
 
-            // Extract aliases
-            const aliasElements = asanaElem.getElementsByTagName('alias');
-            const aliases = [];
-            for (let j = 0; j < aliasElements.length; j++) {
-                aliases.push(aliasElements[j].textContent);
-            }
+// Fetch and parse asanas.xml into YogaAsana objects (used when the compiled catalog is unavailable)
+async function parseAsanasXML() {
+    // Fetch the XML file
+    const response = await fetch('asanas.xml');
+    const xmlText = await response.text();
+    
+    // Parse XML
+    const parser = new DOMParser();
+    const xmlDoc = parser.parseFromString(xmlText, 'text/xml');
+    
+    // Get all asana elements
+    const asanaElements = xmlDoc.getElementsByTagName('asana');
+    console.log(`Found ${asanaElements.length} asanas in XML`);
+    
+    const parsed = [];
+    
+    // Process each asana
+    for (let i = 0; i < asanaElements.length; i++) {
+        const asanaElem = asanaElements[i];
+        
+        // Extract basic info
+        const name = asanaElem.getElementsByTagName('n')[0]?.textContent || 'Unknown Pose';
+        const sanskrit = asanaElem.getElementsByTagName('sanskrit')[0]?.textContent || '';
+        const side = asanaElem.getElementsByTagName('side')[0]?.textContent || 'Center';
+        const image = asanaElem.getElementsByTagName('image')[0]?.textContent || 'images/webp/default-pose.webp';
+        const description = asanaElem.getElementsByTagName('description')[0]?.textContent || '';
+        const difficulty = asanaElem.getElementsByTagName('difficulty')[0]?.textContent || 'Beginner';
+        const breathCue = asanaElem.getElementsByTagName('breath')[0]?.textContent || '-';
+        const rating = parseInt(asanaElem.getElementsByTagName('rating')[0]?.textContent || '0');
+        const history = asanaElem.getElementsByTagName('history')[0]?.textContent || '';
 
-            // Extract cues
-            const cueElements = asanaElem.getElementsByTagName('cue');
-            const cues = [];
-            for (let j = 0; j < cueElements.length; j++) {
-                cues.push(cueElements[j].textContent);
+        // Extract chakras (support both <chakras><chakra> and single <chakra>)
+        const chakrasWrapper = asanaElem.getElementsByTagName('chakras')[0];
+        const chakras = [];
+        if (chakrasWrapper) {
+            const chakraElems = chakrasWrapper.getElementsByTagName('chakra');
+            for (let j = 0; j < chakraElems.length; j++) {
+                chakras.push(chakraElems[j].textContent);
             }
+        } else {
+            const singleChakra = asanaElem.getElementsByTagName('chakra')[0]?.textContent;
+            if (singleChakra) chakras.push(singleChakra);
+        }
+
+        // Extract tags
+        const tagElements = asanaElem.getElementsByTagName('tag');
+        const tags = [];
+        for (let j = 0; j < tagElements.length; j++) {
+            tags.push(tagElements[j].textContent);
+        }
+
+        // Extract transitions
+        const transitionElements = asanaElem.getElementsByTagName('transition');
+        const transitions = [];
+        for (let j = 0; j < transitionElements.length; j++) {
+            transitions.push(transitionElements[j].textContent);
+        }
+
+        // Extract aliases
+        const aliasElements = asanaElem.getElementsByTagName('alias');
+        const aliases = [];
+        for (let j = 0; j < aliasElements.length; j++) {
+            aliases.push(aliasElements[j].textContent);
+        }
+
+        // Extract cues
+        const cueElements = asanaElem.getElementsByTagName('cue');
+        const cues = [];
+        for (let j = 0; j < cueElements.length; j++) {
+            cues.push(cueElements[j].textContent);
+        }
+
+        // Create asana object
+        const asana = new YogaAsana(
+            name,
+            side,
+            image,
+            description,
+            difficulty,
+            tags,
+            transitions,
+            sanskrit,
+            chakras,
+            breathCue
+        );
+        asana.aliases = aliases;
+        asana.cues = cues;
+        asana.history = history;
+        asana.difficultyRating = rating;
+        
+        // Check for duplicates before adding
+        const isDuplicate = parsed.some(existingAsana => 
+            existingAsana.name === asana.name && existingAsana.side === asana.side
+        );
+        
+        if (!isDuplicate) {
+            parsed.push(asana);
+        } else {
+            console.warn(`Duplicate pose detected and skipped: ${asana.name} (${asana.side})`);
+        }
+    }
+    
+    return parsed;
+}
 
-            // Create asana object
-            const asana = new YogaAsana(
-                name,
-                side,
-                image,
-                description,
-                difficulty,
-                tags,
-                transitions,
-                sanskrit,
-                chakras,
-                breathCue
-            );
-            asana.aliases = aliases;
-            asana.cues = cues;
-            asana.history = history;
-            asana.difficultyRating = rating;
-            
-            // Check for duplicates before adding
-            const isDuplicate = asanas.some(existingAsana => 
-                existingAsana.name === asana.name && existingAsana.side === asana.side
-            );
-            
-            if (!isDuplicate) {
-                asanas.push(asana);
-            } else {
-                console.warn(`Duplicate pose detected and skipped: ${asana.name} (${asana.side})`);
-            }
+// Main function to load asanas: the compiled catalog when available, otherwise asanas.xml
+async function loadAsanasFromXML() {
+    try {
+        console.log("Loading asanas...");
+        asanaLookups = null;
+        
+        // Prefer the precompiled catalog (scripts/asana_catalog.py) so startup skips XML parsing.
+        // Run `python scripts/asana_catalog.py --verify` to check it matches asanas.xml.
+        const catalogAsanas = await loadAsanasFromCatalog();
+        if (catalogAsanas) {
+            asanas = catalogAsanas;
+            console.log('Successfully loaded asanas from catalog:', asanas.length);
+        } else {
+            asanas = await parseAsanasXML();
+            console.log('Successfully loaded asanas from XML:', asanas.length);
         }
         
-        console.log('Successfully loaded asanas from XML:', asanas.length);
-        
         // Load custom poses from localStorage and add them to the asanas array
         const customPoses = getCustomPoses();
         let customPosesAdded = 0;
@@ -6601,6 +6694,7 @@ async function loadAsanasFromXML() {
     } catch (error) {
         console.error('Error loading asanas from XML:', error);
         // Fallback to default asanas if XML loading fails
+        asanaLookups = null;
         asanas = [
             new YogaAsana(
                 "Downward Facing Dog",
@@ -6684,14 +6778,7 @@ document.addEventListener('DOMContentLoaded', function() {
             currentSearch = newSearch;
             
             // Get new filtered results
-            let newResults = [...asanas];
-            if (currentFilter !== 'all') {
-                newResults = newResults.filter(asana => {
-                    return asana.tags && asana.tags.some(tag => 
-                        tag.toLowerCase().includes(currentFilter.toLowerCase())
-                    );
-                });
-            }
+            let newResults = currentFilter !== 'all' ? asanasWithTag(currentFilter) : [...asanas];
             if (newSearch) {
                 newResults = newResults.filter(asana => {
                     const nameMatch = asana.name.toLowerCase().includes(newSearch);
@@ -6776,11 +6863,7 @@ function populateAsanaList() {
             return chakras.some(c => c === chakraName);
         });
     } else if (currentFilter !== 'all') {
-        posesList = posesList.filter(asana => {
-            return asana.tags && asana.tags.some(tag =>
-                tag.toLowerCase().includes(currentFilter.toLowerCase())
-            );
-        });
+        posesList = asanasWithTag(currentFilter);
     }
     
     // Apply search filter
@@ -14741,7 +14824,7 @@ function generateFlow() {
     };
     const allowedDiffs = difficultyLevels[genLevel] || ['Beginner'];
 
-    let candidates = asanas.filter(a => allowedDiffs.includes(a.difficulty));
+    let candidates = asanasWithDifficulty(allowedDiffs);
 
     // Filter by focus tags if selected
     if (genFocusTags.length > 0) {
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Asana Catalog Compiler
+
+Compiles asanas.xml into asanas.catalog.json, a minified and versioned
+catalog that main.js loads instead of parsing the XML in the browser. The
+XML is read with a streaming parser, validated, and repeated strings (sides,
+difficulties, chakras, tags) are interned into lookup tables referenced by
+index. The catalog also carries precomputed tag -> pose and
+difficulty -> pose indexes, which main.js uses for its filters. The catalog
+records the SHA-256 of the XML it was built from, and --verify fails when
+asanas.xml has been edited since (or the indexes do not match the poses), so
+a build or CI step can catch a stale catalog before main.js serves outdated
+poses.
+
+The module doubles as the shared pose loader for the other tools in this
+directory (load_asanas accepts either the XML or a compiled catalog).
+
+Requirements:
+- Python 3 standard library only
+
+Usage:
+python asana_catalog.py                    # ../asanas.xml -> ../asanas.catalog.json
+python asana_catalog.py --check            # validate only
+python asana_catalog.py --verify           # fail if asanas.catalog.json is out of date
+python asana_catalog.py --xml custom.xml --output custom.catalog.json
+"""
+
+import os
+import sys
+import json
+import hashlib
+import argparse
+import xml.etree.ElementTree as ET
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_XML = os.path.join(SCRIPT_DIR, '..', 'asanas.xml')
+DEFAULT_CATALOG = os.path.join(SCRIPT_DIR, '..', 'asanas.catalog.json')
+
+CATALOG_VERSION = 1
+
+# Field order of each row in the compiled catalog; main.js decodes by position
+FIELDS = ['name', 'sanskrit', 'side', 'image', 'description', 'difficulty', 'rating',
+          'chakras', 'breath', 'tags', 'transitions', 'aliases', 'cues', 'history']
+
+# Fields stored as indexes into a shared string table
+INTERNED_FIELDS = {'side': 'sides', 'difficulty': 'difficulties'}
+INTERNED_LIST_FIELDS = {'chakras': 'chakras', 'tags': 'tags'}
+
+DIFFICULTIES = ['Beginner', 'Intermediate', 'Advanced']
+SIDES = ['Center', 'Front', 'Left', 'Right', 'Back']
+CHAKRAS = ['Root', 'Sacral', 'Solar Plexus', 'Heart', 'Throat', 'Third Eye', 'Crown']
+
+# Defaults match the fallbacks main.js applies when an element is missing
+DEFAULTS = {
+    'sanskrit': '',
+    'side': 'Center',
+    'image': 'images/webp/default-pose.webp',
+    'description': '',
+    'difficulty': 'Beginner',
+    'rating': 0,
+    'breath': '-',
+    'history': '',
+}
+
+LIST_ELEMENTS = {
+    'chakras': ('chakras', 'chakra'),
+    'tags': ('tags', 'tag'),
+    'transitions': ('transitions', 'transition'),
+    'aliases': ('aliases', 'alias'),
+    'cues': ('cues', 'cue'),
+}
+
+# Short, highly repeated values worth sharing between pose records in memory
+_INTERN_KEYS = {'side', 'difficulty', 'breath', 'chakras', 'tags', 'transitions'}
+
+
+def _text(element):
+    return (element.text or '').strip() if element is not None else ''
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else [sys.intern(item) for item in value]
+
+
+def iter_asanas(xml_path):
+    """
+    Stream pose records out of asanas.xml.
+    
+    Each <asana> element is converted and then cleared, so memory stays flat
+    however large the catalog grows.
+    
+    Args:
+        xml_path (str): Path to the XML file
+    
+    Yields:
+        dict: Pose record with the keys in FIELDS ('name' comes from <n>)
+    
+    Raises:
+        xml.etree.ElementTree.ParseError: If the XML is malformed
+    """
+    context = ET.iterparse(xml_path, events=('start', 'end'))
+    _, root = next(context)
+    
+    for event, element in context:
+        if event != 'end' or element.tag != 'asana':
+            continue
+        
+        asana = {'name': _text(element.find('n'))}
+        for field in ('sanskrit', 'side', 'image', 'description', 'difficulty', 'breath', 'history'):
+            asana[field] = _text(element.find(field)) or DEFAULTS[field]
+        
+        rating = _text(element.find('rating'))
+        asana['rating'] = rating if rating else DEFAULTS['rating']
+        
+        for field, (wrapper, item) in LIST_ELEMENTS.items():
+            container = element.find(wrapper)
+            items = container.findall(item) if container is not None else element.findall(item)
+            asana[field] = [_text(child) for child in items if _text(child)]
+        
+        for key in _INTERN_KEYS:
+            asana[key] = _intern(asana[key])
+        
+        yield asana
+        element.clear()
+        root.clear()  # Drop references from the root to finished elements
+
+
+def validate_asanas(asanas, base_dir=None):
+    """
+    Validate pose records and drop the ones the app would reject.
+    
+    Args:
+        asanas (iterable): Records from iter_asanas
+        base_dir (str): Directory image paths are relative to, to check they exist
+    
+    Returns:
+        tuple: (valid records, list of error strings, list of warning strings)
+    """
+    valid = []
+    errors = []
+    warnings = []
+    seen = set()
+    
+    for index, asana in enumerate(asanas, 1):
+        label = f"asana #{index} ({asana['name'] or 'unnamed'})"
+        
+        if not asana['name']:
+            errors.append(f"{label}: missing <n> (pose name)")
+            continue
+        if asana['difficulty'] not in DIFFICULTIES:
+            errors.append(f"{label}: unknown difficulty '{asana['difficulty']}' (expected {', '.join(DIFFICULTIES)})")
+            continue
+        try:
+            asana['rating'] = int(asana['rating'])
+        except (TypeError, ValueError):
+            errors.append(f"{label}: rating '{asana['rating']}' is not an integer")
+            continue
+        
+        if asana['side'] not in SIDES:
+            warnings.append(f"{label}: unusual side '{asana['side']}'")
+        for chakra in asana['chakras']:
+            if chakra not in CHAKRAS:
+                warnings.append(f"{label}: unknown chakra '{chakra}'")
+        if base_dir is not None and not os.path.exists(os.path.join(base_dir, asana['image'])):
+            warnings.append(f"{label}: image not found: {asana['image']}")
+        
+        key = (asana['name'], asana['side'])
+        if key in seen:
+            warnings.append(f"{label}: duplicate of an earlier pose with side '{asana['side']}', skipped")
+            continue
+        seen.add(key)
+        valid.append(asana)
+    
+    names = {asana['name'] for asana in valid}
+    for asana in valid:
+        for transition in asana['transitions']:
+            if transition not in names:
+                warnings.append(f"{asana['name']}: transition to unknown pose '{transition}'")
+    
+    return valid, errors, warnings
+
+
+def build_index(asanas):
+    """
+    Build the tag -> pose and difficulty -> pose lookups stored in the catalog.
+    
+    Returns:
+        dict: {'tag': {tag: [pose index, ...]}, 'difficulty': {difficulty: [pose index, ...]}}
+    """
+    by_tag = {}
+    by_difficulty = {}
+    for pose_index, asana in enumerate(asanas):
+        for tag in asana['tags']:
+            by_tag.setdefault(tag, []).append(pose_index)
+        by_difficulty.setdefault(asana['difficulty'], []).append(pose_index)
+    return {'tag': dict(sorted(by_tag.items())), 'difficulty': by_difficulty}
+
+
+def compile_catalog(asanas, source_sha256=None):
+    """
+    Build the compact catalog structure.
+    
+    Args:
+        asanas (list): Validated records
+        source_sha256 (str): Hash of the source XML, recorded for staleness checks
+    
+    Returns:
+        dict: Catalog ready to be serialized
+    """
+    tables = {
+        'sides': sorted({asana['side'] for asana in asanas}),
+        'difficulties': [level for level in DIFFICULTIES if any(asana['difficulty'] == level for asana in asanas)],
+        'chakras': [chakra for chakra in CHAKRAS if any(chakra in asana['chakras'] for asana in asanas)],
+        'tags': sorted({tag for asana in asanas for tag in asana['tags']}),
+    }
+    tables['chakras'] += sorted({chakra for asana in asanas for chakra in asana['chakras']} - set(tables['chakras']))
+    positions = {name: {value: index for index, value in enumerate(values)} for name, values in tables.items()}
+    
+    rows = []
+    for asana in asanas:
+        row = []
+        for field in FIELDS:
+            value = asana[field]
+            if field in INTERNED_FIELDS:
+                value = positions[INTERNED_FIELDS[field]][value]
+            elif field in INTERNED_LIST_FIELDS:
+                value = [positions[INTERNED_LIST_FIELDS[field]][item] for item in value]
+            row.append(value)
+        rows.append(row)
+    
+    return {
+        'version': CATALOG_VERSION,
+        'source_sha256': source_sha256,
+        'count': len(rows),
+        'fields': FIELDS,
+        'strings': tables,
+        'asanas': rows,
+        'index': build_index(asanas),
+    }
+
+
+def expand_catalog(catalog):
+    """
+    Turn a compiled catalog back into pose records.
+    
+    Raises:
+        ValueError: If the catalog version is not supported
+    """
+    if catalog.get('version') != CATALOG_VERSION:
+        raise ValueError(f"Unsupported catalog version {catalog.get('version')} (expected {CATALOG_VERSION})")
+    
+    tables = catalog['strings']
+    fields = catalog['fields']
+    asanas = []
+    for row in catalog['asanas']:
+        asana = dict(zip(fields, row))
+        for field, table in INTERNED_FIELDS.items():
+            asana[field] = tables[table][asana[field]]
+        for field, table in INTERNED_LIST_FIELDS.items():
+            asana[field] = [tables[table][index] for index in asana[field]]
+        asanas.append(asana)
+    return asanas
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_catalog(catalog_path=DEFAULT_CATALOG, xml_path=DEFAULT_XML):
+    """
+    Check that a compiled catalog is current for its source XML and that
+    its tag and difficulty indexes match its poses.
+    
+    Returns:
+        list: Problems found (empty when the catalog is up to date)
+    """
+    try:
+        with open(catalog_path, 'r', encoding='utf-8') as catalog_file:
+            catalog = json.load(catalog_file)
+    except (OSError, ValueError) as e:
+        return [f"Could not read {catalog_path}: {e}"]
+    
+    problems = []
+    if catalog.get('version') != CATALOG_VERSION:
+        problems.append(f"{catalog_path} has version {catalog.get('version')}, expected {CATALOG_VERSION}")
+    if catalog.get('source_sha256') != file_sha256(xml_path):
+        problems.append(f"{catalog_path} was not built from the current {os.path.basename(xml_path)}")
+    if not problems:
+        try:
+            index = build_index(expand_catalog(catalog))
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return [f"Could not read the poses in {catalog_path}: {e}"]
+        for lookup in ('tag', 'difficulty'):
+            if (catalog.get('index') or {}).get(lookup) != index[lookup]:
+                problems.append(f"{catalog_path} has a missing or wrong {lookup} index")
+    return problems
+
+
+def load_asanas(path=DEFAULT_XML):
+    """
+    Load validated pose records from asanas.xml or a compiled catalog.
+    
+    Args:
+        path (str): .xml source or .json catalog
+    
+    Returns:
+        list: Pose records (dicts with the keys in FIELDS)
+    """
+    if path.lower().endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as catalog_file:
+            return expand_catalog(json.load(catalog_file))
+    
+    valid, errors, _ = validate_asanas(iter_asanas(path))
+    for error in errors:
+        print(f"Warning: {error}")
+    return valid
+
+
+def write_catalog(catalog, output_path):
+    """Write a catalog as minified JSON, atomically."""
+    temp_path = output_path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as output_file:
+        json.dump(catalog, output_file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(temp_path, output_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile asanas.xml into a compact JSON catalog')
+    parser.add_argument('--xml', default=DEFAULT_XML, help='Source XML (default: asanas.xml)')
+    parser.add_argument('--output', default=DEFAULT_CATALOG,
+                       help='Catalog to write (default: asanas.catalog.json next to asanas.xml)')
+    parser.add_argument('--check', action='store_true', help='Validate only; do not write the catalog')
+    parser.add_argument('--verify', action='store_true',
+                       help='Exit with an error if the catalog is outdated, was built from a different XML '
+                            'or has wrong indexes')
+    parser.add_argument('--quiet', action='store_true', help='Do not print warnings')
+    
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.xml):
+        print(f"Error: '{args.xml}' not found.")
+        sys.exit(1)
+    
+    if args.verify:
+        problems = verify_catalog(args.output, args.xml)
+        for problem in problems:
+            print(f"Error: {problem}")
+        if problems:
+            print("Rebuild it with: python scripts/asana_catalog.py")
+            sys.exit(1)
+        print(f"{args.output} is up to date")
+        sys.exit(0)
+    
+    try:
+        asanas, errors, warnings = validate_asanas(
+            iter_asanas(args.xml), base_dir=os.path.dirname(os.path.abspath(args.xml))
+        )
+    except ET.ParseError as e:
+        print(f"Error: Could not parse {args.xml}: {e}")
+        sys.exit(1)
+    
+    if not args.quiet:
+        for warning in warnings:
+            print(f"Warning: {warning}")
+    for error in errors:
+        print(f"Error: {error}")
+    
+    print(f"Validated {len(asanas)} poses: {len(errors)} error(s), {len(warnings)} warning(s)")
+    if errors:
+        sys.exit(1)
+    if args.check:
+        sys.exit(0)
+    
+    catalog = compile_catalog(asanas, file_sha256(args.xml))
+    write_catalog(catalog, args.output)
+    print(f"Wrote {args.output} ({os.path.getsize(args.output) / 1024:.0f}KB, "
+          f"XML is {os.path.getsize(args.xml) / 1024:.0f}KB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Fuzzy Pose Search
+
+Builds a trigram inverted index over each pose's English name, Sanskrit
+name, aliases and tags, and answers ranked, typo-tolerant queries. Text is
+normalised before indexing: diacritics are stripped (Ś -> s) and common
+Sanskrit transliteration variants are folded together (sh/s, aspirated
+consonants, doubled letters outside roman numerals), so "virabadrasana"
+finds Virabhadrasana while "warrior ii" still prefers Warrior II.
+
+The index can be exported as JSON for the front end and loaded back without
+re-reading the catalog.
+
+Requirements:
+- pip install numpy
+- asana_catalog.py (same directory)
+
+Usage:
+python asana_search.py "virabadrasana"
+python asana_search.py "dog" --limit 5
+python asana_search.py --export ../asanas.search.json
+python asana_search.py --index ../asanas.search.json "pigeon"
+python asana_search.py --bench 100          # time queries on a catalog 100x larger
+python asana_search.py --check              # verify known queries rank the right pose first
+"""
+
+import re
+import sys
+import math
+import json
+import time
+import argparse
+import unicodedata
+import numpy as np
+
+from asana_catalog import DEFAULT_XML, load_asanas
+
+
+INDEX_VERSION = 3
+
+# Relative importance of a match in each field
+FIELD_WEIGHTS = {
+    'name': 1.0,
+    'sanskrit': 0.95,
+    'aliases': 0.85,
+    'tags': 0.5,
+}
+
+MIN_SCORE = 0.25
+
+# Entries must share at least this fraction of the query's trigrams to be scored
+MIN_OVERLAP = 0.4
+
+_DOUBLED_LETTERS = re.compile(r'(.)\1+')
+# i to xxxix; checked with fullmatch, so words such as "mill" or "ill" are not numerals
+_ROMAN_NUMERAL = re.compile(r'x{0,3}(ix|iv|v?i{0,3})')
+
+
+def _fold_doubled(match):
+    """Collapse doubled letters in a word, except short words and roman numerals (ii, iii, viii)."""
+    word = match.group()
+    if len(word) <= 3 or _ROMAN_NUMERAL.fullmatch(word):
+        return word
+    return _DOUBLED_LETTERS.sub(r'\1', word)
+
+
+# Applied in order after diacritics are stripped; both the index and the
+# query are folded the same way, so these only need to be consistent
+_PHONETIC_FOLDS = [
+    (re.compile(r'([bcdgkpt])h'), r'\1'),   # aspirates: bh -> b, dh -> d, kh -> k ...
+    (re.compile(r'sh'), 's'),
+    (re.compile(r'w'), 'v'),
+    (re.compile(r'ee'), 'i'),
+    (re.compile(r'oo'), 'u'),
+    (re.compile(r'[0-9a-z]+'), _fold_doubled),  # doubled letters
+]
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize(text):
+    """
+    Lowercase, strip diacritics and punctuation, and collapse whitespace.
+    
+    Args:
+        text (str): Any text
+    
+    Returns:
+        str: Normalised text ("Ūrdhva-Mukha" -> "urdhva mukha")
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(_NON_ALNUM.sub(' ', stripped.lower()).split())
+
+
+def fold(text):
+    """Normalise text and fold transliteration variants together."""
+    folded = normalize(text)
+    for pattern, replacement in _PHONETIC_FOLDS:
+        folded = pattern.sub(replacement, folded)
+    return folded
+
+
+def trigrams(folded_text):
+    """
+    Return the set of padded per-word trigrams of already folded text.
+    
+    Words are padded with a space on each side so word boundaries count
+    and even one-letter words produce a trigram.
+    """
+    grams = set()
+    for word in folded_text.split():
+        padded = f" {word} "
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex:
+    """
+    Trigram inverted index over pose names, Sanskrit names, aliases and tags.
+    
+    Every distinct (field, folded text) pair is one term, shared by all the
+    poses that use it (tags and Sanskrit names repeat a lot), and postings map
+    a trigram to the ids of the terms that contain it. A query counts shared
+    trigrams for every term at once with a numpy bincount over its postings,
+    scores terms by Dice similarity times the field weight, and ranks each
+    pose by its best term.
+    """
+    
+    def __init__(self, docs, terms, term_docs, postings):
+        """
+        Args:
+            docs (list): Pose summaries ({'name', 'sanskrit', 'side', 'image'})
+            terms (list): (field name, folded text) tuples
+            term_docs (list): Doc ids using each term
+            postings (dict): trigram -> sorted list of term ids
+        """
+        self.docs = docs
+        self.terms = terms
+        self.term_docs = term_docs
+        self.postings = {gram: np.asarray(ids, dtype=np.int32) for gram, ids in postings.items()}
+        
+        self._term_weight = np.array([FIELD_WEIGHTS.get(field, 0.5) for field, _ in terms], dtype=np.float32)
+        self._term_size = np.array([len(trigrams(text)) for _, text in terms], dtype=np.float32)
+    
+    @classmethod
+    def build(cls, asanas):
+        """
+        Index pose records from asana_catalog.
+        
+        Args:
+            asanas (list): Records with name, sanskrit, aliases and tags
+        
+        Returns:
+            SearchIndex: The index
+        """
+        docs = []
+        term_ids = {}
+        term_docs = []
+        postings = {}
+        for doc_id, asana in enumerate(asanas):
+            docs.append({
+                'name': asana['name'],
+                'sanskrit': asana['sanskrit'],
+                'side': asana['side'],
+                'image': asana['image'],
+            })
+            
+            texts = [('name', asana['name']), ('sanskrit', asana['sanskrit'])]
+            texts += [('aliases', alias) for alias in asana['aliases']]
+            texts += [('tags', tag) for tag in asana['tags']]
+            
+            for field, text in texts:
+                term = (field, fold(text))
+                if not term[1]:
+                    continue
+                term_id = term_ids.get(term)
+                if term_id is None:
+                    term_id = term_ids[term] = len(term_docs)
+                    term_docs.append([])
+                    for gram in trigrams(term[1]):
+                        postings.setdefault(gram, []).append(term_id)
+                if not term_docs[term_id] or term_docs[term_id][-1] != doc_id:
+                    term_docs[term_id].append(doc_id)
+        
+        return cls(docs, list(term_ids), term_docs, postings)
+    
+    def search(self, query, limit=10, min_score=MIN_SCORE):
+        """
+        Return the best matching poses for a query.
+        
+        Args:
+            query (str): Free text; misspellings and missing diacritics are tolerated
+            limit (int): Maximum number of results
+            min_score (float): Drop results scoring below this (0-1.5)
+        
+        Returns:
+            list: Result dicts (pose fields plus 'score', 'field' and 'matched') best first
+        """
+        folded = fold(query)
+        grams = trigrams(folded)
+        matching = sorted((self.postings[gram] for gram in grams if gram in self.postings), key=len)
+        if not matching:
+            return []
+        
+        # Query trigrams missing from the index match nothing, so too few
+        # known trigrams means no term can reach the required overlap
+        required = max(1, math.ceil(len(grams) * MIN_OVERLAP))
+        if len(matching) < required:
+            return []
+        
+        # A term appears at most once per posting, so counting its occurrences
+        # across all of them gives the exact overlap in one pass
+        overlap = np.bincount(np.concatenate(matching), minlength=len(self.terms))
+        candidates = np.flatnonzero(overlap >= required)
+        if len(candidates) == 0:
+            return []
+        hits = overlap[candidates]
+        
+        scores = (self._term_weight[candidates] * 2.0 * hits /
+                  (len(grams) + self._term_size[candidates]))
+        
+        # Re-rank the strongest terms with exact and prefix bonuses
+        shortlist_size = min(len(candidates), max(50, limit * 5))
+        shortlist = np.argpartition(-scores, shortlist_size - 1)[:shortlist_size]
+        
+        ranked_terms = []
+        for position in shortlist:
+            term_id = int(candidates[position])
+            field, text = self.terms[term_id]
+            score = float(scores[position])
+            if text == folded:
+                score += 0.5 * FIELD_WEIGHTS.get(field, 0.5)
+            elif text.startswith(folded) or f" {folded}" in f" {text}":
+                score += (0.3 if text.startswith(folded) else 0.25) * FIELD_WEIGHTS.get(field, 0.5)
+            if score >= min_score:
+                ranked_terms.append((score, term_id))
+        ranked_terms.sort(key=lambda item: (-item[0], item[1]))
+        
+        # Terms arrive best first, so the first term reaching a pose is its best match
+        results = []
+        seen = set()
+        for score, term_id in ranked_terms:
+            field, text = self.terms[term_id]
+            for doc_id in self.term_docs[term_id]:
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                results.append(dict(self.docs[doc_id], score=round(score, 4), field=field, matched=text))
+                if len(results) == limit:
+                    return results
+        return results
+    
+    def to_dict(self):
+        """Return the index as JSON-serialisable data."""
+        fields = list(FIELD_WEIGHTS)
+        return {
+            'version': INDEX_VERSION,
+            'fields': FIELD_WEIGHTS,
+            'docs': self.docs,
+            'terms': [[fields.index(field), text, docs] for (field, text), docs in zip(self.terms, self.term_docs)],
+            'postings': {gram: ids.tolist() for gram, ids in sorted(self.postings.items())},
+        }
+    
+    def save(self, path):
+        """Write the index as minified JSON."""
+        with open(path, 'w', encoding='utf-8') as index_file:
+            json.dump(self.to_dict(), index_file, ensure_ascii=False, separators=(',', ':'))
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index written by save().
+        
+        Raises:
+            ValueError: If the index version is not supported
+        """
+        with open(path, 'r', encoding='utf-8') as index_file:
+            data = json.load(index_file)
+        if data.get('version') != INDEX_VERSION:
+            raise ValueError(f"Unsupported search index version {data.get('version')} (expected {INDEX_VERSION})")
+        
+        fields = list(data['fields'])
+        terms = [(fields[field], text) for field, text, _ in data['terms']]
+        term_docs = [docs for _, _, docs in data['terms']]
+        return cls(data['docs'], terms, term_docs, data['postings'])
+
+
+def benchmark(asanas, scale, queries):
+    """Time index build and queries on the catalog replicated scale times."""
+    scaled = [dict(asana, name=f"{asana['name']} {copy}") for copy in range(scale) for asana in asanas]
+    
+    start = time.perf_counter()
+    index = SearchIndex.build(scaled)
+    print(f"Indexed {len(scaled)} poses ({len(index.terms)} terms, {len(index.postings)} trigrams) "
+          f"in {time.perf_counter() - start:.2f}s")
+    
+    for query in queries:
+        index.search(query)  # Warm up
+        runs = 200
+        start = time.perf_counter()
+        for _ in range(runs):
+            index.search(query)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"  {query!r:<28} {elapsed * 1000:.3f}ms")
+
+
+# Queries whose pose must rank strictly first (run with --check)
+RANKING_CHECKS = [
+    ('warrior i', 'Warrior I'),
+    ('warrior ii', 'Warrior II'),
+    ('warrior iii', 'Warrior III'),
+    ('virabhadrasana ii', 'Warrior II'),
+    ('virabhadrasana iii', 'Warrior III'),
+]
+
+
+def check_rankings(index, checks=RANKING_CHECKS):
+    """
+    Verify that each query ranks its expected pose first, ahead of any tie.
+    
+    Returns:
+        list: Failure messages (empty when every check passes)
+    """
+    failures = []
+    for query, expected in checks:
+        results = index.search(query, limit=2)
+        if not results or results[0]['name'] != expected:
+            found = results[0]['name'] if results else 'nothing'
+            failures.append(f"{query!r}: expected {expected!r} first, got {found!r}")
+        elif len(results) > 1 and results[1]['score'] >= results[0]['score']:
+            failures.append(f"{query!r}: {expected!r} ties with {results[1]['name']!r}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fuzzy search over the pose catalog')
+    parser.add_argument('query', nargs='*', help='Search text')
+    parser.add_argument('--source', default=DEFAULT_XML,
+                       help='asanas.xml or a compiled catalog (default: asanas.xml)')
+    parser.add_argument('--index', help='Load a previously exported index instead of the catalog')
+    parser.add_argument('--export', help='Write the index to this JSON file')
+    parser.add_argument('--limit', type=int, default=10, help='Maximum results (default: 10)')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('--bench', type=int, metavar='SCALE',
+                       help='Benchmark queries on the catalog replicated SCALE times')
+    parser.add_argument('--check', action='store_true',
+                       help='Verify that known queries rank the right pose strictly first')
+    
+    args = parser.parse_args()
+    
+    if args.bench:
+        queries = [' '.join(args.query)] if args.query else ['virabadrasana', 'downward dog', 'pigeon', 'twist', 'utkatasna']
+        benchmark(load_asanas(args.source), args.bench, queries)
+        return
+    
+    try:
+        index = SearchIndex.load(args.index) if args.index else SearchIndex.build(load_asanas(args.source))
+    except (OSError, ValueError) as e:
+        print(f"Error: Could not load index: {e}")
+        sys.exit(1)
+    
+    if args.check:
+        failures = check_rankings(index)
+        for failure in failures:
+            print(f"Error: {failure}")
+        print(f"{len(RANKING_CHECKS) - len(failures)} of {len(RANKING_CHECKS)} ranking checks passed")
+        sys.exit(1 if failures else 0)
+    
+    if args.export:
+        index.save(args.export)
+        print(f"Exported index: {len(index.docs)} poses, {len(index.postings)} trigrams -> {args.export}")
+    
+    if not args.query:
+        if not args.export:
+            parser.print_help()
+        return
+    
+    query = ' '.join(args.query)
+    results = index.search(query, limit=args.limit)
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    if not results:
+        print(f"No poses match '{query}'")
+        return
+    for rank, result in enumerate(results, 1):
+        print(f"{rank:2}. {result['name']:<40} {result['sanskrit']:<32} "
+              f"{result['score']:.3f}  ({result['field']}: {result['matched']})")
+    print(f"{len(results)} result(s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+#!/usr/bin/env python3
+"""
+Silhouette Pipeline Benchmark
+
+Times each stage of the silhouette pipeline (crop_to_subject,
+apply_silhouette_filter, create_simple_silhouette and create_silhouette)
+across option combinations, over the real images/png corpus and synthetic
+images of controlled sizes. Reports wall time, throughput in megapixels per
+second and peak memory (tracemalloc and process RSS), and writes JSON so
+runs can be compared over time. A run that fails (raises or reports
+failure) is recorded with "ok": false and its error instead of timings, and
+the benchmark exits non-zero.
+
+Requirements:
+- All dependencies from silhouette_generator.py
+
+Usage:
+python benchmark_silhouette.py --output bench.json
+python benchmark_silhouette.py --quick --compare bench.json
+python benchmark_silhouette.py --stages filter crop --sizes 1024 4096
+"""
+
+import os
+import sys
+import io
+import json
+import time
+import glob
+import platform
+import resource
+import argparse
+import itertools
+import tempfile
+import tracemalloc
+import contextlib
+import statistics
+from datetime import datetime, timezone
+from PIL import Image, ImageDraw
+import numpy as np
+
+import silhouette_generator as sg
+
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'images', 'png')
+STAGES = ['crop', 'filter', 'simple', 'auto']
+
+
+def synthetic_pose(size):
+    """
+    Draw a pose-like RGB figure (dark on white) of size x size pixels.
+    
+    The shapes include thin limbs and an enclosed gap, so the morphology and
+    smoothing stages do representative work.
+    """
+    img = Image.new('RGB', (size, size), 'white')
+    draw = ImageDraw.Draw(img)
+    s = size / 100.0
+    
+    draw.ellipse([44 * s, 8 * s, 56 * s, 20 * s], fill='black')            # head
+    draw.rectangle([45 * s, 20 * s, 55 * s, 55 * s], fill='black')          # torso
+    draw.line([50 * s, 25 * s, 20 * s, 10 * s], fill='black', width=max(1, int(3 * s)))   # arms
+    draw.line([50 * s, 25 * s, 80 * s, 10 * s], fill='black', width=max(1, int(3 * s)))
+    draw.line([50 * s, 55 * s, 30 * s, 92 * s], fill='black', width=max(1, int(4 * s)))   # legs
+    draw.line([50 * s, 55 * s, 70 * s, 92 * s], fill='black', width=max(1, int(4 * s)))
+    draw.ellipse([62 * s, 60 * s, 78 * s, 76 * s], outline='black', width=max(1, int(2 * s)))  # gap
+    return img
+
+
+def with_threshold_alpha(img, threshold=128):
+    """Return an RGBA copy whose alpha marks pixels darker than threshold (simple method)."""
+    rgba = np.array(img.convert('RGBA'))
+    rgba[:, :, 3] = np.where(np.array(img.convert('L')) < threshold, 255, 0)
+    return Image.fromarray(rgba, 'RGBA')
+
+
+def load_inputs(corpus, limit, sizes):
+    """
+    Build the benchmark inputs.
+    
+    Returns:
+        list: (name, RGB image, encoded PNG bytes) tuples
+    """
+    inputs = []
+    
+    paths = sorted(glob.glob(os.path.join(corpus, '*.png')))
+    if limit is not None:
+        paths = paths[:limit]
+    for path in paths:
+        with open(path, 'rb') as input_file:
+            data = input_file.read()
+        img = Image.open(io.BytesIO(data)).convert('RGB')
+        inputs.append((f"corpus/{os.path.basename(path)}", img, data))
+    
+    for size in sizes:
+        img = synthetic_pose(size)
+        buffer = io.BytesIO()
+        img.save(buffer, 'PNG')
+        inputs.append((f"synthetic/{size}x{size}", img, buffer.getvalue()))
+    
+    return inputs
+
+
+def option_matrix(stage):
+    """Return the option combinations benchmarked for a stage."""
+    if stage == 'crop':
+        return [{'padding': 10}]
+    
+    combos = []
+    for vector_style, smooth_edges, blur_radius, background in itertools.product(
+            [True, False], [True, False], [1, 4], ['white', 'transparent']):
+        if (vector_style or not smooth_edges) and blur_radius != 1:
+            continue  # blur_radius only affects smoothed, non-vector edges
+        options = {
+            'vector_style': vector_style,
+            'smooth_edges': smooth_edges,
+            'blur_radius': blur_radius,
+            'background': background,
+        }
+        if stage == 'filter':
+            combos.append(options)
+        else:
+            combos.extend(dict(options, crop=crop) for crop in (False, True))
+    return combos
+
+
+def stage_runner(stage, img, data, options, output_dir):
+    """Return a zero-argument callable that runs one stage once."""
+    if stage == 'crop':
+        silhouette = sg.apply_silhouette_filter(with_threshold_alpha(img))
+        return lambda: sg.crop_to_subject(silhouette, padding=options['padding'])
+    
+    if stage == 'filter':
+        rgba = with_threshold_alpha(img)
+        return lambda: sg.apply_silhouette_filter(
+            rgba, options['background'], options['smooth_edges'],
+            options['blur_radius'], options['vector_style']
+        )
+    
+    input_path = os.path.join(output_dir, 'input.png')
+    output_path = os.path.join(output_dir, 'output.png')
+    with open(input_path, 'wb') as input_file:
+        input_file.write(data)
+    
+    if stage == 'simple':
+        return lambda: sg.create_simple_silhouette(
+            input_path, output_path, 128, options['smooth_edges'], options['blur_radius'],
+            options['vector_style'], options['crop'], 10, options['background'], cache=False
+        )
+    return lambda: sg.create_silhouette(
+        input_path, output_path, options['background'], options['smooth_edges'],
+        options['blur_radius'], options['vector_style'], options['crop'], 10, cache=False
+    )
+
+
+def current_rss_mb():
+    """Resident set size of this process in MB (Linux), or None."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def measure(run, repeat):
+    """
+    Time a callable, then run it once more under tracemalloc.
+    
+    Timing runs are separate from the memory run so tracing overhead does
+    not distort wall time.
+    
+    Returns:
+        dict: Timing and memory figures
+    
+    Raises:
+        RuntimeError: If a run returns False (the pipeline's failure result)
+    """
+    def checked_run():
+        if run() is False:
+            raise RuntimeError("Stage reported failure")
+    
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        checked_run()
+        times.append(time.perf_counter() - start)
+    
+    rss_before = current_rss_mb()
+    tracemalloc.start()
+    try:
+        checked_run()
+        _, traced_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    rss_after = current_rss_mb()
+    
+    return {
+        'seconds_median': statistics.median(times),
+        'seconds_min': min(times),
+        'seconds_max': max(times),
+        'tracemalloc_peak_mb': traced_peak / (1024 * 1024),
+        'rss_delta_mb': None if rss_before is None else rss_after - rss_before,
+        'rss_peak_mb': peak_rss_mb(),
+    }
+
+
+def run_benchmarks(inputs, stages, repeat):
+    """
+    Run every stage and option combination over every input.
+    
+    Returns:
+        list: One result dictionary per (stage, input, options); failed runs
+              have 'ok': False and an 'error' instead of figures
+    """
+    results = []
+    total = sum(len(option_matrix(stage)) for stage in stages) * len(inputs)
+    done = 0
+    
+    with tempfile.TemporaryDirectory(prefix='silhouette_bench_') as output_dir:
+        for stage in stages:
+            for options in option_matrix(stage):
+                for name, img, data in inputs:
+                    done += 1
+                    megapixels = img.width * img.height / 1e6
+                    
+                    result = {
+                        'stage': stage,
+                        'input': name,
+                        'width': img.width,
+                        'height': img.height,
+                        'options': options,
+                    }
+                    
+                    # Keep the pipeline's progress output out of the report
+                    log = io.StringIO()
+                    try:
+                        with contextlib.redirect_stdout(log):
+                            run = stage_runner(stage, img, data, options, output_dir)
+                            figures = measure(run, repeat)
+                    except Exception as e:
+                        result.update(ok=False, error=failure_message(e, log.getvalue()))
+                        results.append(result)
+                        print(f"[{done}/{total}] {stage:<6} {name:<40} FAILED: {result['error']}  "
+                              f"{format_options(options)}")
+                        continue
+                    
+                    result['ok'] = True
+                    result['megapixels_per_second'] = megapixels / figures['seconds_median'] if figures['seconds_median'] else None
+                    result.update(figures)
+                    results.append(result)
+                    
+                    print(f"[{done}/{total}] {stage:<6} {name:<40} "
+                          f"{figures['seconds_median'] * 1000:8.1f}ms "
+                          f"{result['megapixels_per_second'] or 0:7.2f}MP/s "
+                          f"{figures['tracemalloc_peak_mb']:7.1f}MB  {format_options(options)}")
+    
+    return results
+
+
+def failure_message(error, log):
+    """Describe a failed run, preferring the error the pipeline printed over a bare failure result."""
+    printed = [line.strip() for line in log.splitlines() if line.strip().startswith('Error')]
+    if isinstance(error, RuntimeError) and printed:
+        return printed[-1]
+    return f"{type(error).__name__}: {error}"
+
+
+def format_options(options):
+    """Render an options dict as a stable 'key=value' string."""
+    return ' '.join(f"{key}={value}" for key, value in sorted(options.items()))
+
+
+def result_key(result):
+    """Identify a result across runs by stage, input and options."""
+    return (result['stage'], result['input'], format_options(result['options']))
+
+
+def summarize(results):
+    """Print per-stage totals: median time, throughput and worst memory."""
+    print("\n=== Summary by stage ===")
+    for stage in STAGES:
+        rows = [result for result in results if result['stage'] == stage and result['ok']]
+        failed = sum(1 for result in results if result['stage'] == stage and not result['ok'])
+        if failed:
+            print(f"{stage:<6} failed={failed}")
+        if not rows:
+            continue
+        seconds = sum(result['seconds_median'] for result in rows)
+        megapixels = sum(result['width'] * result['height'] / 1e6 for result in rows)
+        peak = max(result['tracemalloc_peak_mb'] for result in rows)
+        print(f"{stage:<6} runs={len(rows):<4} total={seconds:8.2f}s "
+              f"throughput={megapixels / seconds if seconds else 0:7.2f}MP/s peak_traced={peak:7.1f}MB")
+
+
+def compare(results, baseline_path):
+    """Print the speed and memory change against a previous JSON report."""
+    with open(baseline_path, 'r', encoding='utf-8') as baseline_file:
+        baseline = {result_key(result): result for result in json.load(baseline_file)['results']
+                    if result.get('ok', True)}
+    
+    print(f"\n=== Comparison with {baseline_path} ===")
+    ratios = []
+    for result in results:
+        previous = baseline.get(result_key(result))
+        if previous is None or not result['ok'] or not result['seconds_median']:
+            continue
+        speedup = previous['seconds_median'] / result['seconds_median']
+        ratios.append(speedup)
+        memory = result['tracemalloc_peak_mb'] - previous['tracemalloc_peak_mb']
+        print(f"{result['stage']:<6} {result['input']:<40} {speedup:6.2f}x  {memory:+8.1f}MB  "
+              f"{format_options(result['options'])}")
+    
+    if ratios:
+        print(f"Geometric mean speedup over {len(ratios)} runs: "
+              f"{statistics.geometric_mean(ratios):.2f}x")
+    else:
+        print("No matching runs to compare.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the silhouette pipeline')
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS,
+                       help='Directory of PNG pose images (default: images/png)')
+    parser.add_argument('--limit', type=int, default=5,
+                       help='Number of corpus images to use (default: 5, 0 for none)')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[512, 1024, 2048, 4096],
+                       help='Edge lengths of synthetic test images')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=['crop', 'filter', 'simple'],
+                       help='Stages to benchmark (auto needs the rembg model)')
+    parser.add_argument('--repeat', type=int, default=3,
+                       help='Timed runs per measurement (median is reported)')
+    parser.add_argument('--quick', action='store_true',
+                       help='Small run: 2 corpus images, 512/1024 synthetic, 1 repeat')
+    parser.add_argument('--output', help='Write machine-readable results to this JSON file')
+    parser.add_argument('--compare', help='Previous JSON report to compare against')
+    
+    args = parser.parse_args()
+    
+    if args.quick:
+        args.limit = min(args.limit, 2)
+        args.sizes = [size for size in args.sizes if size <= 1024]
+        args.repeat = 1
+    
+    inputs = load_inputs(args.corpus, args.limit, args.sizes)
+    if not inputs:
+        print("Error: No benchmark inputs (empty corpus and no synthetic sizes).")
+        sys.exit(1)
+    
+    print(f"Benchmarking {len(inputs)} inputs, stages: {', '.join(args.stages)}, repeat: {args.repeat}\n")
+    results = run_benchmarks(inputs, args.stages, max(1, args.repeat))
+    summarize(results)
+    
+    if args.output:
+        report = {
+            'meta': {
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'platform': platform.platform(),
+                'cpu_count': os.cpu_count(),
+                'repeat': args.repeat,
+            },
+            'results': results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(report, output_file, indent=2)
+        print(f"\nWrote {len(results)} results to {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+    
+    failed = [result for result in results if not result['ok']]
+    if failed:
+        print(f"\nError: {len(failed)} of {len(results)} run(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
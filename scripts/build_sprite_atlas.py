@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Pose Sprite Atlas Builder
+
+Packs the pose silhouettes referenced by asanas.xml into one or a few atlas
+images with MaxRects bin-packing, and writes a JSON map of each pose's
+rectangle, keyed by pose name. The builder grid and search views can then
+draw every thumbnail from a handful of cached requests instead of one
+request per pose.
+
+Requirements:
+- pip install pillow
+
+Usage:
+python build_sprite_atlas.py                          # ../asanas.xml -> ../images/atlas
+python build_sprite_atlas.py --thumb-size 128 --max-size 1024
+python build_sprite_atlas.py --format png --output-dir dist/atlas
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_XML = os.path.join(SCRIPT_DIR, '..', 'asanas.xml')
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..', 'images', 'atlas')
+
+ATLAS_VERSION = 1
+ALPHA_TRIM_THRESHOLD = 8  # Alpha at or below this counts as empty when trimming
+
+
+class MaxRectsBin:
+    """
+    One atlas page packed with the MaxRects algorithm (best short side fit).
+    
+    The bin tracks the maximal free rectangles left after each placement;
+    a new rectangle goes where it leaves the smallest leftover on its
+    shorter side, which packs mixed sizes tightly.
+    """
+    
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.free = [(0, 0, width, height)]
+        self.used_width = 0
+        self.used_height = 0
+    
+    def find_position(self, width, height):
+        """
+        Return the best (x, y) for a width x height rectangle and its score, or None.
+        
+        Returns:
+            tuple or None: ((x, y), (short side leftover, long side leftover))
+        """
+        best = None
+        for free_x, free_y, free_width, free_height in self.free:
+            if width > free_width or height > free_height:
+                continue
+            leftover_x = free_width - width
+            leftover_y = free_height - height
+            score = (min(leftover_x, leftover_y), max(leftover_x, leftover_y))
+            if best is None or score < best[1]:
+                best = ((free_x, free_y), score)
+        return best
+    
+    def place(self, x, y, width, height):
+        """Occupy a rectangle and split every free rectangle it overlaps."""
+        new_free = []
+        for free_rect in self.free:
+            free_x, free_y, free_width, free_height = free_rect
+            if (x >= free_x + free_width or x + width <= free_x or
+                    y >= free_y + free_height or y + height <= free_y):
+                new_free.append(free_rect)
+                continue
+            
+            if x > free_x:
+                new_free.append((free_x, free_y, x - free_x, free_height))
+            if x + width < free_x + free_width:
+                new_free.append((x + width, free_y, free_x + free_width - x - width, free_height))
+            if y > free_y:
+                new_free.append((free_x, free_y, free_width, y - free_y))
+            if y + height < free_y + free_height:
+                new_free.append((free_x, y + height, free_width, free_y + free_height - y - height))
+        
+        self.free = _prune_contained(new_free)
+        self.used_width = max(self.used_width, x + width)
+        self.used_height = max(self.used_height, y + height)
+
+
+def _prune_contained(rects):
+    """Drop free rectangles that lie entirely inside another one."""
+    pruned = []
+    for index, (x, y, width, height) in enumerate(rects):
+        contained = False
+        for other_index, (other_x, other_y, other_width, other_height) in enumerate(rects):
+            if index == other_index:
+                continue
+            if (x >= other_x and y >= other_y and
+                    x + width <= other_x + other_width and y + height <= other_y + other_height):
+                # Of two identical rectangles keep the first
+                if (x, y, width, height) != (other_x, other_y, other_width, other_height) or other_index < index:
+                    contained = True
+                    break
+        if not contained:
+            pruned.append((x, y, width, height))
+    return pruned
+
+
+def pack_rectangles(sizes, max_size, padding=2):
+    """
+    Pack rectangles into as few max_size x max_size bins as possible.
+    
+    Args:
+        sizes (dict): key -> (width, height)
+        max_size (int): Edge length of each atlas page
+        padding (int): Empty pixels kept around every rectangle
+    
+    Returns:
+        tuple: (placements dict key -> (bin index, x, y), list of MaxRectsBin)
+    """
+    bins = []
+    placements = {}
+    
+    # Largest first: big rectangles are hardest to fit once space fragments
+    order = sorted(sizes, key=lambda key: (max(sizes[key]), sizes[key][0] * sizes[key][1]), reverse=True)
+    for key in order:
+        width, height = sizes[key]
+        padded_width, padded_height = width + 2 * padding, height + 2 * padding
+        if padded_width > max_size or padded_height > max_size:
+            raise ValueError(f"Sprite '{key}' ({width}x{height}) does not fit in a {max_size}px atlas")
+        
+        best = None
+        for bin_index, atlas_bin in enumerate(bins):
+            found = atlas_bin.find_position(padded_width, padded_height)
+            if found is not None and (best is None or found[1] < best[2]):
+                best = (bin_index, found[0], found[1])
+        
+        if best is None:
+            bins.append(MaxRectsBin(max_size, max_size))
+            best = (len(bins) - 1, (0, 0), None)
+        
+        bin_index, (x, y), _ = best
+        bins[bin_index].place(x, y, padded_width, padded_height)
+        placements[key] = (bin_index, x + padding, y + padding)
+    
+    return placements, bins
+
+
+def read_pose_images(xml_path):
+    """
+    Read pose names and image paths from asanas.xml.
+    
+    Returns:
+        list: (pose name, image path relative to the XML file) tuples
+    """
+    poses = []
+    for asana in ET.parse(xml_path).getroot().iter('asana'):
+        name = (asana.findtext('n') or '').strip()
+        image = (asana.findtext('image') or '').strip()
+        if name and image:
+            poses.append((name, image))
+    return poses
+
+
+def load_thumbnail(path, thumb_size, trim=True):
+    """
+    Load an image as RGBA, trim empty borders and shrink it to fit thumb_size.
+    
+    Returns:
+        PIL.Image: Thumbnail no larger than thumb_size on either side
+    """
+    with Image.open(path) as img:
+        img = img.convert('RGBA')
+    
+    if trim:
+        bbox = img.getchannel('A').point(lambda value: 255 if value > ALPHA_TRIM_THRESHOLD else 0).getbbox()
+        if bbox:
+            img = img.crop(bbox)
+    
+    img.thumbnail((thumb_size, thumb_size), Image.LANCZOS, reducing_gap=3.0)
+    return img
+
+
+def build_atlas(xml_path, output_dir, thumb_size=192, max_size=2048, padding=2,
+                output_format='WEBP', quality=90, trim=True, workers=None):
+    """
+    Build atlas pages and the coordinate map for every pose in asanas.xml.
+    
+    Poses that share an image share one sprite.
+    
+    Args:
+        xml_path (str): Path to asanas.xml
+        output_dir (str): Directory for atlas pages and atlas.json
+        thumb_size (int): Longest edge of each sprite
+        max_size (int): Edge length of each atlas page
+        padding (int): Empty pixels around each sprite (prevents bleeding when scaled)
+        output_format (str): 'WEBP' or 'PNG'
+        quality (int): WebP quality (ignored for PNG)
+        trim (bool): Trim transparent borders before scaling
+        workers (int): Processes used to decode and scale images
+    
+    Returns:
+        bool: True if the atlas was written
+    """
+    start_time = time.perf_counter()
+    base_dir = os.path.dirname(os.path.abspath(xml_path))
+    poses = read_pose_images(xml_path)
+    if not poses:
+        print(f"Error: No poses with images found in {xml_path}")
+        return False
+    
+    images = sorted({image for _, image in poses})
+    missing = [image for image in images if not os.path.exists(os.path.join(base_dir, image))]
+    for image in missing:
+        print(f"Warning: Image not found, skipping: {image}")
+    images = [image for image in images if image not in missing]
+    
+    print(f"Loading {len(images)} images for {len(poses)} poses...")
+    paths = [os.path.join(base_dir, image) for image in images]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        thumbnails = dict(zip(images, executor.map(
+            load_thumbnail, paths, [thumb_size] * len(paths), [trim] * len(paths), chunksize=8
+        )))
+    
+    placements, bins = pack_rectangles({image: thumb.size for image, thumb in thumbnails.items()}, max_size, padding)
+    
+    os.makedirs(output_dir, exist_ok=True)
+    extension = 'webp' if output_format.upper() == 'WEBP' else 'png'
+    atlas_path_base = os.path.relpath(os.path.abspath(output_dir), base_dir).replace(os.sep, '/')
+    
+    pages = [Image.new('RGBA', (atlas_bin.used_width, atlas_bin.used_height), (0, 0, 0, 0)) for atlas_bin in bins]
+    for image, (bin_index, x, y) in placements.items():
+        pages[bin_index].paste(thumbnails[image], (x, y))
+    
+    atlases = []
+    for index, page in enumerate(pages):
+        filename = f"poses-{index}.{extension}"
+        save_options = {'quality': quality, 'method': 4} if extension == 'webp' else {'optimize': True}
+        page.save(os.path.join(output_dir, filename), output_format.upper(), **save_options)
+        atlases.append({
+            'file': f"{atlas_path_base}/{filename}",
+            'width': page.width,
+            'height': page.height,
+        })
+        print(f"Atlas {index}: {page.width}x{page.height}, "
+              f"{os.path.getsize(os.path.join(output_dir, filename)) / 1024:.0f}KB")
+    
+    sprites = {}
+    for name, image in poses:
+        if image not in placements:
+            continue
+        bin_index, x, y = placements[image]
+        width, height = thumbnails[image].size
+        sprites[name] = {'atlas': bin_index, 'x': x, 'y': y, 'w': width, 'h': height, 'image': image}
+    
+    atlas_map = {
+        'version': ATLAS_VERSION,
+        'thumb_size': thumb_size,
+        'atlases': atlases,
+        'sprites': sprites,
+    }
+    with open(os.path.join(output_dir, 'atlas.json'), 'w', encoding='utf-8') as map_file:
+        json.dump(atlas_map, map_file, separators=(',', ':'), sort_keys=True)
+    
+    elapsed = time.perf_counter() - start_time
+    print(f"Packed {len(placements)} sprites for {len(sprites)} poses into {len(pages)} atlas(es) in {elapsed:.2f}s")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Pack pose silhouettes into sprite atlases')
+    parser.add_argument('--xml', default=DEFAULT_XML, help='Path to asanas.xml')
+    parser.add_argument('--output-dir', default=DEFAULT_OUTPUT_DIR,
+                       help='Directory for atlas images and atlas.json (default: images/atlas)')
+    parser.add_argument('--thumb-size', type=int, default=192,
+                       help='Longest edge of each sprite in pixels (default: 192)')
+    parser.add_argument('--max-size', type=int, default=2048,
+                       help='Edge length of each atlas page (default: 2048)')
+    parser.add_argument('--padding', type=int, default=2,
+                       help='Empty pixels around each sprite (default: 2)')
+    parser.add_argument('--format', choices=['webp', 'png'], default='webp',
+                       help='Atlas image format (default: webp)')
+    parser.add_argument('--quality', type=int, default=90,
+                       help='WebP quality 0-100 (default: 90)')
+    parser.add_argument('--no-trim', action='store_true',
+                       help='Keep transparent borders around each pose')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes for decoding and scaling (default: CPU count)')
+    
+    args = parser.parse_args()
+    
+    if not os.path.exists(args.xml):
+        print(f"Error: '{args.xml}' not found.")
+        sys.exit(1)
+    
+    try:
+        success = build_atlas(
+            args.xml, args.output_dir, args.thumb_size, args.max_size, args.padding,
+            args.format.upper(), args.quality, not args.no_trim, args.workers
+        )
+    except ValueError as e:
+        print(f"Error: {e}")
+        success = False
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+WebP Asset Builder
+
+Converts the PNG pose silhouettes in images/png into the WebP files the app
+loads (images/webp/<slug>.webp), plus downscaled copies at several widths
+(images/webp/<slug>-<width>w.webp) for use in srcset. Sources are encoded in
+parallel across cores, and a manifest of source hashes means only new or
+changed PNGs are re-encoded on later runs.
+
+Requirements:
+- pip install pillow
+
+Usage:
+python build_webp.py                       # build ../images/png -> ../images/webp
+python build_webp.py --widths 320 640 --quality 85
+python build_webp.py --force               # re-encode everything
+python build_webp.py --prune               # also delete outputs of removed PNGs
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from PIL import Image
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOURCE_DIR = os.path.join(SCRIPT_DIR, '..', 'images', 'png')
+DEFAULT_OUTPUT_DIR = os.path.join(SCRIPT_DIR, '..', 'images', 'webp')
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+DEFAULT_WIDTHS = [320, 640, 960]
+DEFAULT_QUALITY = 90   # Matches the size/quality of the existing images/webp files
+DEFAULT_METHOD = 4     # libwebp effort; 6 is ~20% smaller but ~15x slower
+
+
+def source_slug(filename):
+    """Map a PNG filename to its asset slug (some sources carry stray spaces)."""
+    return os.path.splitext(filename)[0].strip()
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as input_file:
+        for chunk in iter(lambda: input_file.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_manifest(output_dir):
+    """
+    Load the build manifest from the output directory.
+    
+    Returns:
+        dict: Manifest, or an empty one if missing, unreadable or from another version
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as manifest_file:
+            manifest = json.load(manifest_file)
+    except (OSError, ValueError):
+        return {'version': MANIFEST_VERSION, 'settings': None, 'sources': {}}
+    
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {'version': MANIFEST_VERSION, 'settings': None, 'sources': {}}
+    return manifest
+
+
+def save_manifest(output_dir, manifest):
+    """Write the manifest atomically so an interrupted build never corrupts it."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def plan_build(source_dir, output_dir, manifest, settings, force=False):
+    """
+    Decide which sources need encoding.
+    
+    Size and modification time are checked first; a source is only hashed
+    when they differ from the manifest, and only re-encoded when the hash
+    differs too (a touched but unchanged file just refreshes its stat).
+    
+    Returns:
+        tuple: (list of (filename, sha256) to encode, dict of up-to-date manifest entries)
+    
+    Raises:
+        ValueError: If two sources map to the same slug and so the same outputs
+    """
+    settings_changed = manifest.get('settings') != settings
+    known = manifest.get('sources', {})
+    to_build = []
+    unchanged = {}
+    slugs = {}
+    
+    for filename in sorted(os.listdir(source_dir)):
+        if not filename.lower().endswith('.png'):
+            continue
+        other = slugs.setdefault(source_slug(filename), filename)
+        if other != filename:
+            raise ValueError(f"'{other}' and '{filename}' would both build '{source_slug(filename)}'")
+        path = os.path.join(source_dir, filename)
+        stat = os.stat(path)
+        entry = known.get(filename)
+        
+        outputs_present = entry is not None and all(
+            os.path.exists(os.path.join(output_dir, output['file'])) for output in entry['outputs']
+        )
+        if entry is None or force or settings_changed or not outputs_present:
+            to_build.append((filename, None))
+            continue
+        
+        if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+            unchanged[filename] = entry
+            continue
+        
+        sha256 = file_sha256(path)
+        if sha256 == entry['sha256']:
+            unchanged[filename] = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        else:
+            to_build.append((filename, sha256))
+    
+    return to_build, unchanged
+
+
+def encode_source(source_dir, output_dir, filename, settings, sha256=None):
+    """
+    Encode one PNG at full size and at every configured width below it.
+    
+    Runs in a worker process.
+    
+    Returns:
+        dict: Manifest entry (size, mtime_ns, sha256, outputs)
+    """
+    path = os.path.join(source_dir, filename)
+    stat = os.stat(path)
+    if sha256 is None:
+        sha256 = file_sha256(path)
+    
+    slug = source_slug(filename)
+    outputs = []
+    
+    with Image.open(path) as img:
+        img.load()
+        if img.mode not in ('RGB', 'RGBA'):
+            img = img.convert('RGBA' if 'transparency' in img.info or img.mode in ('LA', 'PA') else 'RGB')
+        
+        variants = [(None, img)]
+        for width in sorted(set(settings['widths'])):
+            if width >= img.width:
+                continue
+            height = max(1, round(img.height * width / img.width))
+            variants.append((width, img.resize((width, height), Image.LANCZOS)))
+        
+        for width, variant in variants:
+            output_name = f"{slug}.webp" if width is None else f"{slug}-{width}w.webp"
+            output_path = os.path.join(output_dir, output_name)
+            temp_path = output_path + '.tmp'
+            variant.save(temp_path, 'WEBP', quality=settings['quality'], method=settings['method'])
+            os.replace(temp_path, output_path)
+            outputs.append({
+                'file': output_name,
+                'width': variant.width,
+                'height': variant.height,
+                'bytes': os.path.getsize(output_path),
+            })
+    
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': sha256,
+        'outputs': outputs,
+    }
+
+
+def prune_outputs(output_dir, old_sources, new_sources):
+    """
+    Delete outputs that belonged to sources no longer in the build.
+    
+    Returns:
+        int: Number of files removed
+    """
+    keep = {output['file'] for entry in new_sources.values() for output in entry['outputs']}
+    removed = 0
+    for entry in old_sources.values():
+        for output in entry['outputs']:
+            if output['file'] in keep:
+                continue
+            try:
+                os.remove(os.path.join(output_dir, output['file']))
+                removed += 1
+            except OSError:
+                pass
+    return removed
+
+
+def build(source_dir, output_dir, widths=None, quality=DEFAULT_QUALITY, method=DEFAULT_METHOD,
+          workers=None, force=False, prune=False):
+    """
+    Incrementally build WebP assets for every PNG in source_dir.
+    
+    Args:
+        source_dir (str): Directory of PNG sources
+        output_dir (str): Directory for WebP outputs and the manifest
+        widths (list): Extra widths to generate for srcset (default: 320, 640, 960)
+        quality (int): WebP quality (0-100)
+        method (int): WebP encoder effort (0-6)
+        workers (int): Worker processes (default: CPU count)
+        force (bool): Re-encode every source
+        prune (bool): Delete outputs whose source PNG was removed
+    
+    Returns:
+        bool: True if every source was built successfully
+    
+    Raises:
+        ValueError: If two sources map to the same slug
+    """
+    start_time = time.perf_counter()
+    settings = {
+        'widths': sorted(set(widths if widths is not None else DEFAULT_WIDTHS)),
+        'quality': quality,
+        'method': method,
+    }
+    
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir)
+    to_build, sources = plan_build(source_dir, output_dir, manifest, settings, force)
+    up_to_date = len(sources)
+    
+    failed = []
+    if to_build:
+        workers = max(1, min(workers or os.cpu_count() or 1, len(to_build)))
+        print(f"Encoding {len(to_build)} of {len(to_build) + len(sources)} sources with {workers} worker(s)...")
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(encode_source, source_dir, output_dir, filename, settings, sha256): filename
+                for filename, sha256 in to_build
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                filename = futures[future]
+                try:
+                    sources[filename] = future.result()
+                except Exception as e:
+                    failed.append(filename)
+                    print(f"[{done}/{len(futures)}] FAILED {filename}: {e}")
+                    continue
+                total_bytes = sum(output['bytes'] for output in sources[filename]['outputs'])
+                print(f"[{done}/{len(futures)}] {filename} -> {len(sources[filename]['outputs'])} files, {total_bytes / 1024:.0f}KB")
+    
+    # A failed source keeps its previous outputs and manifest entry
+    for filename in failed:
+        if filename in manifest.get('sources', {}):
+            sources[filename] = manifest['sources'][filename]
+    
+    if prune:
+        removed = prune_outputs(output_dir, manifest.get('sources', {}), sources)
+        if removed:
+            print(f"Pruned {removed} stale output(s)")
+    else:
+        # Keep entries for removed sources so their outputs can be pruned later
+        for filename, entry in manifest.get('sources', {}).items():
+            sources.setdefault(filename, entry)
+    
+    save_manifest(output_dir, {'version': MANIFEST_VERSION, 'settings': settings, 'sources': sources})
+    
+    elapsed = time.perf_counter() - start_time
+    built = len(to_build) - len(failed)
+    print(f"Built {built}, up to date {up_to_date}, failed {len(failed)} in {elapsed:.2f}s")
+    return not failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build responsive WebP assets from PNG silhouettes')
+    parser.add_argument('--source', default=DEFAULT_SOURCE_DIR,
+                       help='Directory of PNG sources (default: images/png)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_DIR,
+                       help='Directory for WebP outputs (default: images/webp)')
+    parser.add_argument('--widths', type=int, nargs='*', default=DEFAULT_WIDTHS,
+                       help='Extra widths for srcset (default: 320 640 960)')
+    parser.add_argument('--quality', type=int, default=DEFAULT_QUALITY,
+                       help=f'WebP quality 0-100 (default: {DEFAULT_QUALITY})')
+    parser.add_argument('--method', type=int, default=DEFAULT_METHOD, choices=range(7),
+                       help=f'WebP encoder effort 0-6 (default: {DEFAULT_METHOD})')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes (default: CPU count)')
+    parser.add_argument('--force', action='store_true', help='Re-encode every source')
+    parser.add_argument('--prune', action='store_true', help='Delete outputs of removed sources')
+    
+    args = parser.parse_args()
+    
+    if not os.path.isdir(args.source):
+        print(f"Error: Source directory '{args.source}' not found.")
+        sys.exit(1)
+    
+    try:
+        success = build(args.source, args.output, args.widths, args.quality, args.method,
+                        args.workers, args.force, args.prune)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    sys.exit(0 if success else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+Near-Duplicate Image Finder
+
+Finds pose images that are copies or variants of each other (re-encoded,
+resized, renamed with typos or stray spaces) so duplicates can be dropped
+from deploys and are not processed twice.
+
+Every image gets a 256-bit perceptual hash: the image is flattened onto
+white, reduced to 64x64 grayscale, and the signs of its 16x16 lowest DCT
+frequencies (above the median) become the bits. Hashes are computed in
+parallel, indexed in a BK-tree for Hamming-distance range queries, and
+matching pairs are merged into clusters with union-find.
+
+Distinct silhouettes of similar poses (sphinx and locust, tree and
+one-leg mountain) sit 50 or more bits apart, while re-encoded, resized or
+JPEG-compressed copies of the same image differ by under 10 bits.
+
+Requirements:
+- pip install pillow numpy
+
+Usage:
+python find_duplicates.py ../images/png
+python find_duplicates.py ../images/png ../images/webp --threshold 16 --mirror
+python find_duplicates.py "../images/**/*.png" --json > duplicates.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
+
+SAMPLE_SIZE = 64  # Images are reduced to this many pixels square before the DCT
+HASH_SIZE = 16    # Low-frequency DCT block kept per axis: HASH_SIZE ** 2 bits
+DEFAULT_THRESHOLD = 24
+
+
+def _dct_matrix(size):
+    """Orthogonal DCT-II basis, so that D @ X @ D.T is the 2-D DCT of X."""
+    k = np.arange(size)
+    basis = np.cos(np.pi * (2 * k[None, :] + 1) * k[:, None] / (2 * size))
+    basis[0] /= np.sqrt(2)
+    return basis * np.sqrt(2 / size)
+
+
+_DCT = _dct_matrix(SAMPLE_SIZE)[:HASH_SIZE]
+
+
+def perceptual_hash(img, mirror=False):
+    """
+    Compute the 256-bit DCT perceptual hash of an image.
+    
+    Args:
+        img (PIL.Image): Image in any mode; transparency is flattened onto white
+        mirror (bool): Hash the horizontally flipped image instead
+    
+    Returns:
+        int: Hash bits, most significant first
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        background = Image.new('RGBA', img.size, 'white')
+        background.alpha_composite(img.convert('RGBA'))
+        img = background
+    
+    gray = img.convert('L').resize((SAMPLE_SIZE, SAMPLE_SIZE), Image.Resampling.BOX)
+    pixels = np.asarray(gray, dtype=np.float64)
+    if mirror:
+        pixels = pixels[:, ::-1]
+    
+    coefficients = (_DCT @ pixels @ _DCT.T).ravel()
+    # The DC term only measures overall brightness, so it does not set the median
+    bits = coefficients > np.median(coefficients[1:])
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two hashes."""
+    return bin(a ^ b).count('1')
+
+
+def hash_file(path, mirror=False):
+    """
+    Hash one image file.
+    
+    Returns:
+        dict: {'path', 'bytes', 'size': [width, height], 'hash', 'mirror_hash', 'error'}
+    """
+    result = {'path': path, 'bytes': 0, 'size': None, 'hash': None, 'mirror_hash': None, 'error': None}
+    try:
+        result['bytes'] = os.path.getsize(path)
+        with Image.open(path) as img:
+            result['size'] = list(img.size)
+            # JPEG can decode straight at a reduced scale
+            img.draft('RGB', (SAMPLE_SIZE * 4, SAMPLE_SIZE * 4))
+            img.load()
+            result['hash'] = perceptual_hash(img)
+            if mirror:
+                result['mirror_hash'] = perceptual_hash(img, mirror=True)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _hash_job(job):
+    return hash_file(*job)
+
+
+def hash_paths(paths, mirror=False, workers=None):
+    """
+    Hash many images, in parallel when there are enough of them to pay off.
+    
+    Returns:
+        list: Results from hash_file, in input order
+    """
+    jobs = [(path, mirror) for path in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 8:
+        return [_hash_job(job) for job in jobs]
+    
+    chunksize = max(1, len(jobs) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_hash_job, jobs, chunksize=chunksize))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over hashes with Hamming distance.
+    
+    Each child edge is labelled with its distance to the parent, and the
+    triangle inequality limits a radius-r search to edges labelled within
+    r of the query's distance to the node, so most of the tree is skipped.
+    """
+    
+    def __init__(self):
+        self.root = None  # [hash, value, {distance: child node}]
+        self.count = 0
+    
+    def add(self, item_hash, value):
+        """Insert a hash with an associated value (e.g. its index)."""
+        self.count += 1
+        node = [item_hash, value, {}]
+        if self.root is None:
+            self.root = node
+            return
+        
+        current = self.root
+        while True:
+            distance = hamming_distance(item_hash, current[0])
+            child = current[2].get(distance)
+            if child is None:
+                current[2][distance] = node
+                return
+            current = child
+    
+    def search(self, item_hash, max_distance):
+        """
+        Find every stored hash within max_distance bits of item_hash.
+        
+        Returns:
+            list: (distance, value) tuples
+        """
+        matches = []
+        pending = [self.root] if self.root is not None else []
+        while pending:
+            node_hash, value, children = pending.pop()
+            distance = hamming_distance(item_hash, node_hash)
+            if distance <= max_distance:
+                matches.append((distance, value))
+            low, high = distance - max_distance, distance + max_distance
+            pending.extend(child for edge, child in children.items() if low <= edge <= high)
+        return matches
+
+
+class DisjointSet:
+    """Union-find with path halving and union by size."""
+    
+    def __init__(self, count):
+        self.parent = list(range(count))
+        self.size = [1] * count
+    
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+    
+    def union(self, a, b):
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def find_clusters(entries, threshold=DEFAULT_THRESHOLD, mirror=False):
+    """
+    Group hashed images into clusters of near-duplicates.
+    
+    Args:
+        entries (list): Successful results from hash_file
+        threshold (int): Largest Hamming distance counted as a duplicate
+        mirror (bool): Also match images against each other's mirror hash
+    
+    Returns:
+        tuple: (clusters as lists of entry indices, largest first, each with at least two images,
+                dict mapping each matched (i, j) pair with i < j to its distance)
+    """
+    tree = BKTree()
+    for index, entry in enumerate(entries):
+        tree.add(entry['hash'], index)
+    
+    components = DisjointSet(len(entries))
+    pairs = {}
+    for index, entry in enumerate(entries):
+        queries = [entry['hash']]
+        if mirror and entry.get('mirror_hash') is not None:
+            queries.append(entry['mirror_hash'])
+        for query in queries:
+            for distance, other in tree.search(query, threshold):
+                if other == index:
+                    continue
+                pair = (min(index, other), max(index, other))
+                pairs[pair] = min(distance, pairs.get(pair, distance))
+                components.union(index, other)
+    
+    groups = {}
+    for index in range(len(entries)):
+        groups.setdefault(components.find(index), []).append(index)
+    clusters = [members for members in groups.values() if len(members) > 1]
+    clusters.sort(key=lambda members: (-len(members), entries[members[0]]['path']))
+    return clusters, pairs
+
+
+def choose_keeper(entries, members):
+    """
+    Pick the copy to keep: highest resolution, then a clean file name
+    (no surrounding spaces), then the shortest name.
+    """
+    def rank(index):
+        entry = entries[index]
+        name = os.path.basename(entry['path'])
+        width, height = entry['size']
+        return (-width * height, name != name.strip(), len(name), name)
+    return min(members, key=rank)
+
+
+def collect_images(inputs):
+    """Expand files, directories (recursively) and glob patterns into image paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, filenames in os.walk(item):
+                paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                             if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS)
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(glob.glob(item, recursive=True)))
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Find near-duplicate images with perceptual hashes')
+    parser.add_argument('inputs', nargs='+', help='Image files, directories or glob patterns')
+    parser.add_argument('--threshold', type=int, default=DEFAULT_THRESHOLD,
+                        help=f'Largest differing bits (of 256) counted as a duplicate (default: {DEFAULT_THRESHOLD})')
+    parser.add_argument('--mirror', action='store_true',
+                        help='Also match horizontally mirrored copies')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--json', action='store_true', help='Print clusters as JSON')
+    
+    args = parser.parse_args()
+    
+    paths = collect_images(args.inputs)
+    if not paths:
+        print("Error: No input images found.")
+        sys.exit(1)
+    
+    start_time = time.perf_counter()
+    results = hash_paths(paths, args.mirror, args.workers)
+    hash_time = time.perf_counter() - start_time
+    
+    entries = [result for result in results if not result['error']]
+    failed = [result for result in results if result['error']]
+    clusters, pairs = find_clusters(entries, args.threshold, args.mirror)
+    
+    report = []
+    for members in clusters:
+        keeper = choose_keeper(entries, members)
+        duplicates = [index for index in members if index != keeper]
+        report.append({
+            'keep': entries[keeper]['path'],
+            'duplicates': [
+                {
+                    'path': entries[index]['path'],
+                    'bytes': entries[index]['bytes'],
+                    'distance': pairs.get((min(index, keeper), max(index, keeper)))
+                }
+                for index in duplicates
+            ],
+            'reclaimable_bytes': sum(entries[index]['bytes'] for index in duplicates)
+        })
+    reclaimable = sum(cluster['reclaimable_bytes'] for cluster in report)
+    
+    if args.json:
+        print(json.dumps({
+            'threshold': args.threshold,
+            'images': len(entries),
+            'clusters': report,
+            'reclaimable_bytes': reclaimable,
+            'errors': [{'path': result['path'], 'error': result['error']} for result in failed]
+        }, indent=2, ensure_ascii=False))
+    else:
+        for result in failed:
+            print(f"Warning: Could not hash {result['path']}: {result['error']}")
+        for number, cluster in enumerate(report, 1):
+            print(f"Cluster {number}: keep {cluster['keep']!r}")
+            for duplicate in cluster['duplicates']:
+                # Members joined only through another member have no direct distance to the keeper
+                distance = f"{duplicate['distance']} bits" if duplicate['distance'] is not None else "via another copy"
+                print(f"  duplicate {duplicate['path']!r} ({distance}, {duplicate['bytes'] / 1024:.0f}KB)")
+        print(f"\nHashed {len(entries)} image(s) in {hash_time:.1f}s: {len(report)} cluster(s), "
+              f"{sum(len(cluster['duplicates']) for cluster in report)} duplicate(s), "
+              f"{reclaimable / (1024 * 1024):.1f}MB reclaimable")
+    
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
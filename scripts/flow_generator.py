@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Transition-Graph Flow Generator
+
+Builds flows by walking the <transitions> graph in asanas.xml, so every step
+is a transition the catalog says is possible. Flows are searched for that
+hit a target total duration within a tolerance, stay under a difficulty cap,
+avoid excluded tags and include at least one pose for each required tag and
+chakra. Output is .flow JSON in the same shape as templates/*.flow.
+
+The graph and the constraint filtering are compiled once, so each candidate
+flow is a cheap random walk; thousands of candidates per second are enough
+for a "surprise me" button.
+
+Requirements:
+- asana_catalog.py (same directory)
+
+Usage:
+python flow_generator.py --minutes 20 -o surprise.flow
+python flow_generator.py --minutes 45 --max-difficulty Intermediate --tags Balance Twist --chakras Heart
+python flow_generator.py --minutes 30 --count 10 --output-dir generated/
+python flow_generator.py --minutes 30 --bench 2000
+"""
+
+import os
+import sys
+import json
+import time
+import heapq
+import random
+import argparse
+
+from asana_catalog import DEFAULT_XML, DIFFICULTIES, load_asanas
+
+
+DIFFICULTY_LEVELS = {difficulty: level for level, difficulty in enumerate(DIFFICULTIES)}
+
+# Poses held longer than the base hold time
+LONG_HOLD_TAGS = {'Resting', 'Restorative'}
+
+# Preferred starting poses when no --start is given
+START_TAGS = {'Foundation', 'Resting'}
+
+
+def pose_slug(asana):
+    """Return the slug templates use for a pose (its image file name without extension)."""
+    return os.path.splitext(os.path.basename(asana['image']))[0]
+
+
+class TransitionGraph:
+    """
+    Adjacency index compiled from the catalog's <transitions>.
+    
+    Poses are numbered by their position in the catalog; neighbors[i] holds
+    the ids of the poses reachable from pose i. Transitions are resolved by
+    pose name first and then by alias; unknown targets are counted and
+    skipped. A few poses share an image and therefore a slug; by_slug keeps
+    every pose for a slug, and resolve() asks for the name when it is
+    ambiguous.
+    """
+    
+    def __init__(self, asanas):
+        self.asanas = asanas
+        self.slugs = [pose_slug(asana) for asana in asanas]
+        self.by_slug = {}
+        for pose_id, slug in enumerate(self.slugs):
+            self.by_slug.setdefault(slug, []).append(pose_id)
+        self.levels = [DIFFICULTY_LEVELS[asana['difficulty']] for asana in asanas]
+        self.tags = [frozenset(asana['tags']) for asana in asanas]
+        self.chakras = [frozenset(asana['chakras']) for asana in asanas]
+        
+        names = {}
+        for pose_id, asana in enumerate(asanas):
+            for alias in asana['aliases']:
+                names.setdefault(alias.lower(), pose_id)
+        for pose_id, asana in enumerate(asanas):
+            names[asana['name'].lower()] = pose_id  # Names win over aliases
+        
+        self.unresolved = 0
+        self.neighbors = []
+        for pose_id, asana in enumerate(asanas):
+            targets = []
+            for transition in asana['transitions']:
+                target = names.get(transition.lower())
+                if target is None:
+                    self.unresolved += 1
+                elif target != pose_id and target not in targets:
+                    targets.append(target)
+            self.neighbors.append(tuple(targets))
+    
+    def resolve(self, pose):
+        """
+        Find a pose id by name or slug.
+        
+        Raises:
+            KeyError: If no pose matches, or the slug is shared by several poses
+        """
+        for pose_id, asana in enumerate(self.asanas):
+            if asana['name'].lower() == pose.lower():
+                return pose_id
+        pose_ids = self.by_slug.get(pose, [])
+        if len(pose_ids) > 1:
+            names = ', '.join(f"'{self.asanas[pose_id]['name']}'" for pose_id in pose_ids)
+            raise KeyError(f"Pose '{pose}' is shared by {names}; use the pose name")
+        if pose_ids:
+            return pose_ids[0]
+        raise KeyError(f"Unknown pose '{pose}'")
+
+
+class FlowSearch:
+    """
+    Randomized search for flows that satisfy a set of constraints.
+    
+    Constraint filtering happens once in the constructor: disallowed poses
+    are removed from the adjacency lists, so walk() only chooses among
+    valid next poses. Steps that cover a still-missing tag or chakra, or
+    visit a new pose, are weighted up. With a closing pose, a table of the
+    shortest time from each pose to the closing pose steers the last steps
+    so every flow ends on a transition into it.
+    """
+    
+    def __init__(self, graph, target_seconds, tolerance=0.05, max_difficulty='Advanced',
+                 require_tags=(), require_chakras=(), exclude_tags=(), start=None, end=None,
+                 hold=30, max_visits=2):
+        """
+        Args:
+            graph (TransitionGraph): Compiled transitions
+            target_seconds (int): Target total duration
+            tolerance (float): Allowed relative deviation from the target
+            max_difficulty (str): Hardest difficulty allowed
+            require_tags (iterable): Tags that must each appear at least once
+            require_chakras (iterable): Chakras that must each appear at least once
+            exclude_tags (iterable): Poses with any of these tags are never used
+            start (str): Slug or name of the first pose (default: a foundation pose)
+            end (str): Slug or name of a closing pose; every flow ends with a transition into it
+            hold (int): Base hold time per pose in seconds (doubled for resting poses)
+            max_visits (int): Maximum times one pose may appear
+        
+        Raises:
+            KeyError: If start or end is not a known pose
+            ValueError: If the constraints leave nothing to search, or no start leads to the end
+        """
+        self.graph = graph
+        self.low = target_seconds * (1 - tolerance)
+        self.high = target_seconds * (1 + tolerance)
+        self.require_tags = frozenset(require_tags)
+        self.require_chakras = frozenset(require_chakras)
+        self.max_visits = max_visits
+        
+        max_level = DIFFICULTY_LEVELS[max_difficulty]
+        exclude = frozenset(exclude_tags)
+        allowed = [graph.levels[pose_id] <= max_level and not (graph.tags[pose_id] & exclude)
+                   for pose_id in range(len(graph.asanas))]
+        
+        self.durations = [hold * 2 if graph.tags[pose_id] & LONG_HOLD_TAGS else hold
+                          for pose_id in range(len(graph.asanas))]
+        self.neighbors = [tuple(target for target in targets if allowed[target])
+                          for targets in graph.neighbors]
+        
+        if start is not None:
+            self.starts = [graph.resolve(start)]
+        else:
+            self.starts = [pose_id for pose_id, ok in enumerate(allowed)
+                           if ok and self.neighbors[pose_id] and graph.tags[pose_id] & START_TAGS]
+            if not self.starts:
+                self.starts = [pose_id for pose_id, ok in enumerate(allowed) if ok and self.neighbors[pose_id]]
+        self.end = graph.resolve(end) if end is not None else None
+        self.finish = self._finish_times()
+        
+        if not self.starts:
+            raise ValueError("No poses satisfy the difficulty and tag constraints")
+        if self.end is not None:
+            self.starts = [pose_id for pose_id in self.starts if self.finish[pose_id] < float('inf')]
+            if not self.starts:
+                raise ValueError(f"No allowed pose leads to the closing pose '{graph.slugs[self.end]}'")
+        
+        reachable_tags = set().union(*(graph.tags[pose_id] for pose_id, ok in enumerate(allowed) if ok))
+        reachable_chakras = set().union(*(graph.chakras[pose_id] for pose_id, ok in enumerate(allowed) if ok))
+        if not self.require_tags <= reachable_tags:
+            raise ValueError(f"No allowed pose has tag(s): {', '.join(sorted(self.require_tags - reachable_tags))}")
+        if not self.require_chakras <= reachable_chakras:
+            raise ValueError(f"No allowed pose has chakra(s): {', '.join(sorted(self.require_chakras - reachable_chakras))}")
+    
+    def _finish_times(self):
+        """
+        Shortest time from each pose to the end of a flow (Dijkstra over reversed transitions).
+        
+        Returns:
+            list: Seconds still to add after each pose: 0 everywhere without a closing
+                pose, inf for poses that cannot reach the closing pose
+        """
+        count = len(self.graph.asanas)
+        if self.end is None:
+            return [0] * count
+        
+        predecessors = [[] for _ in range(count)]
+        for pose_id, targets in enumerate(self.neighbors):
+            for target in targets:
+                predecessors[target].append(pose_id)
+        
+        finish = [float('inf')] * count
+        finish[self.end] = 0
+        # The closing pose is appended even when the constraints exclude it
+        for pose_id, targets in enumerate(self.graph.neighbors):
+            if self.end in targets and pose_id != self.end:
+                finish[pose_id] = self.durations[self.end]
+        
+        heap = [(seconds, pose_id) for pose_id, seconds in enumerate(finish) if seconds < float('inf')]
+        heapq.heapify(heap)
+        while heap:
+            seconds, pose_id = heapq.heappop(heap)
+            if seconds > finish[pose_id]:
+                continue
+            seconds += self.durations[pose_id]
+            for previous in predecessors[pose_id]:
+                if seconds < finish[previous]:
+                    finish[previous] = seconds
+                    heapq.heappush(heap, (seconds, previous))
+        return finish
+    
+    def walk(self, rng, max_backtracks=200):
+        """
+        Try to build one flow with a randomized depth-first walk.
+        
+        Next poses are tried in a weighted random order; when a walk runs
+        into a dead end, overshoots the target or ends without covering the
+        required tags and chakras, it backs up and tries the next option,
+        up to max_backtracks times. Poses that cannot reach the closing
+        pose within the target are never tried.
+        
+        Args:
+            rng (random.Random): Source of randomness
+            max_backtracks (int): Backtracking budget for this walk
+        
+        Returns:
+            list or None: Pose ids in order, or None if no flow was found within the budget
+        """
+        graph = self.graph
+        first = rng.choice(self.starts)
+        closing = self.durations[self.end] if self.end is not None else 0
+        
+        # Parallel stacks, one entry per pose in the path
+        path = [first]
+        totals = [self.durations[first]]
+        missing = [(self.require_tags - graph.tags[first], self.require_chakras - graph.chakras[first])]
+        pending = [None]  # Untried next poses, filled in lazily
+        visits = {first: 1}
+        backtracks = 0
+        
+        while True:
+            if pending[-1] is None:
+                if totals[-1] + closing >= self.low:
+                    flow = self._close(path, totals[-1], missing[-1])
+                    if flow is not None:
+                        return flow
+                # A long enough flow that cannot close yet may still reach the closing pose
+                pending[-1] = self._ordered_options(path, visits, missing[-1], totals[-1], rng)
+            
+            if pending[-1]:
+                target = pending[-1].pop()
+                missing_tags, missing_chakras = missing[-1]
+                path.append(target)
+                totals.append(totals[-1] + self.durations[target])
+                missing.append((missing_tags - graph.tags[target], missing_chakras - graph.chakras[target]))
+                pending.append(None)
+                visits[target] = visits.get(target, 0) + 1
+                continue
+            
+            backtracks += 1
+            if backtracks > max_backtracks or len(path) == 1:
+                return None
+            removed = path.pop()
+            totals.pop()
+            missing.pop()
+            pending.pop()
+            visits[removed] -= 1
+    
+    def _ordered_options(self, path, visits, missing, total, rng):
+        """Return the allowed next poses, in the order they should be tried (last first)."""
+        graph = self.graph
+        durations, finish = self.durations, self.finish
+        missing_tags, missing_chakras = missing
+        previous = path[-2] if len(path) > 1 else None
+        
+        keyed = []
+        for target in self.neighbors[path[-1]]:
+            if target == previous or visits.get(target, 0) >= self.max_visits:
+                continue
+            # Skip poses that cannot get to the end without overshooting the target
+            if total + durations[target] + finish[target] > self.high:
+                continue
+            weight = 1.0 if visits.get(target) else 3.0
+            if missing_tags & graph.tags[target] or missing_chakras & graph.chakras[target]:
+                weight += 4.0
+            # Weighted random order (Efraimidis-Spirakis keys)
+            keyed.append((rng.random() ** (1.0 / weight), target))
+        keyed.sort()
+        return [target for _, target in keyed]
+    
+    def _close(self, path, total, missing):
+        """Append the closing pose and check the finished flow; returns the flow or None."""
+        missing_tags, missing_chakras = missing
+        if self.end is not None and path[-1] != self.end:
+            if self.end not in self.graph.neighbors[path[-1]]:
+                return None
+            total += self.durations[self.end]
+            missing_tags = missing_tags - self.graph.tags[self.end]
+            missing_chakras = missing_chakras - self.graph.chakras[self.end]
+            flow = path + [self.end]
+        else:
+            flow = list(path)
+        
+        if total > self.high or missing_tags or missing_chakras:
+            return None
+        return flow
+    
+    def generate(self, count=1, seed=None, max_attempts=None):
+        """
+        Generate distinct flows.
+        
+        Args:
+            count (int): Number of flows wanted
+            seed (int): Random seed for reproducible output
+            max_attempts (int): Walks to try before giving up (default: 1000 per flow)
+        
+        Returns:
+            list: Up to count pose-id paths
+        """
+        rng = random.Random(seed)
+        max_attempts = max_attempts or count * 1000
+        found = []
+        seen = set()
+        for _ in range(max_attempts):
+            path = self.walk(rng)
+            if path is None:
+                continue
+            key = tuple(path)
+            if key in seen:
+                continue
+            seen.add(key)
+            found.append(path)
+            if len(found) == count:
+                break
+        return found
+
+
+def to_flow(graph, search, path, name, description=''):
+    """
+    Convert a pose-id path into .flow JSON data.
+    
+    Returns:
+        dict: {'name', 'description', 'asanas': [...]} as in templates/*.flow
+    """
+    steps = []
+    for pose_id in path:
+        asana = graph.asanas[pose_id]
+        steps.append({
+            'name': graph.slugs[pose_id],
+            'english': asana['name'],
+            'sanskrit': asana['sanskrit'],
+            'duration': search.durations[pose_id],
+            'difficulty': asana['difficulty'],
+            'side': asana['side'],
+            'description': asana['description'],
+            'tags': list(asana['tags']),
+            'chakras': list(asana['chakras']),
+        })
+    return {'name': name, 'description': description, 'asanas': steps}
+
+
+def describe(args):
+    """Build a flow description from the CLI constraints."""
+    parts = [f"A {args.minutes:g}-minute flow generated from pose transitions",
+             f"up to {args.max_difficulty} level"]
+    if args.tags:
+        parts.append(f"featuring {', '.join(args.tags)}")
+    if args.chakras:
+        parts.append(f"working the {', '.join(args.chakras)} chakra(s)")
+    return ', '.join(parts) + '.'
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate .flow files from the pose transition graph')
+    parser.add_argument('--source', default=DEFAULT_XML, help='asanas.xml or a compiled catalog')
+    parser.add_argument('--minutes', type=float, default=30, help='Target flow length in minutes (default: 30)')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                       help='Allowed relative deviation from the target length (default: 0.05)')
+    parser.add_argument('--max-difficulty', choices=DIFFICULTIES, default='Advanced',
+                       help='Hardest difficulty allowed (default: Advanced)')
+    parser.add_argument('--tags', nargs='*', default=[], help='Tags that must each appear at least once')
+    parser.add_argument('--chakras', nargs='*', default=[], help='Chakras that must each appear at least once')
+    parser.add_argument('--exclude-tags', nargs='*', default=[], help='Never use poses with these tags')
+    parser.add_argument('--start', help='Slug or name of the first pose')
+    parser.add_argument('--end', help='Slug or name of a closing pose, reached by a transition (e.g. corpse-pose)')
+    parser.add_argument('--hold', type=int, default=30, help='Base hold per pose in seconds (default: 30)')
+    parser.add_argument('--max-visits', type=int, default=2, help='Maximum repeats of one pose (default: 2)')
+    parser.add_argument('--name', default='Surprise Flow', help='Flow name')
+    parser.add_argument('--count', type=int, default=1, help='Number of distinct flows to generate')
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible flows')
+    parser.add_argument('-o', '--output', help='Output .flow file (single flow; default: print)')
+    parser.add_argument('--output-dir', help='Directory for several generated flows')
+    parser.add_argument('--bench', type=int, metavar='N', help='Time N candidate walks and report flows/s')
+    
+    args = parser.parse_args()
+    
+    graph = TransitionGraph(load_asanas(args.source))
+    try:
+        search = FlowSearch(
+            graph, int(args.minutes * 60), args.tolerance, args.max_difficulty,
+            args.tags, args.chakras, args.exclude_tags, args.start, args.end,
+            args.hold, args.max_visits
+        )
+    except (KeyError, ValueError) as e:
+        print(f"Error: {e.args[0]}")
+        sys.exit(1)
+    
+    if args.bench:
+        rng = random.Random(args.seed)
+        start_time = time.perf_counter()
+        valid = sum(1 for _ in range(args.bench) if search.walk(rng) is not None)
+        elapsed = time.perf_counter() - start_time
+        print(f"{args.bench} walks in {elapsed:.3f}s: {args.bench / elapsed:.0f} candidates/s, "
+              f"{valid} valid ({valid / elapsed:.0f} flows/s)")
+        return
+    
+    paths = search.generate(args.count, args.seed)
+    if not paths:
+        print("Error: No flow satisfies the constraints; try a longer tolerance or fewer required tags.")
+        sys.exit(1)
+    if len(paths) < args.count:
+        print(f"Warning: Only {len(paths)} distinct flow(s) found")
+    
+    flows = []
+    for index, path in enumerate(paths, 1):
+        name = args.name if len(paths) == 1 else f"{args.name} {index}"
+        flows.append(to_flow(graph, search, path, name, describe(args)))
+    
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+        for index, flow in enumerate(flows, 1):
+            path = os.path.join(args.output_dir, f"generated-{index}.flow")
+            with open(path, 'w', encoding='utf-8') as flow_file:
+                json.dump(flow, flow_file, indent=2, ensure_ascii=False)
+        print(f"Wrote {len(flows)} flow(s) to {args.output_dir}")
+    elif args.output:
+        with open(args.output, 'w', encoding='utf-8') as flow_file:
+            json.dump(flows[0], flow_file, indent=2, ensure_ascii=False)
+        total = sum(step['duration'] for step in flows[0]['asanas'])
+        print(f"Wrote {args.output}: {len(flows[0]['asanas'])} poses, {total / 60:.1f} minutes")
+    else:
+        print(json.dumps(flows if len(flows) > 1 else flows[0], indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Flow Linter
+
+Checks .flow files against the pose catalog. The catalog is loaded once per
+worker process into slug, name and transition lookups, and whole
+directories of flows are checked in parallel.
+
+Rules:
+- E001  file is not valid JSON
+- E002  flow structure is wrong (no asanas list, step is not an object, ...)
+- E003  unknown pose (matches no catalog slug or name)
+- E004  pose image missing on disk
+- W101  step metadata differs from the catalog (english, sanskrit, difficulty, tags,
+        chakras) or has an unknown side
+- W102  consecutive poses with no catalog transition between them
+- W103  duration missing or not a positive number
+- W104  section refers to a step that does not exist
+- W105  pose referenced by display name instead of slug
+
+Requirements:
+- asana_catalog.py and flow_generator.py (same directory)
+
+Usage:
+python flow_lint.py ../templates
+python flow_lint.py exports/ --workers 8 --ignore W102 W105
+python flow_lint.py "flows/*.flow" --json > report.json
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+from asana_catalog import DEFAULT_XML, load_asanas
+from flow_generator import TransitionGraph
+
+
+FLOW_EXTENSIONS = {'.flow', '.json'}
+# The builder lets users pick any side per step, so only unknown values are flagged
+STEP_SIDES = {'Center', 'Front', 'Left', 'Right', 'Back', 'both', 'left', 'right'}
+
+_catalog = None  # Per-process FlowCatalog, set by _init_worker
+
+
+class FlowCatalog:
+    """Catalog lookups used by the linter: slugs, names, transitions and images."""
+    
+    def __init__(self, source=DEFAULT_XML):
+        self.graph = TransitionGraph(load_asanas(source))
+        self.by_name = {asana['name'].lower(): pose_id for pose_id, asana in enumerate(self.graph.asanas)}
+        self.transitions = [frozenset(targets) for targets in self.graph.neighbors]
+        
+        base_dir = os.path.dirname(os.path.abspath(source))
+        self.image_exists = [os.path.exists(os.path.join(base_dir, asana['image'])) for asana in self.graph.asanas]
+    
+    def resolve(self, step):
+        """
+        Match a flow step to a catalog pose the way main.js does.
+        
+        Returns:
+            tuple: (pose id or None, True if matched by display name instead of slug)
+        """
+        slug = step.get('name')
+        if not isinstance(slug, str):
+            return None, False
+        if slug in self.graph.by_slug:
+            return self.graph.by_slug[slug], False
+        for name in (step.get('english'), slug):
+            if isinstance(name, str) and name.lower() in self.by_name:
+                return self.by_name[name.lower()], True
+        return None, False
+
+
+def _init_worker(source):
+    global _catalog
+    _catalog = FlowCatalog(source)
+
+
+def lint_flow(path, catalog=None):
+    """
+    Check one flow file.
+    
+    Args:
+        path (str): Path to a .flow file
+        catalog (FlowCatalog): Catalog lookups (default: the worker's catalog)
+    
+    Returns:
+        dict: {'path', 'steps', 'problems': [{'code', 'step', 'message'}, ...]}
+    """
+    catalog = catalog or _catalog
+    problems = []
+    
+    def report(code, step, message):
+        problems.append({'code': code, 'step': step, 'message': message})
+    
+    try:
+        with open(path, 'r', encoding='utf-8') as flow_file:
+            flow = json.load(flow_file)
+    except (OSError, ValueError) as e:
+        report('E001', None, f"Could not read flow: {e}")
+        return {'path': path, 'steps': 0, 'problems': problems}
+    
+    steps = flow.get('asanas') if isinstance(flow, dict) else None
+    if not isinstance(steps, list):
+        report('E002', None, "Flow has no 'asanas' list")
+        return {'path': path, 'steps': 0, 'problems': problems}
+    
+    graph = catalog.graph
+    previous = None
+    for index, step in enumerate(steps):
+        if not isinstance(step, dict):
+            report('E002', index, "Step is not an object")
+            previous = None
+            continue
+        
+        if not isinstance(step.get('name'), str):
+            report('E002', index, f"Step name {step.get('name')!r} is not a string")
+            previous = None
+            continue
+        
+        duration = step.get('duration')
+        if isinstance(duration, bool) or not isinstance(duration, (int, float)) or duration <= 0:
+            report('W103', index, f"Invalid duration {duration!r}")
+        
+        pose_id, by_name = catalog.resolve(step)
+        if pose_id is None:
+            report('E003', index, f"Unknown pose '{step.get('name')}'")
+            previous = None
+            continue
+        
+        asana = graph.asanas[pose_id]
+        slug = graph.slugs[pose_id]
+        if by_name:
+            report('W105', index, f"'{step.get('name')}' should be the slug '{slug}'")
+        if not catalog.image_exists[pose_id]:
+            report('E004', index, f"Image missing for '{slug}': {asana['image']}")
+        
+        for field, expected in (('english', asana['name']), ('sanskrit', asana['sanskrit']),
+                                ('difficulty', asana['difficulty'])):
+            if field in step and step[field] != expected:
+                report('W101', index, f"{slug}: {field} is {step[field]!r}, catalog has {expected!r}")
+        if 'side' in step and step['side'] not in STEP_SIDES:
+            report('W101', index, f"{slug}: unknown side {step['side']!r}")
+        for field in ('tags', 'chakras'):
+            if field not in step:
+                continue
+            if not isinstance(step[field], list) or not all(isinstance(item, str) for item in step[field]):
+                report('E002', index, f"{slug}: {field} is not a list of strings")
+            elif set(step[field]) != set(asana[field]):
+                report('W101', index, f"{slug}: {field} differ from the catalog")
+        
+        if previous is not None and previous != pose_id and pose_id not in catalog.transitions[previous]:
+            report('W102', index, f"No transition from '{graph.slugs[previous]}' to '{slug}'")
+        previous = pose_id
+    
+    sections = flow.get('sections') or []
+    if not isinstance(sections, list):
+        report('E002', None, "'sections' is not a list")
+        sections = []
+    for section in sections:
+        step_indexes = section.get('asanaIds', section.get('poseIndices', [])) if isinstance(section, dict) else None
+        if not isinstance(step_indexes, list):
+            report('E002', None, f"Section {section!r:.40} is not an object with a list of step indexes")
+            continue
+        for step_index in step_indexes:
+            if isinstance(step_index, bool) or not isinstance(step_index, int) or not 0 <= step_index < len(steps):
+                report('W104', None, f"Section '{section.get('name')}' refers to missing step {step_index!r}")
+    
+    return {'path': path, 'steps': len(steps), 'problems': problems}
+
+
+def collect_flow_files(inputs):
+    """Expand files, directories (recursively) and glob patterns into flow paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, filenames in os.walk(item):
+                paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                             if os.path.splitext(filename)[1].lower() in FLOW_EXTENSIONS)
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(glob.glob(item)))
+    return paths
+
+
+def lint_paths(paths, source=DEFAULT_XML, workers=None):
+    """
+    Lint many flows, in parallel when there are enough of them to pay off.
+    
+    Returns:
+        list: Results from lint_flow, in input order
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 50:
+        catalog = FlowCatalog(source)
+        return [lint_flow(path, catalog) for path in paths]
+    
+    chunksize = max(1, len(paths) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as executor:
+        return list(executor.map(lint_flow, paths, chunksize=chunksize))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check .flow files against the pose catalog')
+    parser.add_argument('inputs', nargs='+', help='Flow files, directories or glob patterns')
+    parser.add_argument('--source', default=DEFAULT_XML, help='asanas.xml or a compiled catalog')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--ignore', nargs='*', default=[], help='Rule codes to skip (e.g. W102)')
+    parser.add_argument('--strict', action='store_true', help='Exit with an error on warnings too')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    
+    args = parser.parse_args()
+    
+    paths = collect_flow_files(args.inputs)
+    if not paths:
+        print("Error: No flow files found.")
+        sys.exit(1)
+    
+    start_time = time.perf_counter()
+    results = lint_paths(paths, args.source, args.workers)
+    elapsed = time.perf_counter() - start_time
+    
+    ignored = set(args.ignore)
+    for result in results:
+        result['problems'] = [problem for problem in result['problems'] if problem['code'] not in ignored]
+    
+    errors = sum(1 for result in results for problem in result['problems'] if problem['code'].startswith('E'))
+    warnings = sum(1 for result in results for problem in result['problems'] if problem['code'].startswith('W'))
+    
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        for result in results:
+            for problem in result['problems']:
+                location = f"{result['path']}:step {problem['step']}" if problem['step'] is not None else result['path']
+                print(f"{location}: {problem['code']} {problem['message']}")
+        print(f"\nChecked {len(results)} flow(s), {sum(result['steps'] for result in results)} steps "
+              f"in {elapsed:.2f}s: {errors} error(s), {warnings} warning(s)")
+    
+    sys.exit(1 if errors or (args.strict and warnings) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+Flow Transformer
+
+Applies a chain of transforms to .flow files: reverse the order, mirror
+Left/Right sides, scale hold durations, trim to a target length and merge
+consecutive repeats of a pose. Transforms run in the order given, and section
+step indexes are kept in step with the poses.
+
+Single files and directories are rewritten in parallel. Newline-delimited
+collections (.ndjson/.jsonl, one flow per line, or stdin) are streamed a
+batch at a time, so bulk exports of any size are rewritten in one pass with
+flat memory.
+
+Requirements:
+- flow_lint.py (same directory)
+
+Usage:
+python flow_transform.py my_flow.flow -t reverse
+python flow_transform.py ../templates --output-dir mirrored/ -t mirror -t scale:1.5
+python flow_transform.py exports.ndjson -o cleaned.ndjson -t dedupe -t trim:1800
+cat exports.ndjson | python flow_transform.py - -t reverse > reversed.ndjson
+"""
+
+import os
+import sys
+import json
+import math
+import time
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from flow_lint import collect_flow_files
+
+
+STREAM_EXTENSIONS = {'.ndjson', '.jsonl'}
+STREAM_BATCH_SIZE = 500  # Lines handed to a worker at a time
+
+MIRRORED_SIDES = {'Left': 'Right', 'Right': 'Left', 'left': 'right', 'right': 'left'}
+
+
+def _remap_sections(flow, mapping):
+    """
+    Point section step indexes at the steps' new positions.
+    
+    Sections whose steps were all dropped are removed.
+    
+    Args:
+        flow (dict): Flow whose 'asanas' were rearranged
+        mapping (list): Old step index -> new step index, or None if the step was dropped
+    """
+    if not isinstance(flow.get('sections'), list):
+        return
+    
+    sections = []
+    for section in flow['sections']:
+        if isinstance(section, dict) and isinstance(section.get('asanaIds'), list):
+            new_ids = [mapping[index] for index in section['asanaIds']
+                       if isinstance(index, int) and 0 <= index < len(mapping) and mapping[index] is not None]
+            if section['asanaIds'] and not new_ids:
+                continue  # Every step in the section was dropped
+            section['asanaIds'] = sorted(set(new_ids))
+        sections.append(section)
+    flow['sections'] = sections
+
+
+def reverse_flow(flow):
+    """Reverse the pose order (and the section order) of a flow."""
+    count = len(flow['asanas'])
+    flow['asanas'].reverse()
+    _remap_sections(flow, [count - 1 - index for index in range(count)])
+    if isinstance(flow.get('sections'), list):
+        flow['sections'].reverse()
+    
+    if isinstance(flow.get('name'), str):
+        flow['name'] = flow['name'] + " (Reversed)"
+    if isinstance(flow.get('description'), str):
+        flow['description'] = flow['description'] + " (Sequence reversed)"
+    return flow
+
+
+def mirror_flow(flow):
+    """Swap Left and Right on every step."""
+    for step in flow['asanas']:
+        side = step.get('side')
+        if side in MIRRORED_SIDES:
+            step['side'] = MIRRORED_SIDES[side]
+    
+    if isinstance(flow.get('name'), str):
+        flow['name'] = flow['name'] + " (Mirrored)"
+    return flow
+
+
+def scale_flow(flow, factor):
+    """Multiply every hold by factor, rounding to whole seconds (at least 1)."""
+    for step in flow['asanas']:
+        duration = step.get('duration')
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            step['duration'] = max(1, round(duration * factor))
+    return flow
+
+
+def trim_flow(flow, seconds):
+    """
+    Cut a flow down to at most `seconds` long.
+    
+    Steps past the limit are dropped and the last kept step is shortened to
+    the whole seconds left, so the total lands on the target (or under it by
+    less than a second for fractional targets). A step that would keep less
+    than a second is dropped. Flows already short enough are left alone.
+    """
+    total = 0
+    kept = 0
+    for step in flow['asanas']:
+        if total >= seconds:
+            break
+        duration = step.get('duration')
+        if isinstance(duration, (int, float)) and not isinstance(duration, bool):
+            remaining = seconds - total
+            if duration > remaining:
+                if remaining < 1:
+                    break
+                step['duration'] = math.floor(remaining)
+            total += step['duration']
+        kept += 1
+    
+    count = len(flow['asanas'])
+    if kept < count:
+        del flow['asanas'][kept:]
+        _remap_sections(flow, [index if index < kept else None for index in range(count)])
+    return flow
+
+
+def dedupe_flow(flow):
+    """Merge runs of the same pose on the same side into one step holding their total duration."""
+    steps = flow['asanas']
+    merged = []
+    mapping = []
+    for step in steps:
+        previous = merged[-1] if merged else None
+        if previous and step.get('name') == previous.get('name') and step.get('side') == previous.get('side'):
+            if isinstance(step.get('duration'), (int, float)) and isinstance(previous.get('duration'), (int, float)):
+                previous['duration'] += step['duration']
+        else:
+            merged.append(step)
+        mapping.append(len(merged) - 1)
+    
+    if len(merged) < len(steps):
+        flow['asanas'] = merged
+        _remap_sections(flow, mapping)
+    return flow
+
+
+TRANSFORMS = {
+    'reverse': (reverse_flow, None),
+    'mirror': (mirror_flow, None),
+    'scale': (scale_flow, float),
+    'trim': (trim_flow, float),
+    'dedupe': (dedupe_flow, None),
+}
+
+
+def parse_transform(spec):
+    """
+    Parse a transform spec such as 'reverse', 'scale:1.5' or 'trim:1800'.
+    
+    Returns:
+        tuple: (transform name, argument or None)
+    
+    Raises:
+        ValueError: If the transform is unknown or its argument is missing or invalid
+    """
+    name, _, argument = spec.partition(':')
+    if name not in TRANSFORMS:
+        raise ValueError(f"Unknown transform '{name}' (expected one of: {', '.join(TRANSFORMS)})")
+    
+    argument_type = TRANSFORMS[name][1]
+    if argument_type is None:
+        if argument:
+            raise ValueError(f"Transform '{name}' takes no argument")
+        return name, None
+    try:
+        value = argument_type(argument)
+    except ValueError:
+        raise ValueError(f"Transform '{name}' needs a number, e.g. '{name}:1.5'") from None
+    if value <= 0:
+        raise ValueError(f"Transform '{name}' needs a positive number")
+    return name, value
+
+
+def apply_transforms(flow, transforms):
+    """
+    Run parsed transforms over one flow, in order.
+    
+    A 'name' or 'description' that is not a string is left unchanged
+    instead of getting a suffix.
+    
+    Raises:
+        ValueError: If the flow has no 'asanas' list of step objects
+    """
+    if not isinstance(flow, dict) or not isinstance(flow.get('asanas'), list):
+        raise ValueError("flow does not contain an 'asanas' list")
+    if not all(isinstance(step, dict) for step in flow['asanas']):
+        raise ValueError("'asanas' contains a step that is not an object")
+    for name, argument in transforms:
+        function = TRANSFORMS[name][0]
+        flow = function(flow) if argument is None else function(flow, argument)
+    return flow
+
+
+def transform_file(input_path, output_path, transforms):
+    """
+    Transform one .flow file.
+    
+    Returns:
+        tuple: (input path, error message or None)
+    """
+    try:
+        with open(input_path, 'r', encoding='utf-8') as input_file:
+            flow = apply_transforms(json.load(input_file), transforms)
+        with open(output_path, 'w', encoding='utf-8') as output_file:
+            json.dump(flow, output_file, indent=2, ensure_ascii=False)
+    except (OSError, ValueError, TypeError, KeyError) as e:
+        return input_path, str(e)
+    return input_path, None
+
+
+def transform_lines(lines, transforms):
+    """
+    Transform a batch of NDJSON lines.
+    
+    Returns:
+        tuple: (output lines, list of (line offset in batch, error message))
+    """
+    output = []
+    errors = []
+    for offset, line in enumerate(lines):
+        if not line.strip():
+            continue
+        try:
+            flow = apply_transforms(json.loads(line), transforms)
+        except (ValueError, TypeError, KeyError) as e:
+            errors.append((offset, str(e)))
+            continue
+        output.append(json.dumps(flow, ensure_ascii=False, separators=(',', ':')) + '\n')
+    return output, errors
+
+
+def _batches(lines, size):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def transform_stream(input_file, output_file, transforms, workers=None):
+    """
+    Stream NDJSON flows from input_file to output_file, in order.
+    
+    Batches are fanned out to worker processes with only a few in flight at
+    once, so memory stays bounded however long the input is.
+    
+    Returns:
+        tuple: (flows written, lines skipped)
+    """
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    skipped = 0
+    line_number = 0
+    
+    def drain(batch_start, result):
+        nonlocal written, skipped
+        output, errors = result
+        output_file.writelines(output)
+        written += len(output)
+        skipped += len(errors)
+        for offset, message in errors:
+            print(f"Warning: line {batch_start + offset + 1}: {message}", file=sys.stderr)
+    
+    if workers == 1:
+        for batch in _batches(input_file, STREAM_BATCH_SIZE):
+            drain(line_number, transform_lines(batch, transforms))
+            line_number += len(batch)
+        return written, skipped
+    
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in _batches(input_file, STREAM_BATCH_SIZE):
+            pending.append((line_number, executor.submit(transform_lines, batch, transforms)))
+            line_number += len(batch)
+            if len(pending) >= workers * 2:
+                batch_start, future = pending.pop(0)
+                drain(batch_start, future.result())
+        for batch_start, future in pending:
+            drain(batch_start, future.result())
+    return written, skipped
+
+
+def default_output_path(input_path):
+    """my_flow.flow -> my_flow_transformed.flow"""
+    stem, extension = os.path.splitext(input_path)
+    return f"{stem}_transformed{extension}"
+
+
+def mirrored_output_paths(paths, output_dir):
+    """
+    Map input files to outputs under output_dir, mirroring their layout.
+    
+    Paths are kept relative to the deepest directory holding every input, so
+    a/x.flow and b/x.flow become out/a/x.flow and out/b/x.flow, while the
+    files of a single directory land directly in out/.
+    """
+    absolute = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in absolute])
+    return [os.path.join(output_dir, os.path.relpath(path, root)) for path in absolute]
+
+
+def transform_files(paths, output_dir, transforms, workers=None):
+    """
+    Transform .flow files in parallel.
+    
+    Args:
+        paths (list): Input .flow files
+        output_dir (str): Directory for results, mirroring the input layout (default: next to each input)
+        transforms (list): Parsed transforms
+        workers (int): Worker processes
+    
+    Returns:
+        list: Error messages for the files that failed
+    """
+    if output_dir:
+        outputs = mirrored_output_paths(paths, output_dir)
+        for directory in sorted({os.path.dirname(output) for output in outputs}):
+            os.makedirs(directory, exist_ok=True)
+    else:
+        outputs = [default_output_path(path) for path in paths]
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 50:
+        results = [transform_file(path, output, transforms) for path, output in zip(paths, outputs)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(transform_file, paths, outputs, [transforms] * len(paths),
+                                        chunksize=max(1, len(paths) // (workers * 8))))
+    return [f"{path}: {error}" for path, error in results if error]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a chain of transforms to .flow files')
+    parser.add_argument('inputs', nargs='+',
+                       help="Flow files, directories, .ndjson collections, or '-' for NDJSON on stdin")
+    parser.add_argument('-t', '--transform', action='append', default=[], metavar='SPEC',
+                       help="Transform to apply, in order: reverse, mirror, scale:FACTOR, trim:SECONDS, dedupe")
+    parser.add_argument('-o', '--output', help='Output file for a single input (default: <name>_transformed)')
+    parser.add_argument('--output-dir', help='Directory for transformed .flow files (input subfolders are kept)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    
+    args = parser.parse_args()
+    
+    if not args.transform:
+        print("Error: No transforms given (use -t reverse, -t mirror, -t scale:1.5, ...).")
+        sys.exit(1)
+    try:
+        transforms = [parse_transform(spec) for spec in args.transform]
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    streams = [item for item in args.inputs
+               if item == '-' or os.path.splitext(item)[1].lower() in STREAM_EXTENSIONS]
+    # A file named both directly and through its directory is transformed once
+    unique = {}
+    for path in collect_flow_files([item for item in args.inputs if item not in streams]):
+        unique.setdefault(os.path.abspath(path), path)
+    paths = list(unique.values())
+    if not streams and not paths:
+        print("Error: No flow files found.")
+        sys.exit(1)
+    if args.output and len(streams) + len(paths) > 1:
+        print("Error: -o/--output takes a single input; use --output-dir for several.")
+        sys.exit(1)
+    
+    start_time = time.perf_counter()
+    failed = False
+    # Progress goes to stderr when results are streamed to stdout
+    log = sys.stderr if '-' in streams and not args.output else sys.stdout
+    
+    for stream in streams:
+        output_path = args.output or (None if stream == '-' else default_output_path(stream))
+        temp_path = None
+        try:
+            input_file = sys.stdin if stream == '-' else open(stream, 'r', encoding='utf-8')
+            if output_path is None:
+                output_file = sys.stdout
+            else:
+                # Write next to the target and rename on success, so a failed run leaves no partial file
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_path)), suffix='.tmp')
+                output_file = os.fdopen(fd, 'w', encoding='utf-8')
+        except OSError as e:
+            print(f"Error: {e}", file=log)
+            failed = True
+            continue
+        try:
+            with input_file, output_file:
+                written, skipped = transform_stream(input_file, output_file, transforms, args.workers)
+            if temp_path:
+                os.replace(temp_path, output_path)
+        except Exception as e:
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            print(f"Error: {stream}: {e}", file=log)
+            failed = True
+            continue
+        print(f"{stream}: wrote {written} flow(s) to {output_path or 'stdout'}, skipped {skipped}", file=log)
+        failed = failed or skipped > 0
+    
+    if paths:
+        if args.output:
+            _, error = transform_file(paths[0], args.output, transforms)
+            errors = [f"{paths[0]}: {error}"] if error else []
+        else:
+            errors = transform_files(paths, args.output_dir, transforms, args.workers)
+        for error in errors:
+            print(f"Error: {error}", file=log)
+        print(f"Transformed {len(paths) - len(errors)} of {len(paths)} flow file(s)", file=log)
+        failed = failed or bool(errors)
+    
+    print(f"Done in {time.perf_counter() - start_time:.2f}s", file=log)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
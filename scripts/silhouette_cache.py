@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache for silhouette outputs
+
+Stores encoded silhouettes on disk, keyed by a hash of the input image bytes
+plus every processing option, so re-uploads and unchanged batch inputs skip
+background removal entirely. The cache directory is shared by every process
+that uses it (CLI, batch workers, GUI and web app) and is kept under a size
+cap by evicting the least recently used entries.
+
+Configuration (environment):
+- SILHOUETTE_CACHE_DIR     cache directory (default: ~/.cache/silhouette_generator)
+- SILHOUETTE_CACHE_MAX_MB  size cap in megabytes (default: 512)
+
+Usage:
+python silhouette_cache.py            # show cache location and size
+python silhouette_cache.py --clear    # remove every cached silhouette
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import tempfile
+import threading
+import argparse
+
+
+# Bump when the pipeline output changes so stale entries are never served
+CACHE_VERSION = 3
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'silhouette_generator')
+DEFAULT_MAX_MB = 512
+
+ENTRY_SUFFIX = '.bin'
+TEMP_SUFFIX = '.tmp'
+STALE_TEMP_SECONDS = 10 * 60  # Older temporary files were left behind by a crashed writer
+
+
+class SilhouetteCache:
+    """
+    On-disk LRU cache of encoded silhouettes.
+    
+    Entries are files named after their key. A hit refreshes the file's
+    modification time, and eviction removes the oldest files first, so the
+    file system itself records recency and several processes can share one
+    directory without coordination. Writes go to a temporary file and are
+    renamed into place, so readers never see a partial entry.
+    """
+    
+    def __init__(self, cache_dir=None, max_bytes=None):
+        """
+        Args:
+            cache_dir (str): Cache directory (default: SILHOUETTE_CACHE_DIR or ~/.cache/...)
+            max_bytes (int): Size cap in bytes (default: SILHOUETTE_CACHE_MAX_MB or 512MB)
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get('SILHOUETTE_CACHE_DIR', DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get('SILHOUETTE_CACHE_MAX_MB', DEFAULT_MAX_MB)) * 1024 * 1024)
+        
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        
+        self._lock = threading.Lock()
+        self._size = None  # Lazily measured total size of the entries
+    
+    @staticmethod
+    def make_key(input_data, **options):
+        """
+        Build the cache key for an input image and its processing options.
+        
+        Args:
+            input_data (bytes): Raw input bytes (or any bytes identifying the input)
+            **options: Every option that affects the output
+        
+        Returns:
+            str: Hex SHA-256 digest
+        """
+        digest = hashlib.sha256()
+        digest.update(input_data)
+        digest.update(json.dumps(
+            {'version': CACHE_VERSION, 'options': options},
+            sort_keys=True, default=str
+        ).encode('utf-8'))
+        return digest.hexdigest()
+    
+    def _entry_path(self, key):
+        # Two-level fan-out keeps directories small for large caches
+        return os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+    
+    def get(self, key):
+        """
+        Look up an entry, refreshing its recency on a hit.
+        
+        Returns:
+            bytes or None: Cached data, or None on a miss
+        """
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                data = entry_file.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        
+        with self._lock:
+            self.hits += 1
+        return data
+    
+    def put(self, key, data):
+        """
+        Store an entry, evicting old entries if the size cap is exceeded.
+        
+        Args:
+            key (str): Key from make_key
+            data (bytes): Encoded silhouette
+        """
+        if len(data) > self.max_bytes:
+            return
+        
+        path = self._entry_path(key)
+        try:
+            replaced = os.path.getsize(path)
+        except OSError:
+            replaced = 0
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=TEMP_SUFFIX)
+            with os.fdopen(fd, 'wb') as temp_file:
+                temp_file.write(data)
+            os.replace(temp_path, path)
+        except OSError as e:
+            print(f"Warning: Could not write cache entry: {e}")
+            return
+        
+        with self._lock:
+            if self._size is not None:
+                self._size += len(data) - replaced
+            over_budget = self._size is None or self._size > self.max_bytes
+        
+        if over_budget:
+            self.evict()
+    
+    def _scan(self):
+        """
+        Return [(mtime, size, path), ...] for every entry on disk.
+        
+        Stale temporary files from interrupted writes are removed on the way.
+        """
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        
+        stale_before = time.time() - STALE_TEMP_SECONDS
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                is_temp = filename.endswith(TEMP_SUFFIX)
+                if not is_temp and not filename.endswith(ENTRY_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                    if is_temp:
+                        # Recent ones may still be written by another process
+                        if stat.st_mtime < stale_before:
+                            os.remove(path)
+                        continue
+                except OSError:
+                    continue  # Removed by another process
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits its size cap.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        with self._lock:
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            
+            self._size = total
+            self.evictions += removed
+            return removed
+    
+    def clear(self):
+        """Remove every entry from the cache."""
+        with self._lock:
+            for _, _, path in self._scan():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self._size = 0
+    
+    def stats(self):
+        """
+        Return cache counters and current disk usage.
+        
+        Returns:
+            dict: hits, misses, evictions, entries, bytes, max_bytes, directory
+        """
+        entries = self._scan()
+        with self._lock:
+            self._size = sum(size for _, size, _ in entries)
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'directory': self.cache_dir,
+            }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache():
+    """
+    Return the process-wide cache for the configured directory.
+    
+    Returns:
+        SilhouetteCache: Shared cache instance
+    """
+    global _default_cache
+    if _default_cache is None:
+        with _default_cache_lock:
+            if _default_cache is None:
+                _default_cache = SilhouetteCache()
+    return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the silhouette output cache')
+    parser.add_argument('--cache-dir', help='Cache directory (default: SILHOUETTE_CACHE_DIR or ~/.cache/silhouette_generator)')
+    parser.add_argument('--clear', action='store_true', help='Remove every cached silhouette')
+    
+    args = parser.parse_args()
+    cache = SilhouetteCache(args.cache_dir)
+    
+    if args.clear:
+        cache.clear()
+        print(f"Cleared cache: {cache.cache_dir}")
+        sys.exit(0)
+    
+    stats = cache.stats()
+    print(f"Cache directory: {stats['directory']}")
+    print(f"Entries: {stats['entries']}")
+    print(f"Size: {stats['bytes'] / (1024 * 1024):.1f}MB of {stats['max_bytes'] / (1024 * 1024):.0f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,7 @@ import os
 import sys
 import glob
 from pathlib import Path
-from silhouette_generator import create_silhouette, create_simple_silhouette
+from silhouette_generator import create_silhouette, create_simple_silhouette, preload_rembg_session
 
 def get_input_file():
     """Get input file from user"""
@@ -135,36 +135,7 @@ def main():
             if method == 'auto':
                 success = create_silhouette(input_file, output_file, background)
             else:
-                if transparent:
-                    # For simple method with transparency, create temp file first
-                    temp_file = output_file.replace('.png', '_temp.png')
-                    success = create_simple_silhouette(input_file, temp_file)
-                    
-                    if success:
-                        try:
-                            from PIL import Image
-                            # Convert white background to transparent
-                            img = Image.open(temp_file).convert("RGBA")
-                            datas = img.getdata()
-                            
-                            newData = []
-                            for item in datas:
-                                # Change white pixels to transparent
-                                if item[0] > 200 and item[1] > 200 and item[2] > 200:
-                                    newData.append((255, 255, 255, 0))  # Transparent
-                                else:
-                                    newData.append(item)
-                            
-                            img.putdata(newData)
-                            img.save(output_file, "PNG")
-                            os.remove(temp_file)  # Clean up
-                            print("Made background transparent.")
-                        except Exception as e:
-                            print(f"Warning: Could not make background transparent: {e}")
-                            if os.path.exists(temp_file):
-                                os.rename(temp_file, output_file)
-                else:
-                    success = create_simple_silhouette(input_file, output_file)
+                success = create_simple_silhouette(input_file, output_file, background_color=background)
             
             if success:
                 print(f"\n✅ Success! Silhouette saved as: {output_file}")
@@ -190,4 +161,7 @@ def main():
         print(f"\nUnexpected error: {e}")
 
 if __name__ == "__main__":
+    # Load the background removal model while the user answers the prompts;
+    # every image processed in this session reuses it
+    preload_rembg_session()
     main()
\ No newline at end of file
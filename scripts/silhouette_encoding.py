@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Compact Silhouette Encoding
+
+Silhouettes are black on white or black on transparent, so they rarely need
+full RGB/RGBA storage. The image's actual distinct values choose the
+smallest exact representation:
+
+- two gray levels (black and white)      -> 1-bit PNG
+- up to 256 distinct colors              -> palette PNG (1, 2, 4 or 8 bits per pixel,
+                                            with a tRNS chunk for transparency)
+- more than 256 gray/alpha combinations  -> LA PNG
+- anything else                          -> RGB/RGBA PNG
+
+WebP output is always lossless; transparent silhouettes keep only their
+alpha plane and let the encoder discard the hidden color values.
+
+Scanned or exported silhouettes are often noisy (hundreds of near-gray
+values), so the exact modes alone save little. The re-encoding CLI
+therefore quantizes to DEFAULT_COLORS colors first by default, which is
+lossy but keeps every composited pixel within a few gray levels almost
+everywhere; --exact keeps the image bit for bit. On the 194 images in
+images/png (163.1MB):
+
+- --exact:            PNG 96.2MB (1.7x),  WebP 53.1MB (3.1x)
+- default, 64 colors: PNG 7.2MB (22.8x),  WebP 3.8MB (42.6x);
+                      on white, mean error 0.4 gray levels, worst pixel 41
+- --colors 32:        PNG 5.5MB (29.5x),  WebP 2.7MB (60.8x); worst pixel 116
+
+Pipeline output (silhouette_generator) is already a handful of gray or
+alpha levels, so encode_compact stores it exactly without quantizing.
+
+Effort (0-9) trades encoding time for size: it is the PNG compression level
+(9 also runs the optimizer) and is mapped onto the WebP method (0-6).
+
+Configuration (environment):
+- SILHOUETTE_ENCODE_EFFORT  encoding effort 0-9 (default: 6)
+
+Requirements:
+- pip install pillow numpy
+
+Usage:
+python silhouette_encoding.py ../images/png                      # report only
+python silhouette_encoding.py ../images/png -o compact/ --effort 9
+python silhouette_encoding.py ../images/png -o compact/ --colors 32 --format webp
+python silhouette_encoding.py ../images/png -o exact/ --exact     # lossless
+"""
+
+import os
+import io
+import sys
+import glob
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
+
+DEFAULT_EFFORT = 6
+MAX_PALETTE = 256
+DEFAULT_COLORS = 64  # CLI quantization; the smallest count whose worst error stays small on the corpus
+
+
+def get_effort(effort=None):
+    """Return the encoding effort (0-9): the argument, else SILHOUETTE_ENCODE_EFFORT, else the default."""
+    if effort is None:
+        effort = os.environ.get('SILHOUETTE_ENCODE_EFFORT', DEFAULT_EFFORT)
+    return max(0, min(9, int(effort)))
+
+
+def _unique_pixels(pixels):
+    """
+    Distinct values of a pixel array, as the palette lookup for encoding.
+    
+    Channels are packed into one integer per pixel, so a single np.unique
+    covers every mode.
+    
+    Returns:
+        tuple: (distinct pixel rows, index of each pixel into them)
+    """
+    height, width, channels = pixels.shape
+    packed = np.zeros((height, width), dtype=np.uint32)
+    for channel in range(channels):
+        packed = (packed << 8) | pixels[:, :, channel]
+    values, indices = np.unique(packed.ravel(), return_inverse=True)
+    
+    rows = np.empty((len(values), channels), dtype=np.uint8)
+    for channel in range(channels):
+        rows[:, channels - 1 - channel] = (values >> (8 * channel)) & 0xFF
+    return rows, indices.reshape(height, width)
+
+
+def analyze_image(img):
+    """
+    Describe the distinct values of an image.
+    
+    Args:
+        img (PIL.Image): Image to inspect
+    
+    Returns:
+        dict: {'kind': 'gray', 'alpha', 'gray_alpha' or 'color',
+               'has_alpha': whether any pixel is not fully opaque,
+               'colors': number of distinct pixel values,
+               'palette': distinct (R, G, B, A) rows when there are at most 256, else None,
+               'indices': palette index of every pixel (with 'palette')}
+    """
+    pixels = np.asarray(img.convert('RGBA'))
+    rgb = pixels[:, :, :3]
+    alpha = pixels[:, :, 3]
+    
+    # Color hidden under fully transparent pixels is never seen
+    visible = alpha > 0
+    has_alpha = not visible.all() or (alpha < 255).any()
+    if has_alpha:
+        pixels = pixels.copy()
+        pixels[~visible] = 0
+        rgb = pixels[:, :, :3]
+    
+    gray = bool((rgb[:, :, 0] == rgb[:, :, 1]).all() and (rgb[:, :, 1] == rgb[:, :, 2]).all())
+    shown = rgb[visible]
+    single_color = len(shown) == 0 or bool((shown == shown[0]).all())
+    if has_alpha and single_color:
+        kind = 'alpha'
+    elif has_alpha:
+        kind = 'gray_alpha' if gray else 'color'
+    else:
+        kind = 'gray' if gray else 'color'
+    
+    # Analyse only the channels that vary
+    channels = {'gray': [0], 'alpha': [3], 'gray_alpha': [0, 3]}.get(kind, [0, 1, 2, 3] if has_alpha else [0, 1, 2])
+    rows, indices = _unique_pixels(np.ascontiguousarray(pixels[:, :, channels]))
+    
+    palette = None
+    if len(rows) <= MAX_PALETTE:
+        palette = np.empty((len(rows), 4), dtype=np.uint8)
+        if kind == 'gray':
+            palette[:, :3] = rows
+            palette[:, 3] = 255
+        elif kind == 'alpha':
+            palette[:, :3] = shown[0] if len(shown) else 0
+            palette[:, 3] = rows[:, 0]
+        elif kind == 'gray_alpha':
+            palette[:, :3] = rows[:, :1]
+            palette[:, 3] = rows[:, 1]
+        else:
+            palette[:, :len(channels)] = rows
+            if not has_alpha:
+                palette[:, 3] = 255
+    
+    return {
+        'kind': kind,
+        'has_alpha': has_alpha,
+        'colors': len(rows),
+        'palette': palette,
+        'indices': indices if palette is not None else None,
+    }
+
+
+def quantize_image(img, colors):
+    """
+    Reduce an image to at most `colors` colors (lossy), keeping its alpha.
+    
+    For photographic or noisy inputs, where every pixel differs slightly and
+    no exact compact mode applies.
+    """
+    quantized = img.convert('RGBA').quantize(colors=max(2, min(MAX_PALETTE, colors)),
+                                             method=Image.Quantize.FASTOCTREE)
+    return quantized.convert('RGBA')
+
+
+def compact_image(img):
+    """
+    Convert an image to the smallest PNG mode that stores it exactly.
+    
+    Returns:
+        tuple: (PIL.Image in mode '1', 'P', 'L', 'LA', 'RGB' or 'RGBA', short description)
+    """
+    info = analyze_image(img)
+    kind, palette = info['kind'], info['palette']
+    
+    if palette is None:
+        mode = {'gray': 'L', 'gray_alpha': 'LA', 'alpha': 'LA'}.get(kind, 'RGBA' if info['has_alpha'] else 'RGB')
+        return img.convert(mode), f"{mode}, {info['colors']} values"
+    
+    if kind == 'gray' and palette[:, 0].tolist() in ([0, 255], [0], [255]):
+        bilevel = Image.fromarray(palette[info['indices'], 0] == 255)
+        return bilevel, "1-bit"
+    
+    indexed = Image.fromarray(info['indices'].astype(np.uint8), 'P')
+    indexed.putpalette(palette[:, :3].tobytes())
+    if (palette[:, 3] < 255).any():
+        indexed.info['transparency'] = palette[:, 3].tobytes()
+    bits = next(bits for bits in (1, 2, 4, 8) if len(palette) <= 1 << bits)
+    return indexed, f"{bits}-bit palette ({kind}, {len(palette)} colors)"
+
+
+def encode_compact(img, output_format='PNG', effort=None, colors=None):
+    """
+    Encode an image as compactly as its content allows.
+    
+    Args:
+        img (PIL.Image): Image to encode
+        output_format (str): 'PNG' or 'WEBP'; other formats are saved as PIL writes them
+        effort (int): Encoding effort 0-9 (default: SILHOUETTE_ENCODE_EFFORT or 6)
+        colors (int): Quantize to at most this many colors first (lossy), None for exact
+    
+    Returns:
+        tuple: (encoded bytes, short description of the chosen encoding)
+    """
+    effort = get_effort(effort)
+    output_format = output_format.upper()
+    if colors:
+        img = quantize_image(img, colors)
+    
+    buffer = io.BytesIO()
+    if output_format == 'PNG':
+        compact, description = compact_image(img)
+        save_options = {'compress_level': effort, 'optimize': effort >= 9}
+        if 'transparency' in compact.info:
+            save_options['transparency'] = compact.info['transparency']
+        compact.save(buffer, format='PNG', **save_options)
+    elif output_format == 'WEBP':
+        info = analyze_image(img)
+        if info['kind'] == 'alpha':
+            # Only the alpha plane matters; exact=False lets the encoder drop hidden colors
+            description = 'lossless WebP (alpha only)'
+        else:
+            description = f"lossless WebP ({info['kind']}, {info['colors']} colors)"
+        webp_img = img.convert('RGBA' if info['has_alpha'] else 'RGB')
+        webp_img.save(buffer, format='WEBP', lossless=True, exact=False,
+                      method=round(effort * 6 / 9), quality=round(effort * 100 / 9))
+    else:
+        img.save(buffer, format=output_format)
+        description = output_format
+    return buffer.getvalue(), description
+
+
+def collect_images(inputs):
+    """Expand files, directories (recursively) and glob patterns into image paths."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for dirpath, _, filenames in os.walk(item):
+                paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames)
+                             if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS)
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            paths.extend(sorted(glob.glob(item)))
+    return paths
+
+
+def reencode_file(input_path, output_path=None, output_format='PNG', effort=None, colors=None):
+    """
+    Re-encode one image file, writing it only when output_path is given.
+    
+    Returns:
+        dict: {'path', 'before', 'after', 'encoding', 'error'}
+    """
+    result = {'path': input_path, 'before': 0, 'after': 0, 'encoding': None, 'error': None}
+    try:
+        result['before'] = os.path.getsize(input_path)
+        with Image.open(input_path) as img:
+            img.load()
+            data, result['encoding'] = encode_compact(img, output_format, effort, colors)
+        result['after'] = len(data)
+        
+        if output_path:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            with open(output_path, 'wb') as output_file:
+                output_file.write(data)
+    except Exception as e:
+        result['error'] = str(e)
+    return result
+
+
+def _reencode_job(job):
+    return reencode_file(*job)
+
+
+def reencode_paths(paths, output_dir=None, output_format='PNG', effort=None, colors=None, workers=None):
+    """
+    Re-encode many images in parallel.
+    
+    Outputs mirror the inputs' file names in output_dir with the new
+    extension; without output_dir nothing is written and only sizes are measured.
+    
+    Returns:
+        list: Results from reencode_file, in input order
+    """
+    extension = '.webp' if output_format.upper() == 'WEBP' else '.png'
+    jobs = []
+    for path in paths:
+        output_path = None
+        if output_dir:
+            output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + extension)
+        jobs.append((path, output_path, output_format, get_effort(effort), colors))
+    
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(jobs) < 4:
+        return [_reencode_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_reencode_job, jobs, chunksize=max(1, len(jobs) // (workers * 4))))
+
+
+def _format_size(size):
+    """Format a byte count as KB or MB."""
+    if size >= 1024 * 1024:
+        return f"{size / (1024 * 1024):.1f}MB"
+    return f"{size / 1024:.1f}KB"
+
+
+def print_report(results, verbose=True):
+    """Print per-file and corpus totals of bytes saved."""
+    encoded = [result for result in results if not result['error']]
+    if verbose:
+        for result in encoded:
+            saved = 1 - result['after'] / result['before'] if result['before'] else 0
+            print(f"{os.path.basename(result['path'])}: {_format_size(result['before'])} -> "
+                  f"{_format_size(result['after'])} ({saved:.0%} saved, {result['encoding']})")
+    for result in results:
+        if result['error']:
+            print(f"Error: {result['path']}: {result['error']}")
+    
+    before = sum(result['before'] for result in encoded)
+    after = sum(result['after'] for result in encoded)
+    if not encoded:
+        return
+    ratio = before / after if after else float('inf')
+    print(f"\n{len(encoded)} image(s): {_format_size(before)} -> {_format_size(after)}, "
+          f"saved {_format_size(before - after)} ({1 - after / before:.1%}, {ratio:.1f}x smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-encode silhouettes in their most compact form')
+    parser.add_argument('inputs', nargs='+', help='Image files, directories or glob patterns')
+    parser.add_argument('-o', '--output-dir', default=None,
+                        help='Write re-encoded images here (default: only report sizes)')
+    parser.add_argument('--format', choices=['png', 'webp'], default='png', help='Output format (default: png)')
+    parser.add_argument('--effort', type=int, default=None,
+                        help='Encoding effort 0-9 (default: SILHOUETTE_ENCODE_EFFORT or 6)')
+    parser.add_argument('--colors', type=int, default=DEFAULT_COLORS,
+                        help=f'Quantize to at most this many colors first (lossy; default: {DEFAULT_COLORS})')
+    parser.add_argument('--exact', action='store_true',
+                        help='Do not quantize; keep every pixel exactly (much larger for noisy images)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--quiet', action='store_true', help='Only print corpus totals')
+    
+    args = parser.parse_args()
+    
+    paths = collect_images(args.inputs)
+    if not paths:
+        print("Error: No input images found.")
+        sys.exit(1)
+    
+    colors = None if args.exact else args.colors
+    
+    start_time = time.perf_counter()
+    results = reencode_paths(paths, args.output_dir, args.format, args.effort, colors, args.workers)
+    elapsed = time.perf_counter() - start_time
+    
+    print_report(results, verbose=not args.quiet)
+    mode = f"quantized to at most {colors} colors (lossy; --exact to keep pixels)" if colors else "exact"
+    print(f"Encoded in {elapsed:.1f}s, {mode}")
+    
+    if any(result['error'] for result in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,16 +10,93 @@ Requirements:
 
 Usage:
 python silhouette_generator.py input_image.jpg output_silhouette.png
+python silhouette_generator.py input_image.jpg output_silhouette.svg   # traced vector output
+
+Batch usage (directories, globs or several files into an output directory):
+python silhouette_generator.py ../images/png output_dir --workers 4
+python silhouette_generator.py "photos/*.jpg" output_dir
 """
 
 import sys
 import os
 import io
+import glob
+import time
+import contextlib
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from PIL import Image, ImageOps, ImageFilter
 import numpy as np
-from rembg import remove
+from rembg import remove, new_session
 from scipy import ndimage
 import argparse
+from pathlib import Path
+from silhouette_cache import SilhouetteCache, get_default_cache
+from silhouette_vector import image_to_svg
+from silhouette_encoding import encode_compact, get_effort
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
+
+DEFAULT_REMBG_MODEL = os.environ.get('SILHOUETTE_REMBG_MODEL', 'u2net')
+
+# rembg sessions keyed by model name, created on first use and shared process-wide
+_rembg_sessions = {}
+_rembg_sessions_lock = threading.Lock()
+
+# Observers of per-stage pipeline timings (see add_stage_hook)
+_stage_hooks = []
+_stage_hooks_lock = threading.Lock()
+_sample_memory = os.environ.get('SILHOUETTE_SAMPLE_MEMORY', '') not in ('', '0')
+
+
+def get_rembg_session(model_name=None):
+    """
+    Return the shared rembg segmentation session, creating it on first use.
+    
+    Loading the ONNX model is the expensive part of background removal, so
+    the session is created once per process and reused by every caller. The
+    underlying onnxruntime InferenceSession supports concurrent run() calls,
+    so the same session can be used from several threads at once.
+    
+    Args:
+        model_name (str): rembg model name (default: SILHOUETTE_REMBG_MODEL or 'u2net')
+    
+    Returns:
+        rembg session object
+    """
+    model_name = model_name or DEFAULT_REMBG_MODEL
+    session = _rembg_sessions.get(model_name)
+    if session is None:
+        with _rembg_sessions_lock:
+            session = _rembg_sessions.get(model_name)
+            if session is None:
+                print(f"Loading background removal model '{model_name}'...")
+                session = new_session(model_name)
+                _rembg_sessions[model_name] = session
+    return session
+
+
+def preload_rembg_session(model_name=None):
+    """
+    Create the shared rembg session in a background thread.
+    
+    Entry points call this at start-up so the model is loading while the
+    user is still choosing a file; the first image then only pays inference.
+    
+    Returns:
+        threading.Thread: The (daemon) loader thread
+    """
+    def load():
+        try:
+            get_rembg_session(model_name)
+        except Exception as e:
+            print(f"Warning: Could not preload background removal model: {e}")
+    
+    thread = threading.Thread(target=load, daemon=True)
+    thread.start()
+    return thread
 
 
 def crop_to_subject(img, padding=10, min_size=50):
@@ -85,22 +162,205 @@ def crop_to_subject(img, padding=10, min_size=50):
         
         print(f"Cropped from {width}x{height} to {cropped.width}x{cropped.height}")
         return cropped
-        
+    
     except Exception as e:
         print(f"Warning: Cropping failed ({str(e)}), returning original image")
         return img
 
 
-def apply_silhouette_filter(img, background_color='white', smooth_edges=True, blur_radius=1, vector_style=True):
+# Connected blobs smaller than this (in pixels) are treated as noise in vector style
+NOISE_MIN_AREA = 16
+
+# Three Gaussian passes of sigma r, r/2 and r/4 compose into one of r * sqrt(21) / 4
+SOFT_SIGMA_FACTOR = np.sqrt(1 + 1 / 4 + 1 / 16)
+
+VECTOR_ALPHA_THRESHOLD = 76  # alpha > 0.3 * 255
+VECTOR_ANTIALIAS_SIGMA = 0.3
+
+
+def _silhouette_halo(smooth_edges, blur_radius, vector_style, transparent):
+    """
+    Return how far (in pixels) the silhouette filter can move information.
+    
+    A tile processed with at least this much surrounding context produces
+    exactly the same pixels as processing the whole image at once.
+    """
+    def gaussian_reach(sigma):
+        # scipy.ndimage truncates Gaussian kernels at 4 sigma
+        return int(4.0 * sigma + 0.5)
+    
+    if smooth_edges and not vector_style:
+        halo = gaussian_reach(blur_radius * SOFT_SIGMA_FACTOR)
+        if blur_radius > 0:
+            # PIL GaussianBlur (three box passes) and SMOOTH_MORE/SMOOTH kernels
+            halo += (4 * 2 + 2) + (4 * 1 + 2) if transparent else 2 + 1
+        return halo
+    if vector_style:
+        # A noise blob cut by the tile edge must still look bigger than
+        # NOISE_MIN_AREA, then closing (2) + opening (2), anti-alias blur, SMOOTH
+        return NOISE_MIN_AREA + 4 + gaussian_reach(VECTOR_ANTIALIAS_SIGMA) + (0 if transparent else 1)
+    return 0
+
+
+def _erode_cross(mask):
+    """Binary erosion by the 3x3 cross, treating outside pixels as 0 (like scipy)."""
+    eroded = mask.copy()
+    eroded[1:, :] &= mask[:-1, :]
+    eroded[:-1, :] &= mask[1:, :]
+    eroded[:, 1:] &= mask[:, :-1]
+    eroded[:, :-1] &= mask[:, 1:]
+    eroded[[0, -1], :] = False
+    eroded[:, [0, -1]] = False
+    return eroded
+
+
+def _dilate_cross(mask):
+    """Binary dilation by the 3x3 cross, treating outside pixels as 0 (like scipy)."""
+    dilated = mask.copy()
+    dilated[1:, :] |= mask[:-1, :]
+    dilated[:-1, :] |= mask[1:, :]
+    dilated[:, 1:] |= mask[:, :-1]
+    dilated[:, :-1] |= mask[:, 1:]
+    return dilated
+
+
+def _remove_small_blobs(mask, min_area):
+    """Drop 8-connected components of a bool mask smaller than min_area pixels."""
+    structure = np.ones((3, 3), dtype=bool)
+    try:
+        # 16-bit labels halve the memory of the label image when they fit
+        labels = np.empty(mask.shape, dtype=np.uint16)
+        count = ndimage.label(mask, structure=structure, output=labels)
+    except RuntimeError:
+        labels, count = ndimage.label(mask, structure=structure)
+    if count == 0:
+        return mask
+    areas = np.bincount(labels.ravel(), minlength=count + 1)
+    keep = areas >= min_area
+    keep[0] = False  # Background label
+    return keep[labels]
+
+
+def _antialias_binary_mask(mask, transparent):
+    """
+    Gaussian anti-aliasing (sigma VECTOR_ANTIALIAS_SIGMA) of a bool mask, in integers.
+    
+    The kernel only reaches one pixel, so each output depends on a 3x3 block
+    of bits. Each row of three bits is summarised as a 0-5 code (centre bit
+    times 3 plus the two neighbours), and the three row codes index a
+    216-entry table of precomputed output values. No float image is
+    allocated. Edges are mirrored like scipy's default 'reflect' mode.
+    """
+    sigma = VECTOR_ANTIALIAS_SIGMA
+    weights = np.exp(-0.5 * (np.array([1.0, 0.0]) / sigma) ** 2)
+    side, centre = weights / (2 * weights[0] + weights[1])
+    
+    codes = np.arange(6)
+    row_values = (codes // 3) * centre + (codes % 3) * side
+    up, mid, down = np.meshgrid(row_values, row_values, row_values, indexing='ij')
+    coverage = (up + down) * side + mid * centre
+    if transparent:
+        table = (coverage * 255).astype(np.uint8).ravel()
+    else:
+        table = (255 * (1 - coverage)).astype(np.uint8).ravel()
+    
+    bits = np.pad(mask.view(np.uint8), 1, mode='symmetric')
+    row_codes = bits[:, 1:-1] * np.uint8(3)
+    row_codes += bits[:, :-2]
+    row_codes += bits[:, 2:]
+    
+    index = row_codes[:-2] * np.uint8(36)
+    index += row_codes[1:-1] * np.uint8(6)
+    index += row_codes[2:]
+    return table[index]
+
+
+def _filter_alpha_tile(alpha_channel, smooth_edges, blur_radius, vector_style, transparent):
+    """
+    Run the silhouette filter on one block of the alpha channel.
+    
+    Masks stay uint8/bool throughout; only the soft style allocates a
+    floating point buffer (a single float32 image for its Gaussian).
+    
+    Args:
+        alpha_channel (np.ndarray): uint8 alpha values
+    
+    Returns:
+        np.ndarray: uint8 output channel - the alpha channel for a transparent
+            background, or the gray level for a white background
+    """
+    if smooth_edges and not vector_style:
+        # One Gaussian equivalent to the soft r, r/2, r/4 passes
+        coverage = ndimage.gaussian_filter(
+            alpha_channel, sigma=blur_radius * SOFT_SIGMA_FACTOR, output=np.float32
+        )
+        
+        # coverage is opacity on a 0-255 scale: use it as alpha, or invert it
+        # into a white-to-black gray level (in place, to avoid another buffer)
+        if not transparent:
+            np.subtract(255, coverage, out=coverage)
+        channel = coverage.astype(np.uint8)
+    elif vector_style:
+        # Create clean, sharp edges for vector-like appearance
+        binary_mask = alpha_channel > VECTOR_ALPHA_THRESHOLD
+        
+        # Labeling removes isolated noise blobs, closing fills small gaps
+        # (preserving arm gaps), and one opening trims single-pixel spurs
+        binary_mask = _remove_small_blobs(binary_mask, NOISE_MIN_AREA)
+        binary_mask = _erode_cross(_dilate_cross(binary_mask))  # closing
+        binary_mask = _dilate_cross(_erode_cross(binary_mask))  # opening
+        
+        # Minimal gaussian blur for anti-aliasing only
+        channel = _antialias_binary_mask(binary_mask, transparent)
+    else:
+        # Original hard-edge method
+        channel = np.where(alpha_channel > 0, np.uint8(255), np.uint8(0))
+        if not transparent:
+            channel = 255 - channel
+    
+    # Additional smoothing with PIL filters if requested. The silhouette is
+    # black (or gray) everywhere, so filtering this one channel gives the same
+    # pixels as filtering the full RGB/RGBA image.
+    channel_img = None
+    if smooth_edges and blur_radius > 0 and not vector_style:
+        channel_img = Image.fromarray(channel, 'L')
+        if transparent:
+            # Apply multiple blur passes for even smoother edges
+            channel_img = channel_img.filter(ImageFilter.GaussianBlur(radius=1.5))
+            channel_img = channel_img.filter(ImageFilter.GaussianBlur(radius=0.8))
+        else:
+            # Apply multiple anti-aliasing filters
+            channel_img = channel_img.filter(ImageFilter.SMOOTH_MORE)
+            channel_img = channel_img.filter(ImageFilter.SMOOTH)
+    elif vector_style and not transparent:
+        # Minimal anti-aliasing for vector-style edges
+        channel_img = Image.fromarray(channel, 'L').filter(ImageFilter.SMOOTH)
+    
+    return channel if channel_img is None else np.asarray(channel_img)
+
+
+def apply_silhouette_filter(img, background_color='white', smooth_edges=True, blur_radius=1, vector_style=True, tile_size=None, memmap_dir=None):
     """
     Apply silhouette filter and edge smoothing to an image with transparent background.
     
+    With tile_size set, the image is filtered in square tiles, each read with
+    enough surrounding context (halo) that the result is identical to
+    whole-image processing, so the filter's working buffers depend on the
+    tile size rather than the image size. The result is written tile by tile
+    into one output buffer; with memmap_dir set as well, that buffer is a
+    memory-mapped temporary file in that directory. A transparent result is
+    returned as a view of the buffer, so it adds no full-size image in RAM;
+    a white-background result is RGB, which Pillow cannot map onto an
+    external buffer, so it costs one full-size in-memory image.
+    
     Args:
         img (PIL.Image): Input image (should be RGBA with transparent background)
         background_color (str): Background color ('white' or 'transparent')
         smooth_edges (bool): Whether to smooth the edges of the silhouette
         blur_radius (int): Radius for edge smoothing blur (1-8)
         vector_style (bool): Whether to create clean vector-like edges
+        tile_size (int): Tile edge in pixels for tiled processing, or None for whole image
+        memmap_dir (str): Directory for a memory-mapped output buffer (tiled mode)
     
     Returns:
         PIL.Image: Silhouette image
@@ -108,92 +368,451 @@ def apply_silhouette_filter(img, background_color='white', smooth_edges=True, bl
     try:
         print("Applying silhouette filter...")
         
-        # Convert image to numpy array for easier manipulation
-        img_array = np.array(img)
-        
-        # Create mask from alpha channel
-        alpha_channel = img_array[:, :, 3]
-        
         if smooth_edges and not vector_style:
             print("Smoothing edges...")
-            # Create a softer alpha mask with gradient edges
-            alpha_mask = alpha_channel.astype(float) / 255.0
-            
-            # Apply multiple gaussian blur passes for ultra-smooth edges
-            alpha_mask = ndimage.gaussian_filter(alpha_mask, sigma=blur_radius)
-            alpha_mask = ndimage.gaussian_filter(alpha_mask, sigma=blur_radius/2)  # Second pass
-            alpha_mask = ndimage.gaussian_filter(alpha_mask, sigma=blur_radius/4)  # Third pass
         elif vector_style:
             print("Creating vector-style edges...")
-            # Create clean, sharp edges for vector-like appearance
-            alpha_mask = alpha_channel.astype(float) / 255.0
-            
-            # Apply morphological operations for clean edges (but preserve important gaps)
-            from scipy.ndimage import binary_erosion, binary_dilation, binary_opening, binary_closing
-            
-            # Create binary mask with higher threshold to preserve details
-            binary_mask = alpha_mask > 0.3
-            
-            # Use opening/closing instead of fill_holes to preserve arm gaps
-            # Opening removes small noise, closing fills small gaps
-            binary_mask = binary_opening(binary_mask, iterations=1)
-            binary_mask = binary_closing(binary_mask, iterations=1)
-            
-            # Very minimal erosion/dilation to clean edges without losing details
-            binary_mask = binary_erosion(binary_mask, iterations=1)
-            binary_mask = binary_dilation(binary_mask, iterations=1)
-            
-            # Convert back to float mask
-            alpha_mask = binary_mask.astype(float)
-            
-            # Apply minimal gaussian blur for anti-aliasing only
-            alpha_mask = ndimage.gaussian_filter(alpha_mask, sigma=0.3)
-        else:
-            # Original hard-edge method
-            alpha_mask = (alpha_channel > 0).astype(float)
         
-        # Create silhouette based on background preference
-        if background_color.lower() == 'transparent':
-            # Keep transparent background with soft edges
-            silhouette = np.zeros((img_array.shape[0], img_array.shape[1], 4), dtype=np.uint8)
-            # Create gradient from transparent to black
-            silhouette[:, :, 3] = (alpha_mask * 255).astype(np.uint8)  # Alpha channel
-            # Black color where alpha > 0 (adjust threshold based on style)
-            threshold = 0.05 if not vector_style else 0.1  # Lower threshold for vector style to preserve details
-            black_mask = alpha_mask > threshold
-            silhouette[black_mask, 0:3] = 0  # RGB to black
-            silhouette_img = Image.fromarray(silhouette, 'RGBA')
-        else:
-            # White background with soft black silhouette
-            silhouette = np.ones((img_array.shape[0], img_array.shape[1], 3), dtype=np.uint8) * 255
-            # Apply gradient blend from white to black
-            for i in range(3):  # RGB channels
-                silhouette[:, :, i] = (255 * (1 - alpha_mask)).astype(np.uint8)
-            silhouette_img = Image.fromarray(silhouette, 'RGB')
+        transparent = background_color.lower() == 'transparent'
+        width, height = img.size
+        tiled = tile_size and (width > tile_size or height > tile_size)
         
-        # Additional smoothing with PIL filters if requested
-        if smooth_edges and blur_radius > 0 and not vector_style:
-            if background_color.lower() == 'transparent':
-                # Apply multiple blur passes for even smoother edges
-                silhouette_img = silhouette_img.filter(ImageFilter.GaussianBlur(radius=1.5))
-                silhouette_img = silhouette_img.filter(ImageFilter.GaussianBlur(radius=0.8))
-            else:
-                # Apply multiple anti-aliasing filters
-                silhouette_img = silhouette_img.filter(ImageFilter.SMOOTH_MORE)
-                silhouette_img = silhouette_img.filter(ImageFilter.SMOOTH)
-        elif vector_style:
-            # Minimal anti-aliasing for vector-style edges
-            if background_color.lower() != 'transparent':
-                silhouette_img = silhouette_img.filter(ImageFilter.SMOOTH)
+        # A black silhouette on a transparent background only needs its alpha
+        # plane written; a white background needs one gray level per pixel
+        shape = (height, width, 4) if transparent else (height, width)
+        if tiled and memmap_dir:
+            backing_file = tempfile.TemporaryFile(dir=memmap_dir)
+            output = np.memmap(backing_file, dtype=np.uint8, mode='w+', shape=shape)
+        else:
+            output = np.zeros(shape, dtype=np.uint8)
+        channel = output[..., 3] if transparent else output
         
-        return silhouette_img
+        if not tiled:
+            channel[:] = _filter_alpha_tile(np.asarray(img.getchannel('A')), smooth_edges, blur_radius,
+                                            vector_style, transparent)
+        else:
+            halo = _silhouette_halo(smooth_edges, blur_radius, vector_style, transparent)
+            
+            for top in range(0, height, tile_size):
+                for left in range(0, width, tile_size):
+                    bottom = min(height, top + tile_size)
+                    right = min(width, left + tile_size)
+                    
+                    # Read the tile with its halo, clipped to the image
+                    outer = (max(0, left - halo), max(0, top - halo),
+                             min(width, right + halo), min(height, bottom + halo))
+                    tile = _filter_alpha_tile(
+                        np.asarray(img.crop(outer).getchannel('A')),
+                        smooth_edges, blur_radius, vector_style, transparent
+                    )
+                    channel[top:bottom, left:right] = tile[top - outer[1]:bottom - outer[1],
+                                                           left - outer[0]:right - outer[0]]
         
+        if transparent:
+            # Black silhouette on a transparent background, sharing the output buffer
+            return Image.frombuffer('RGBA', (width, height), output, 'raw', 'RGBA', 0, 1)
+        # White background with soft black silhouette
+        channel_img = Image.frombuffer('L', (width, height), output, 'raw', 'L', 0, 1)
+        return Image.merge('RGB', (channel_img, channel_img, channel_img))
+    
     except Exception as e:
         print(f"Error applying silhouette filter: {str(e)}")
         return img
 
 
-def create_silhouette(input_path, output_path, background_color='white', smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False, padding=10):
+def refine_mask_edges(small_mask, small_guide, guide, radius=2, eps=1e-3):
+    """
+    Upsample a low-resolution alpha mask, refining it against the full-size image.
+    
+    This is a fast guided filter (He & Sun): the linear coefficients that map
+    the grayscale guide to the mask are solved at low resolution, upsampled,
+    and applied to the full-resolution guide. Only a band of pixels around
+    the mask boundary is evaluated at full size; everywhere else the
+    bilinearly upsampled mask is used unchanged.
+    
+    Args:
+        small_mask (np.ndarray): uint8 alpha mask at inference resolution
+        small_guide (np.ndarray): uint8 grayscale image at inference resolution
+        guide (np.ndarray): uint8 grayscale image at full resolution
+        radius (int): Filter radius in low-resolution pixels, also the band half-width
+        eps (float): Regularisation; larger values follow the mask more than the guide
+    
+    Returns:
+        np.ndarray: uint8 alpha mask at full resolution
+    """
+    full_size = (guide.shape[1], guide.shape[0])
+    mask = np.array(Image.fromarray(small_mask, 'L').resize(full_size, Image.BILINEAR))
+    
+    size = 2 * radius + 1
+    I = small_guide.astype(np.float32) / 255.0
+    p = small_mask.astype(np.float32) / 255.0
+    
+    # Boundary band: pixels whose neighbourhood contains both subject and background
+    local_mean = ndimage.uniform_filter((p > 0.5).astype(np.float32), size)
+    small_band = (local_mean > 0.0) & (local_mean < 1.0)
+    if not small_band.any():
+        return mask
+    
+    mean_I = ndimage.uniform_filter(I, size)
+    mean_p = ndimage.uniform_filter(p, size)
+    cov_Ip = ndimage.uniform_filter(I * p, size) - mean_I * mean_p
+    var_I = ndimage.uniform_filter(I * I, size) - mean_I * mean_I
+    
+    a = cov_Ip / (var_I + eps)
+    b = mean_p - a * mean_I
+    mean_a = ndimage.uniform_filter(a, size)
+    mean_b = ndimage.uniform_filter(b, size)
+    
+    band = np.array(Image.fromarray(small_band.astype(np.uint8) * 255, 'L').resize(full_size, Image.NEAREST)) > 0
+    ys, xs = np.nonzero(band)
+    
+    # Bilinear lookup of the coefficients at band pixels only (pixel-centre aligned)
+    coords = np.stack([
+        (ys + 0.5) * (small_mask.shape[0] / guide.shape[0]) - 0.5,
+        (xs + 0.5) * (small_mask.shape[1] / guide.shape[1]) - 0.5,
+    ]).astype(np.float32)
+    A = ndimage.map_coordinates(mean_a, coords, order=1, mode='nearest')
+    B = ndimage.map_coordinates(mean_b, coords, order=1, mode='nearest')
+    
+    q = A * (guide[ys, xs].astype(np.float32) / 255.0) + B
+    mask[ys, xs] = np.clip(q * 255.0 + 0.5, 0, 255).astype(np.uint8)
+    return mask
+
+
+def remove_background(img, inference_size=None):
+    """
+    Remove the background with rembg, optionally segmenting a downscaled copy.
+    
+    With inference_size set, the model sees a copy whose long edge is at most
+    inference_size pixels, and the mask is brought back to full size with
+    refine_mask_edges. rembg's models work at a few hundred pixels internally
+    anyway, so around 1024 loses little quality while skipping rembg's
+    full-resolution resizing and compositing.
+    
+    Args:
+        img (PIL.Image): Input image
+        inference_size (int): Target long edge for segmentation, or None for full size
+    
+    Returns:
+        PIL.Image: RGBA image with the background made transparent
+    """
+    session = get_rembg_session()
+    
+    if not inference_size or max(img.size) <= inference_size:
+        return remove(img, session=session).convert('RGBA')
+    
+    scale = inference_size / max(img.size)
+    small_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    rgba = img.convert('RGBA')
+    small = rgba.convert('RGB').resize(small_size, Image.BILINEAR, reducing_gap=2.0)
+    
+    small_mask = np.array(remove(small, session=session, only_mask=True).convert('L'))
+    mask = refine_mask_edges(small_mask, np.array(small.convert('L')), np.array(img.convert('L')))
+    
+    rgba.putalpha(Image.fromarray(mask, 'L'))
+    return rgba
+
+
+def load_image(source):
+    """
+    Decode an image from any of the inputs the pipeline accepts.
+    
+    Args:
+        source: Encoded image bytes, a readable binary file object, a numpy
+            array (HxW, HxWx3 or HxWx4 uint8), a PIL.Image or a file path
+    
+    Returns:
+        PIL.Image: Decoded image (fully loaded, no open file handles)
+    """
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, np.ndarray):
+        return Image.fromarray(source)
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source = io.BytesIO(source)
+    
+    img = Image.open(source)
+    img.load()
+    return img
+
+
+def _source_fingerprint(source):
+    """
+    Return bytes identifying a pipeline source, plus the source to decode.
+    
+    Files and streams are read into memory once, so the same bytes are used
+    both for the cache key and for decoding.
+    
+    Returns:
+        tuple: (fingerprint bytes, source to pass to load_image)
+    """
+    if isinstance(source, Image.Image):
+        header = f"{source.mode}:{source.size}".encode('utf-8')
+        return header + source.tobytes(), source
+    if isinstance(source, np.ndarray):
+        header = f"{source.dtype}:{source.shape}".encode('utf-8')
+        return header + np.ascontiguousarray(source).tobytes(), source
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source), source
+    if hasattr(source, 'read'):
+        data = source.read()
+        return data, data
+    
+    with open(source, 'rb') as input_file:
+        data = input_file.read()
+    return data, data
+
+
+def _resolve_cache(cache):
+    """Map the pipeline's cache argument to a SilhouetteCache or None."""
+    if cache is True:
+        return get_default_cache()
+    if isinstance(cache, SilhouetteCache):
+        return cache
+    return None
+
+
+def _format_for_path(path):
+    """Return the output format implied by a file extension: 'SVG' or a PIL format name (default PNG)."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.svg':
+        return 'SVG'
+    return Image.registered_extensions().get(extension, 'PNG')
+
+
+def encode_image(img, output_format='PNG'):
+    """
+    Encode a PIL image to bytes.
+    
+    'SVG' traces the silhouette into vector contours (see silhouette_vector).
+    PNG and WebP are stored in the most compact exact mode for the image's
+    distinct values (1-bit, palette, alpha-only, ...; see silhouette_encoding).
+    
+    Args:
+        img (PIL.Image): Image to encode
+        output_format (str): 'SVG' or any format PIL can write ('PNG', 'WEBP', ...)
+    
+    Returns:
+        bytes: Encoded image data
+    """
+    if output_format.upper() == 'SVG':
+        return image_to_svg(img)
+    if output_format.upper() in ('PNG', 'WEBP'):
+        return encode_compact(img, output_format)[0]
+    
+    buffer = io.BytesIO()
+    img.save(buffer, format=output_format)
+    return buffer.getvalue()
+
+
+def add_stage_hook(hook):
+    """
+    Register a callable that observes every pipeline stage.
+    
+    After each stage of generate_silhouette ('decode', 'background_removal',
+    'filter', 'crop', 'encode') the hook is called with a dict holding
+    'stage', 'method', 'seconds', 'pixels' and 'failed', plus 'bytes' for
+    'encode' and 'rss_bytes' / 'rss_delta_bytes' when memory sampling is on.
+    Hooks run on the thread that ran the stage and must be thread-safe.
+    
+    Args:
+        hook (callable): Function taking the event dict
+    """
+    with _stage_hooks_lock:
+        if hook not in _stage_hooks:
+            _stage_hooks.append(hook)
+
+
+def remove_stage_hook(hook):
+    """Unregister a hook added with add_stage_hook."""
+    with _stage_hooks_lock:
+        if hook in _stage_hooks:
+            _stage_hooks.remove(hook)
+
+
+def set_memory_sampling(enabled):
+    """Enable or disable RSS sampling around each stage (default: SILHOUETTE_SAMPLE_MEMORY)."""
+    global _sample_memory
+    _sample_memory = bool(enabled)
+
+
+def _rss_bytes():
+    """Current resident set size of this process in bytes, or None if unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+@contextlib.contextmanager
+def _pipeline_stage(stage, method, pixels=0):
+    """
+    Time a pipeline stage and report it to the registered hooks.
+    
+    Yields the event dict so the stage can fill in 'pixels' (and 'bytes')
+    once they are known. Costs nothing beyond a list check when no hooks
+    are registered.
+    """
+    event = {'stage': stage, 'method': method, 'pixels': pixels, 'failed': False}
+    if not _stage_hooks:
+        yield event
+        return
+    
+    rss_before = _rss_bytes() if _sample_memory else None
+    start = time.perf_counter()
+    try:
+        yield event
+    except BaseException:
+        event['failed'] = True
+        raise
+    finally:
+        event['seconds'] = time.perf_counter() - start
+        if _sample_memory:
+            event['rss_bytes'] = _rss_bytes()
+            if rss_before is not None and event['rss_bytes'] is not None:
+                event['rss_delta_bytes'] = event['rss_bytes'] - rss_before
+        
+        with _stage_hooks_lock:
+            hooks = list(_stage_hooks)
+        for hook in hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Warning: Stage hook failed: {e}")
+
+
+class PipelineCancelled(Exception):
+    """Raised by generate_silhouette when its cancel callback asks it to stop."""
+
+
+def generate_silhouette(source, method='auto', background_color='white', threshold=128, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False, padding=10, output_format='PNG', cache=True, inference_size=None, tile_size=None, memmap_dir=None, cancel=None, progress=None):
+    """
+    In-memory silhouette pipeline shared by the CLI, GUI, easy and web front ends.
+    
+    Nothing is written to disk: the source is decoded once, processed as
+    arrays and encoded once. Transparent output is produced directly by the
+    silhouette filter rather than by post-processing a white-background image.
+    
+    Cancellation is cooperative: cancel is polled before each stage, so a
+    cancelled job stops at the next stage boundary without finishing (or
+    caching) its result.
+    
+    Args:
+        source: Image bytes, binary file object, numpy array, PIL.Image or path
+        method (str): 'auto' (rembg) or 'simple' (threshold)
+        background_color (str): Background color ('white' or 'transparent')
+        threshold (int): Brightness threshold for the simple method
+        smooth_edges (bool): Whether to smooth the edges of the silhouette
+        blur_radius (int): Radius for edge smoothing blur (1-8)
+        vector_style (bool): Whether to create clean vector-like edges
+        crop_to_subject_flag (bool): Whether to crop image to subject bounds
+        padding (int): Padding around subject when cropping
+        output_format (str): Encoding for the result ('PNG', 'WEBP', 'SVG', ...), or None to return the image
+        cache: True for the shared on-disk cache, a SilhouetteCache, or False to disable
+        inference_size (int): Segment a copy with this long edge (auto method), None for full size
+        tile_size (int): Filter in tiles of this size to bound memory, None for whole image
+        memmap_dir (str): Directory for memory-mapped filter buffers (with tile_size)
+        cancel (callable): Returns True when the job should stop, checked between stages
+        progress (callable): Called with each stage name ('decode', 'background_removal',
+            'filter', 'crop', 'encode') as the stage starts
+    
+    Returns:
+        bytes or PIL.Image: Encoded silhouette, or the image if output_format is None
+    
+    Raises:
+        PipelineCancelled: If cancel returned True
+    """
+    def checkpoint(stage):
+        if cancel is not None and cancel():
+            raise PipelineCancelled(f"Cancelled before {stage}")
+        if progress is not None:
+            progress(stage)
+    
+    silhouette_cache = _resolve_cache(cache)
+    cache_key = None
+    
+    if silhouette_cache is not None:
+        fingerprint, source = _source_fingerprint(source)
+        cache_key = silhouette_cache.make_key(
+            fingerprint,
+            method=method,
+            model=DEFAULT_REMBG_MODEL if method == 'auto' else None,
+            inference_size=inference_size if method == 'auto' else None,
+            background=background_color,
+            threshold=threshold,
+            smooth_edges=smooth_edges,
+            blur_radius=blur_radius,
+            vector_style=vector_style,
+            crop=crop_to_subject_flag,
+            padding=padding,
+            output_format=output_format or 'PNG',
+            encode_effort=get_effort()
+        )
+        cached_data = silhouette_cache.get(cache_key)
+        if cached_data is not None:
+            print(f"Cache hit ({silhouette_cache.hits} hits, {silhouette_cache.misses} misses)")
+            return load_image(cached_data) if output_format is None else cached_data
+    
+    # Step 1: Decode the input image
+    print("Step 1: Decoding image...")
+    checkpoint('decode')
+    with _pipeline_stage('decode', method) as stage:
+        img = load_image(source)
+        stage['pixels'] = img.width * img.height
+    
+    # Step 2: Remove the background
+    checkpoint('background_removal')
+    with _pipeline_stage('background_removal', method, img.width * img.height):
+        if method == 'auto':
+            print("Step 2: Removing background...")
+            img_with_transparent_bg = remove_background(img, inference_size)
+        else:
+            print("Step 2: Removing background using threshold...")
+            img_with_transparent_bg = img.convert('RGBA')
+            gray_array = np.array(img.convert('L'))
+            img_array = np.array(img_with_transparent_bg)
+            
+            # Opaque where darker than the threshold, transparent elsewhere (background)
+            img_array[:, :, 3] = np.where(gray_array < threshold, 255, 0)
+            img_with_transparent_bg = Image.fromarray(img_array, 'RGBA')
+    print("Background removal completed")
+    
+    # Step 3: Apply silhouette filter and edge smoothing
+    print("Step 3: Applying silhouette filter and edge smoothing...")
+    checkpoint('filter')
+    with _pipeline_stage('filter', method, img.width * img.height):
+        silhouette_img = apply_silhouette_filter(
+            img_with_transparent_bg,
+            background_color=background_color,
+            smooth_edges=smooth_edges,
+            blur_radius=blur_radius,
+            vector_style=vector_style,
+            tile_size=tile_size,
+            memmap_dir=memmap_dir
+        )
+    
+    # Step 4: Crop to subject if requested
+    if crop_to_subject_flag:
+        print("Step 4: Cropping to subject...")
+        checkpoint('crop')
+        with _pipeline_stage('crop', method, silhouette_img.width * silhouette_img.height):
+            silhouette_img = crop_to_subject(silhouette_img, padding=padding)
+    
+    if silhouette_cache is None and output_format is None:
+        return silhouette_img
+    
+    checkpoint('encode')
+    with _pipeline_stage('encode', method, silhouette_img.width * silhouette_img.height) as stage:
+        silhouette_data = encode_image(silhouette_img, output_format or 'PNG')
+        stage['bytes'] = len(silhouette_data)
+    
+    if silhouette_cache is not None:
+        silhouette_cache.put(cache_key, silhouette_data)
+    return silhouette_img if output_format is None else silhouette_data
+
+
+def create_silhouette(input_path, output_path, background_color='white', smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False, padding=10, cache=True, inference_size=None, tile_size=None, memmap_dir=None, cancel=None, progress=None):
     """
     Create a smooth black silhouette from an input image.
     
@@ -206,49 +825,52 @@ def create_silhouette(input_path, output_path, background_color='white', smooth_
         vector_style (bool): Whether to create clean vector-like edges
         crop_to_subject_flag (bool): Whether to crop image to subject bounds
         padding (int): Padding around subject when cropping
+        cache: True for the shared on-disk cache, a SilhouetteCache, or False to disable
+        inference_size (int): Segment a copy with this long edge, None for full size
+        tile_size (int): Filter in tiles of this size to bound memory, None for whole image
+        memmap_dir (str): Directory for memory-mapped filter buffers (with tile_size)
+        cancel (callable): Returns True to stop between pipeline stages (see generate_silhouette)
+        progress (callable): Called with each stage name as it starts
+    
+    Raises:
+        PipelineCancelled: If cancel returned True; nothing is written
     """
     try:
-        # Step 1: Load the input image
-        print(f"Step 1: Loading image: {input_path}")
-        with open(input_path, 'rb') as input_file:
-            input_data = input_file.read()
-        
-        # Step 2: Remove background using rembg
-        print("Step 2: Removing background...")
-        output_data = remove(input_data)
-        
-        # Convert to PIL Image with transparent background
-        img_with_transparent_bg = Image.open(io.BytesIO(output_data)).convert("RGBA")
-        print("Background removal completed")
-        
-        # Step 3: Apply silhouette filter and edge smoothing
-        print("Step 3: Applying silhouette filter and edge smoothing...")
-        silhouette_img = apply_silhouette_filter(
-            img_with_transparent_bg, 
+        print(f"Loading image: {input_path}")
+        silhouette_data = generate_silhouette(
+            input_path,
+            method='auto',
             background_color=background_color,
             smooth_edges=smooth_edges,
             blur_radius=blur_radius,
-            vector_style=vector_style
+            vector_style=vector_style,
+            crop_to_subject_flag=crop_to_subject_flag,
+            padding=padding,
+            output_format=_format_for_path(output_path),
+            cache=cache,
+            inference_size=inference_size,
+            tile_size=tile_size,
+            memmap_dir=memmap_dir,
+            cancel=cancel,
+            progress=progress
         )
         
-        # Step 4: Crop to subject if requested
-        if crop_to_subject_flag:
-            print("Step 4: Cropping to subject...")
-            silhouette_img = crop_to_subject(silhouette_img, padding=padding)
-        
         # Step 5: Save the result
         print(f"Step 5: Saving silhouette: {output_path}")
-        silhouette_img.save(output_path)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(silhouette_data)
         print("Silhouette created successfully!")
         
         return True
-        
+    
+    except PipelineCancelled:
+        raise
     except Exception as e:
         print(f"Error creating silhouette: {str(e)}")
         return False
 
 
-def create_simple_silhouette(input_path, output_path, threshold=128, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False, padding=10, background_color='white'):
+def create_simple_silhouette(input_path, output_path, threshold=128, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False, padding=10, background_color='white', cache=True, tile_size=None, memmap_dir=None, cancel=None, progress=None):
     """
     Alternative method using simple thresholding with edge smoothing.
     
@@ -262,61 +884,253 @@ def create_simple_silhouette(input_path, output_path, threshold=128, smooth_edge
         crop_to_subject_flag (bool): Whether to crop image to subject bounds
         padding (int): Padding around subject when cropping
         background_color (str): Background color ('white' or 'transparent')
+        cache: True for the shared on-disk cache, a SilhouetteCache, or False to disable
+        tile_size (int): Filter in tiles of this size to bound memory, None for whole image
+        memmap_dir (str): Directory for memory-mapped filter buffers (with tile_size)
+        cancel (callable): Returns True to stop between pipeline stages (see generate_silhouette)
+        progress (callable): Called with each stage name as it starts
+    
+    Raises:
+        PipelineCancelled: If cancel returned True; nothing is written
     """
     try:
-        # Step 1: Load the input image
-        print(f"Step 1: Loading image: {input_path}")
-        img = Image.open(input_path)
-        
-        # Step 2: Remove background using threshold method
-        print("Step 2: Removing background using threshold...")
-        gray_img = img.convert('L')
-        
-        # Apply threshold to create binary mask
-        binary_img = gray_img.point(lambda x: 0 if x < threshold else 255, '1')
-        
-        # Create RGBA image with transparent background
-        img_rgba = img.convert('RGBA')
-        img_array = np.array(img_rgba)
-        binary_array = np.array(binary_img)
-        
-        # Set alpha channel based on threshold
-        img_array[:, :, 3] = np.where(binary_array, 0, 255)  # Transparent where binary is white (background)
-        
-        img_with_transparent_bg = Image.fromarray(img_array, 'RGBA')
-        print("Background removal completed")
-        
-        # Step 3: Apply silhouette filter and edge smoothing
-        print("Step 3: Applying silhouette filter and edge smoothing...")
-        silhouette_img = apply_silhouette_filter(
-            img_with_transparent_bg,
+        print(f"Loading image: {input_path}")
+        silhouette_data = generate_silhouette(
+            input_path,
+            method='simple',
             background_color=background_color,
+            threshold=threshold,
             smooth_edges=smooth_edges,
             blur_radius=blur_radius,
-            vector_style=vector_style
+            vector_style=vector_style,
+            crop_to_subject_flag=crop_to_subject_flag,
+            padding=padding,
+            output_format=_format_for_path(output_path),
+            cache=cache,
+            tile_size=tile_size,
+            memmap_dir=memmap_dir,
+            cancel=cancel,
+            progress=progress
         )
         
-        # Step 4: Crop to subject if requested
-        if crop_to_subject_flag:
-            print("Step 4: Cropping to subject...")
-            silhouette_img = crop_to_subject(silhouette_img, padding=padding)
-        
         # Step 5: Save the result
         print(f"Step 5: Saving silhouette: {output_path}")
-        silhouette_img.save(output_path)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(silhouette_data)
         print("Simple silhouette created successfully!")
         
         return True
-        
+    
+    except PipelineCancelled:
+        raise
     except Exception as e:
         print(f"Error creating simple silhouette: {str(e)}")
         return False
 
 
+def collect_batch_jobs(inputs, output_dir, extension='.png'):
+    """
+    Expand input files, directories and glob patterns into (input, output) pairs.
+    
+    Files found under a directory keep their path relative to that directory,
+    so the output tree mirrors the input tree. Inputs that would share an
+    output (x.jpg and x.png side by side) keep their own extension in the
+    output name instead (x.jpg.png and x.png.png).
+    
+    Args:
+        inputs (list): File paths, directory paths or glob patterns
+        output_dir (str): Directory to write silhouettes into
+        extension (str): Output file extension, which selects the format ('.png', '.webp', '.svg')
+    
+    Returns:
+        list: Sorted list of (input_path, output_path) tuples without duplicates
+    
+    Raises:
+        ValueError: If inputs from different places still map to the same output
+    """
+    relatives = {}
+    
+    def add(path, root):
+        if Path(path).suffix.lower() not in IMAGE_EXTENSIONS:
+            return
+        relative = os.path.relpath(path, root) if root else os.path.basename(path)
+        relatives.setdefault(os.path.abspath(path), relative)
+    
+    for pattern in inputs:
+        matches = glob.glob(pattern) if glob.has_magic(pattern) else [pattern]
+        for match in matches:
+            if os.path.isdir(match):
+                for dirpath, _, filenames in os.walk(match):
+                    for filename in filenames:
+                        add(os.path.join(dirpath, filename), match)
+            elif os.path.isfile(match):
+                add(match, None)
+    
+    def output_key(relative):
+        return os.path.normcase(os.path.splitext(relative)[0])
+    
+    shared = {}
+    for relative in relatives.values():
+        shared[output_key(relative)] = shared.get(output_key(relative), 0) + 1
+    
+    jobs = {}
+    outputs = {}
+    for input_path, relative in sorted(relatives.items()):
+        name = relative if shared[output_key(relative)] > 1 else os.path.splitext(relative)[0]
+        output_path = os.path.join(output_dir, name + extension)
+        other = outputs.setdefault(os.path.normcase(output_path), input_path)
+        if other != input_path:
+            raise ValueError(f"'{other}' and '{input_path}' would both be written to '{output_path}'")
+        jobs[input_path] = output_path
+    
+    return sorted(jobs.items())
+
+
+def _init_batch_worker(method):
+    """Process pool initializer: load the rembg model once per worker."""
+    if method == 'auto':
+        get_rembg_session()
+
+
+def _process_batch_item(input_path, output_path, method, options):
+    """Worker entry point for process_batch; returns a result dictionary."""
+    start = time.perf_counter()
+    log = io.StringIO()
+    error = None
+    # Only touch the shared cache when caching is on (--no-cache passes False)
+    cache = _resolve_cache(options['cache'])
+    hits_before = cache.hits if cache is not None else 0
+    
+    try:
+        output_dir = os.path.dirname(output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        
+        # Per-step progress from many workers would interleave, so keep it for the summary
+        with contextlib.redirect_stdout(log):
+            if method == 'auto':
+                success = create_silhouette(
+                    input_path, output_path, options['background'], options['smooth_edges'],
+                    options['blur_radius'], options['vector_style'],
+                    options['crop_to_subject_flag'], options['padding'], cache=cache,
+                    inference_size=options['inference_size'], tile_size=options['tile_size'],
+                    memmap_dir=options['memmap_dir']
+                )
+            else:
+                success = create_simple_silhouette(
+                    input_path, output_path, options['threshold'], options['smooth_edges'],
+                    options['blur_radius'], options['vector_style'],
+                    options['crop_to_subject_flag'], options['padding'], options['background'],
+                    cache=cache, tile_size=options['tile_size'],
+                    memmap_dir=options['memmap_dir']
+                )
+    except Exception as e:
+        success = False
+        error = str(e)
+    
+    if not success and error is None:
+        errors = [line for line in log.getvalue().splitlines() if line.startswith('Error')]
+        error = errors[-1] if errors else 'Unknown error'
+    
+    return {
+        'input': input_path,
+        'output': output_path,
+        'success': success,
+        'seconds': time.perf_counter() - start,
+        'error': error,
+        'cached': cache is not None and cache.hits > hits_before,
+    }
+
+
+def process_batch(jobs, method='auto', workers=None, background_color='white', threshold=128,
+                  smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=False,
+                  padding=10, cache=True, inference_size=None, tile_size=None, memmap_dir=None):
+    """
+    Create silhouettes for many images in parallel using a process pool.
+    
+    Each worker process loads the rembg model once when it starts and reuses
+    that session for every file it is handed, instead of paying interpreter
+    and model start-up per image.
+    
+    Args:
+        jobs (list): (input_path, output_path) tuples, see collect_batch_jobs
+        method (str): 'auto' (rembg) or 'simple' (threshold)
+        workers (int): Number of worker processes (default: CPU count)
+        background_color (str): Background color ('white' or 'transparent')
+        threshold (int): Brightness threshold for the simple method
+        smooth_edges (bool): Whether to smooth the edges of the silhouette
+        blur_radius (int): Radius for edge smoothing blur (1-8)
+        vector_style (bool): Whether to create clean vector-like edges
+        crop_to_subject_flag (bool): Whether to crop images to subject bounds
+        padding (int): Padding around subject when cropping
+        cache (bool): Whether workers use the shared on-disk output cache
+        inference_size (int): Long edge for low-resolution segmentation, None for full size
+        tile_size (int): Filter in tiles of this size to bound memory, None for whole image
+        memmap_dir (str): Directory for memory-mapped filter buffers (with tile_size)
+    
+    Returns:
+        list: One result dictionary per job (input, output, success, seconds, error, cached)
+    """
+    options = {
+        'background': background_color,
+        'threshold': threshold,
+        'smooth_edges': smooth_edges,
+        'blur_radius': blur_radius,
+        'vector_style': vector_style,
+        'crop_to_subject_flag': crop_to_subject_flag,
+        'padding': padding,
+        'cache': bool(cache),
+        'inference_size': inference_size,
+        'tile_size': tile_size,
+        'memmap_dir': memmap_dir,
+    }
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs) or 1))
+    
+    print(f"Processing {len(jobs)} images with {workers} worker(s)...")
+    start = time.perf_counter()
+    results = []
+    
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(method,)) as executor:
+        futures = [
+            executor.submit(_process_batch_item, input_path, output_path, method, options)
+            for input_path, output_path in jobs
+        ]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            status = ("HIT " if result['cached'] else "OK  ") if result['success'] else "FAIL"
+            print(f"[{done}/{len(jobs)}] {status} {result['input']} ({result['seconds']:.2f}s)")
+            if not result['success']:
+                print(f"      {result['error']}")
+    
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for result in results if result['success'])
+    failed = len(results) - succeeded
+    
+    print("\n=== Batch Summary ===")
+    print(f"Succeeded: {succeeded}")
+    print(f"Failed:    {failed}")
+    if cache:
+        hits = sum(1 for result in results if result['cached'])
+        print(f"Cache:     {hits} hits, {len(results) - hits} misses")
+    print(f"Elapsed:   {elapsed:.2f}s")
+    if elapsed > 0 and results:
+        print(f"Throughput: {len(results) / elapsed:.2f} images/s")
+    if failed:
+        print("\nFailed files:")
+        for result in sorted(results, key=lambda r: r['input']):
+            if not result['success']:
+                print(f"  {result['input']}: {result['error']}")
+    
+    return results
+
+
 def main():
     parser = argparse.ArgumentParser(description='Create black silhouettes from images')
-    parser.add_argument('input', help='Input image path')
-    parser.add_argument('output', help='Output silhouette path')
+    parser.add_argument('input', nargs='+',
+                       help='Input image path(s), directory or glob pattern')
+    parser.add_argument('output', help='Output silhouette path (output directory in batch mode)')
     parser.add_argument('--method', choices=['auto', 'simple'], default='auto',
                        help='Method to use: auto (rembg) or simple (threshold)')
     parser.add_argument('--background', choices=['white', 'transparent'], default='white',
@@ -333,9 +1147,72 @@ def main():
                        help='Crop image to subject bounds (removes excess background)')
     parser.add_argument('--padding', type=int, default=10,
                        help='Padding around subject when cropping (default: 10)')
+    parser.add_argument('--format', choices=['png', 'webp', 'svg'], default='png',
+                       help='Output format in batch mode; svg traces vector contours (default: png)')
+    parser.add_argument('--effort', type=int, default=None,
+                       help='PNG/WebP encoding effort 0-9, higher is smaller and slower (default: 6)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Worker processes for batch mode (default: CPU count)')
+    parser.add_argument('--inference-size', type=int, default=None,
+                       help='Segment a downscaled copy with this long edge, then refine edges at full size (auto method)')
+    parser.add_argument('--tile-size', type=int, default=None,
+                       help='Filter very large images in tiles of this size to bound memory use')
+    parser.add_argument('--memmap-dir', default=None,
+                       help='Back tiled filter buffers with memory-mapped files in this directory')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Always reprocess instead of using cached silhouettes')
+    parser.add_argument('--cache-dir', default=None,
+                       help='Silhouette cache directory (default: ~/.cache/silhouette_generator)')
+    parser.add_argument('--cache-size-mb', type=float, default=None,
+                       help='Cache size cap in megabytes (default: 512)')
     
     args = parser.parse_args()
     
+    # Edge smoothing settings
+    smooth_edges = not args.no_smooth
+    blur_radius = max(1, min(8, args.blur_radius))
+    vector_style = not args.no_vector
+    
+    # Cropping settings
+    crop_to_subject_flag = args.crop
+    padding = max(0, args.padding)
+    
+    # Cache settings go through the environment so batch worker processes inherit them
+    use_cache = not args.no_cache
+    if args.cache_dir:
+        os.environ['SILHOUETTE_CACHE_DIR'] = args.cache_dir
+    if args.cache_size_mb is not None:
+        os.environ['SILHOUETTE_CACHE_MAX_MB'] = str(args.cache_size_mb)
+    if args.effort is not None:
+        os.environ['SILHOUETTE_ENCODE_EFFORT'] = str(args.effort)
+    
+    batch_mode = (
+        len(args.input) > 1
+        or os.path.isdir(args.input[0])
+        or glob.has_magic(args.input[0])
+    )
+    
+    if batch_mode:
+        try:
+            jobs = collect_batch_jobs(args.input, args.output, '.' + args.format)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        if not jobs:
+            print("Error: No input images found.")
+            sys.exit(1)
+        
+        results = process_batch(
+            jobs, args.method, args.workers, args.background, args.threshold,
+            smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, use_cache,
+            args.inference_size, args.tile_size, args.memmap_dir
+        )
+        if not all(result['success'] for result in results):
+            sys.exit(1)
+        return
+    
+    args.input = args.input[0]
+    
     # Check if input file exists
     if not os.path.exists(args.input):
         print(f"Error: Input file '{args.input}' not found.")
@@ -348,24 +1225,15 @@ def main():
     
     success = False
     
-    # Edge smoothing settings
-    smooth_edges = not args.no_smooth
-    blur_radius = max(1, min(8, args.blur_radius))
-    vector_style = not args.no_vector
-    
-    # Cropping settings
-    crop_to_subject_flag = args.crop
-    padding = max(0, args.padding)
-    
     if args.method == 'auto':
         try:
-            success = create_silhouette(args.input, args.output, args.background, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding)
+            success = create_silhouette(args.input, args.output, args.background, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, use_cache, args.inference_size, args.tile_size, args.memmap_dir)
         except ImportError:
             print("rembg library not found. Install with: pip install rembg")
             print("Falling back to simple method...")
-            success = create_simple_silhouette(args.input, args.output, args.threshold, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, args.background)
+            success = create_simple_silhouette(args.input, args.output, args.threshold, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, args.background, use_cache, args.tile_size, args.memmap_dir)
     else:
-        success = create_simple_silhouette(args.input, args.output, args.threshold, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, args.background)
+        success = create_simple_silhouette(args.input, args.output, args.threshold, smooth_edges, blur_radius, vector_style, crop_to_subject_flag, padding, args.background, use_cache, args.tile_size, args.memmap_dir)
     
     if not success:
         sys.exit(1)
@@ -379,6 +1247,8 @@ if __name__ == "__main__":
         print("python silhouette_generator.py input.jpg output.png")
         print("python silhouette_generator.py input.jpg output.png --method simple")
         print("python silhouette_generator.py input.jpg output.png --background transparent")
+        print("python silhouette_generator.py input.jpg output.svg --method simple")
+        print("python silhouette_generator.py images/ output_dir/ --workers 4")
         print("\nInstall requirements:")
         print("pip install rembg pillow numpy")
         sys.exit(0)
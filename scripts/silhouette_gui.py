@@ -4,10 +4,11 @@ GUI Wrapper for Silhouette Generator
 
 A drag-and-drop interface for creating silhouettes from images.
 Features:
-- Drag and drop image files
+- Drag and drop image files (one or many at a time)
 - Toggle for transparent background
-- Output filename dialog
-- Progress feedback
+- Output filename dialog (output folder for several files)
+- Queue drained by a configurable number of workers, with per-file progress
+- Cancellation of queued or running jobs (running jobs stop between pipeline stages)
 
 Requirements:
 - pip install tkinter (usually included with Python)
@@ -18,6 +19,8 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, simpledialog
 import os
 import sys
+import queue
+import itertools
 import threading
 from pathlib import Path
 import subprocess
@@ -25,28 +28,53 @@ import tempfile
 
 # Import the silhouette generator functions
 try:
-    from silhouette_generator import create_silhouette, create_simple_silhouette
-    import io
-    from PIL import Image
+    from silhouette_generator import create_silhouette, create_simple_silhouette, preload_rembg_session, PipelineCancelled
     REMBG_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Some dependencies not available: {e}")
     REMBG_AVAILABLE = False
+    
+    class PipelineCancelled(Exception):
+        pass
+
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
+
+# Share of a job completed when each pipeline stage starts (background removal dominates)
+STAGE_PROGRESS = {'decode': 0.05, 'background_removal': 0.1, 'filter': 0.75, 'crop': 0.85, 'encode': 0.9}
+
+POLL_INTERVAL_MS = 100
 
 
 class SilhouetteGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("Silhouette Generator")
-        self.root.geometry("500x400")
+        self.root.geometry("560x600")
         self.root.configure(bg='#f0f0f0')
         
         # Variables
         self.transparent_bg = tk.BooleanVar(value=False)
-        self.processing = False
+        self.worker_count = tk.IntVar(value=min(2, os.cpu_count() or 1))
+        
+        # Job queue: worker threads take jobs from _pending and report back
+        # through _events, which the Tk thread drains every POLL_INTERVAL_MS
+        self.jobs = {}  # job id -> job dict (only touched on the Tk thread)
+        self._batch = []  # ids of the jobs submitted since the queue was last idle
+        self._pending = queue.Queue()
+        self._events = queue.Queue()
+        self._job_ids = itertools.count(1)
+        self._workers = 0
+        self._workers_lock = threading.Lock()
         
         self.setup_ui()
         self.setup_drag_drop()
+        
+        # Start loading the background removal model while the user picks a file
+        if REMBG_AVAILABLE:
+            preload_rembg_session()
+        
+        self.root.after(POLL_INTERVAL_MS, self._poll_jobs)
     
     def setup_ui(self):
         """Setup the user interface"""
@@ -63,7 +91,7 @@ class SilhouetteGUI:
         self.drop_frame = tk.Frame(
             self.root,
             width=400,
-            height=200,
+            height=120,
             bg='#e8e8e8',
             relief='dashed',
             bd=2
@@ -74,7 +102,7 @@ class SilhouetteGUI:
         # Drop area label
         self.drop_label = tk.Label(
             self.drop_frame,
-            text="Drag & Drop Image Here\n\nOr Click to Browse",
+            text="Drag & Drop Images Here\n\nOr Click to Browse",
             font=("Arial", 12),
             bg='#e8e8e8',
             fg='#666666'
@@ -118,6 +146,55 @@ class SilhouetteGUI:
         )
         method_combo.pack(side='left', padx=5)
         
+        # Worker count (applies to workers started after the change)
+        workers_label = tk.Label(
+            options_frame,
+            text="Workers:",
+            font=("Arial", 10),
+            bg='#f0f0f0'
+        )
+        workers_label.pack(side='left', padx=(20, 5))
+        
+        workers_spinbox = tk.Spinbox(
+            options_frame,
+            from_=1,
+            to=max(1, os.cpu_count() or 1),
+            textvariable=self.worker_count,
+            width=3
+        )
+        workers_spinbox.pack(side='left', padx=5)
+        
+        # Job list with per-file status and progress
+        queue_frame = tk.Frame(self.root, bg='#f0f0f0')
+        queue_frame.pack(pady=5, padx=20, fill='both', expand=True)
+        
+        self.job_tree = ttk.Treeview(
+            queue_frame,
+            columns=('status', 'progress'),
+            height=6
+        )
+        self.job_tree.heading('#0', text='File')
+        self.job_tree.heading('status', text='Status')
+        self.job_tree.heading('progress', text='Progress')
+        self.job_tree.column('#0', width=260)
+        self.job_tree.column('status', width=150)
+        self.job_tree.column('progress', width=70, anchor='e')
+        self.job_tree.pack(side='left', fill='both', expand=True)
+        self.job_tree.bind('<Double-1>', self.open_selected)
+        
+        tree_scrollbar = ttk.Scrollbar(queue_frame, orient='vertical', command=self.job_tree.yview)
+        tree_scrollbar.pack(side='right', fill='y')
+        self.job_tree.configure(yscrollcommand=tree_scrollbar.set)
+        
+        # Queue controls
+        controls_frame = tk.Frame(self.root, bg='#f0f0f0')
+        controls_frame.pack(pady=5)
+        
+        for text, command in (("Cancel Selected", self.cancel_selected),
+                              ("Cancel All", self.cancel_all),
+                              ("Clear Finished", self.clear_finished)):
+            ttk.Button(controls_frame, text=text, command=command).pack(side='left', padx=5)
+        
         # Progress bar
         self.progress_frame = tk.Frame(self.root, bg='#f0f0f0')
         
@@ -131,7 +208,8 @@ class SilhouetteGUI:
         
         self.progress_bar = ttk.Progressbar(
             self.progress_frame,
-            mode='indeterminate',
+            mode='determinate',
+            maximum=100,
             length=300
         )
         self.progress_bar.pack(pady=5)
@@ -169,24 +247,23 @@ class SilhouetteGUI:
             ("All files", "*.*")
         ]
         
-        filename = filedialog.askopenfilename(
-            title="Select Image File",
+        filenames = filedialog.askopenfilenames(
+            title="Select Image Files",
             filetypes=filetypes
         )
         
-        if filename:
-            self.process_image(filename)
+        if filenames:
+            self.add_files(filenames)
     
     def handle_drop(self, event):
         """Handle dropped files"""
         try:
-            # Get the dropped file path
-            files = event.data.split()
+            # Tk wraps paths containing spaces in curly braces; splitlist unwraps them
+            files = self.root.tk.splitlist(event.data)
             if files:
-                file_path = files[0].strip('{}')  # Remove curly braces if present
-                self.process_image(file_path)
+                self.add_files(files)
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to handle dropped file: {str(e)}")
+            messagebox.showerror("Error", f"Failed to handle dropped files: {str(e)}")
     
     def get_output_filename(self, input_path):
         """Get output filename from user"""
@@ -218,114 +295,218 @@ class SilhouetteGUI:
         
         return output_path
     
+    def get_output_paths(self, input_paths):
+        """Ask for an output folder and name each output '<stem>_silhouette.png' in it"""
+        output_dir = filedialog.askdirectory(title="Save Silhouettes To")
+        if not output_dir:
+            return None
+        
+        output_paths = []
+        used = set()
+        for input_path in input_paths:
+            stem = f"{Path(input_path).stem}_silhouette"
+            name = f"{stem}.png"
+            # Inputs from different folders may share a name
+            for suffix in itertools.count(2):
+                if name not in used:
+                    break
+                name = f"{stem}_{suffix}.png"
+            used.add(name)
+            output_paths.append(os.path.join(output_dir, name))
+        return output_paths
+    
     def update_status(self, message):
         """Update status label"""
         self.status_label.config(text=message)
-        self.root.update()
     
     def show_progress(self, show=True, message="Processing..."):
         """Show/hide progress bar"""
         if show:
             self.progress_label.config(text=message)
             self.progress_frame.pack(pady=10)
-            self.progress_bar.start(10)
         else:
-            self.progress_bar.stop()
+            self.progress_bar['value'] = 0
             self.progress_frame.pack_forget()
-        self.root.update()
     
-    def process_image(self, input_path):
-        """Process the image in a separate thread"""
-        if self.processing:
-            messagebox.showwarning("Processing", "Already processing an image. Please wait.")
-            return
+    def add_files(self, input_paths):
+        """Validate files, ask where to save them and add them to the queue"""
+        valid_paths = []
+        problems = []
+        for input_path in input_paths:
+            if not os.path.exists(input_path):
+                problems.append(f"File not found: {input_path}")
+            elif Path(input_path).suffix.lower() not in IMAGE_EXTENSIONS:
+                problems.append(f"Not an image file: {os.path.basename(input_path)}")
+            else:
+                valid_paths.append(input_path)
         
-        # Validate input file
-        if not os.path.exists(input_path):
-            messagebox.showerror("Error", f"File not found: {input_path}")
+        if problems:
+            messagebox.showerror("Error", "\n".join(problems[:10]))
+        if not valid_paths:
             return
         
-        # Check if it's an image file
-        valid_extensions = {'.jpg', '.jpeg', '.png', '.bmp', '.gif', '.tiff', '.webp'}
-        if Path(input_path).suffix.lower() not in valid_extensions:
-            messagebox.showerror("Error", "Please select a valid image file.")
+        # One file keeps the save-as dialog; several go to one folder
+        if len(valid_paths) == 1:
+            output_path = self.get_output_filename(valid_paths[0])
+            output_paths = [output_path] if output_path else None
+        else:
+            output_paths = self.get_output_paths(valid_paths)
+        if not output_paths:
             return
         
-        # Get output filename
-        output_path = self.get_output_filename(input_path)
-        if not output_path:
-            return
+        for input_path, output_path in zip(valid_paths, output_paths):
+            self.submit_job(input_path, output_path)
+        self.update_status(f"Queued {len(valid_paths)} image(s)")
+    
+    def submit_job(self, input_path, output_path):
+        """Queue one image; returns the job id"""
+        if not self._active_jobs():
+            self._batch = []
         
-        # Start processing in separate thread
-        thread = threading.Thread(
-            target=self._process_image_thread,
-            args=(input_path, output_path)
-        )
-        thread.daemon = True
-        thread.start()
+        job_id = next(self._job_ids)
+        job = {
+            'id': job_id,
+            'input': input_path,
+            'output': output_path,
+            # Options are read here because Tk variables belong to the main thread
+            'method': self.method_var.get(),
+            'background': 'transparent' if self.transparent_bg.get() else 'white',
+            'status': 'queued',
+            'stage': None,
+            'progress': 0.0,
+            'error': None,
+            'cancel': threading.Event(),
+            'taken': False,  # Set by the worker that picks the job up, under _workers_lock
+        }
+        self.jobs[job_id] = job
+        self._batch.append(job_id)
+        self.job_tree.insert('', 'end', iid=str(job_id), text=os.path.basename(input_path))
+        self._refresh_row(job)
+        
+        self._pending.put(job)
+        self._start_workers()
+        self.show_progress(True, "Creating silhouettes...")
+        return job_id
     
-    def _process_image_thread(self, input_path, output_path):
-        """Process image in background thread"""
+    def _start_workers(self):
+        """Start worker threads up to the configured count"""
         try:
-            self.processing = True
-            self.show_progress(True, "Creating silhouette...")
-            self.update_status("Processing image...")
-            
-            # Determine background type
-            background = 'transparent' if self.transparent_bg.get() else 'white'
-            
-            # Process based on selected method
-            success = False
-            method = self.method_var.get()
+            wanted = max(1, int(self.worker_count.get()))
+        except (tk.TclError, ValueError):
+            wanted = 1
+        
+        with self._workers_lock:
+            while self._workers < wanted:
+                self._workers += 1
+                threading.Thread(target=self._worker_loop, daemon=True).start()
+    
+    def _worker_loop(self):
+        """Process queued jobs until the queue is empty (runs on a worker thread)"""
+        while True:
+            # Taking a job and retiring happen under the lock that _start_workers
+            # holds, so a job queued while this worker exits always gets a worker
+            with self._workers_lock:
+                try:
+                    job = self._pending.get_nowait()
+                except queue.Empty:
+                    self._workers -= 1
+                    return
+                job['taken'] = True
             
-            if method == 'auto' and REMBG_AVAILABLE:
-                success = create_silhouette(input_path, output_path, background)
+            self._run_job(job)
+    
+    def _run_job(self, job):
+        """Run one job, reporting its progress through the event queue"""
+        job_id = job['id']
+        if job['cancel'].is_set():
+            self._events.put((job_id, {'status': 'cancelled'}))
+            return
+        
+        self._events.put((job_id, {'status': 'running'}))
+        
+        def progress(stage):
+            self._events.put((job_id, {'stage': stage, 'progress': STAGE_PROGRESS.get(stage, 0.0)}))
+        
+        try:
+            if job['method'] == 'auto' and REMBG_AVAILABLE:
+                success = create_silhouette(job['input'], job['output'], job['background'],
+                                            cancel=job['cancel'].is_set, progress=progress)
             else:
-                # Use simple method
-                if background == 'transparent':
-                    # For simple method, we'll create with white background
-                    # and then make white pixels transparent
-                    temp_path = output_path.replace('.png', '_temp.png')
-                    success = create_simple_silhouette(input_path, temp_path)
-                    
-                    if success:
-                        try:
-                            # Convert white background to transparent
-                            img = Image.open(temp_path).convert("RGBA")
-                            datas = img.getdata()
-                            
-                            newData = []
-                            for item in datas:
-                                # Change white pixels to transparent
-                                if item[0] > 200 and item[1] > 200 and item[2] > 200:
-                                    newData.append((255, 255, 255, 0))  # Transparent
-                                else:
-                                    newData.append(item)
-                            
-                            img.putdata(newData)
-                            img.save(output_path, "PNG")
-                            os.remove(temp_path)  # Clean up temp file
-                        except Exception as e:
-                            print(f"Error making background transparent: {e}")
-                            # Fall back to original file
-                            if os.path.exists(temp_path):
-                                os.rename(temp_path, output_path)
-                else:
-                    success = create_simple_silhouette(input_path, output_path)
-            
-            # Update UI in main thread
-            self.root.after(0, self._processing_complete, success, output_path)
-            
+                success = create_simple_silhouette(job['input'], job['output'], background_color=job['background'],
+                                                   cancel=job['cancel'].is_set, progress=progress)
+        except PipelineCancelled:
+            self._events.put((job_id, {'status': 'cancelled'}))
         except Exception as e:
-            error_msg = f"Error processing image: {str(e)}"
-            self.root.after(0, self._processing_error, error_msg)
+            self._events.put((job_id, {'status': 'failed', 'error': f"Error processing image: {str(e)}"}))
+        else:
+            if success:
+                self._events.put((job_id, {'status': 'done', 'progress': 1.0}))
+            else:
+                self._events.put((job_id, {'status': 'failed', 'error': "Failed to create silhouette."}))
+    
+    def _poll_jobs(self):
+        """Apply worker events in one batch per tick, keeping the Tk main loop responsive"""
+        changed = set()
+        while True:
+            try:
+                job_id, fields = self._events.get_nowait()
+            except queue.Empty:
+                break
+            job = self.jobs.get(job_id)
+            if job is None:
+                continue
+            job.update(fields)
+            changed.add(job_id)
+        
+        for job_id in changed:
+            self._refresh_row(self.jobs[job_id])
+        if changed:
+            self._update_overall_progress()
+        
+        self.root.after(POLL_INTERVAL_MS, self._poll_jobs)
+    
+    def _active_jobs(self):
+        return [job for job in self.jobs.values() if job['status'] in ('queued', 'running')]
+    
+    def _refresh_row(self, job):
+        """Show a job's status and progress in the job list"""
+        status = job['status'].capitalize()
+        if job['status'] == 'running':
+            if job['cancel'].is_set():
+                status = "Cancelling..."
+            elif job['stage']:
+                status = job['stage'].replace('_', ' ').capitalize()
+        progress = f"{job['progress']:.0%}" if job['status'] in ('running', 'done') else ""
+        
+        iid = str(job['id'])
+        if self.job_tree.exists(iid):
+            self.job_tree.item(iid, values=(status, progress))
     
-    def _processing_complete(self, success, output_path):
-        """Called when processing is complete"""
-        self.processing = False
+    def _update_overall_progress(self):
+        """Update the overall progress bar, and report the batch once every job has finished"""
+        batch = [self.jobs[job_id] for job_id in self._batch if job_id in self.jobs]
+        if not batch:
+            return
+        
+        finished = [job for job in batch if job['status'] not in ('queued', 'running')]
+        total = sum(1.0 if job in finished else job['progress'] for job in batch)
+        self.progress_bar['value'] = 100 * total / len(batch)
+        self.progress_label.config(text=f"Creating silhouettes... {len(finished)}/{len(batch)}")
+        
+        if len(finished) == len(batch) and not self._active_jobs():
+            self._batch = []
+            self._batch_complete(batch)
+    
+    def _batch_complete(self, batch):
+        """Called when every job of a batch is done, failed or cancelled"""
         self.show_progress(False)
         
-        if success:
+        done = [job for job in batch if job['status'] == 'done']
+        failed = [job for job in batch if job['status'] == 'failed']
+        cancelled = len(batch) - len(done) - len(failed)
+        
+        if len(batch) == 1 and done:
+            output_path = done[0]['output']
             self.update_status(f"Silhouette saved: {os.path.basename(output_path)}")
             
             # Ask if user wants to open the result
@@ -333,28 +514,60 @@ class SilhouetteGUI:
                 "Success",
                 f"Silhouette created successfully!\n\nSaved as: {output_path}\n\nWould you like to open the result?"
             )
-            
             if result:
-                # Open the file with default system application
-                try:
-                    if sys.platform.startswith('darwin'):  # macOS
-                        subprocess.run(['open', output_path])
-                    elif sys.platform.startswith('win'):  # Windows
-                        os.startfile(output_path)
-                    else:  # Linux
-                        subprocess.run(['xdg-open', output_path])
-                except Exception as e:
-                    print(f"Could not open file: {e}")
-        else:
+                self._open_file(output_path)
+        elif len(batch) == 1 and failed:
             self.update_status("Failed to create silhouette")
-            messagebox.showerror("Error", "Failed to create silhouette. Please try again.")
+            messagebox.showerror("Error", failed[0]['error'] or "Failed to create silhouette. Please try again.")
+        else:
+            self.update_status(f"{len(done)} created, {len(failed)} failed, {cancelled} cancelled")
     
-    def _processing_error(self, error_msg):
-        """Called when processing encounters an error"""
-        self.processing = False
-        self.show_progress(False)
-        self.update_status("Error occurred")
-        messagebox.showerror("Error", error_msg)
+    def cancel_selected(self):
+        """Cancel the selected queued or running jobs"""
+        self._cancel([int(iid) for iid in self.job_tree.selection()])
+    
+    def cancel_all(self):
+        """Cancel every queued or running job"""
+        self._cancel([job['id'] for job in self._active_jobs()])
+    
+    def _cancel(self, job_ids):
+        for job_id in job_ids:
+            job = self.jobs.get(job_id)
+            if job is None or job['status'] not in ('queued', 'running'):
+                continue
+            job['cancel'].set()
+            # Jobs no worker has taken never start; taken jobs stop at their next stage
+            # and report back, even if their 'running' event has not arrived yet
+            with self._workers_lock:
+                taken = job['taken']
+            job['status'] = 'running' if taken else 'cancelled'
+            self._refresh_row(job)
+        self._update_overall_progress()
+    
+    def clear_finished(self):
+        """Remove done, failed and cancelled jobs from the list"""
+        for job_id in [job_id for job_id, job in self.jobs.items() if job['status'] not in ('queued', 'running')]:
+            del self.jobs[job_id]
+            self.job_tree.delete(str(job_id))
+    
+    def open_selected(self, event=None):
+        """Open the silhouette of a finished job (double-click)"""
+        for iid in self.job_tree.selection():
+            job = self.jobs.get(int(iid))
+            if job is not None and job['status'] == 'done':
+                self._open_file(job['output'])
+    
+    def _open_file(self, path):
+        """Open a file with the default system application"""
+        try:
+            if sys.platform.startswith('darwin'):  # macOS
+                subprocess.run(['open', path])
+            elif sys.platform.startswith('win'):  # Windows
+                os.startfile(path)
+            else:  # Linux
+                subprocess.run(['xdg-open', path])
+        except Exception as e:
+            print(f"Could not open file: {e}")
 
 
 def main():
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Silhouette Vectorizer
+
+Traces a silhouette mask into closed contours along the pixel edges,
+simplifies them with Douglas-Peucker, smooths them into cubic Bezier curves
+and writes a compact SVG. Holes (the gap between an arm and the body, for
+example) are traced as their own contours and cut out with the even-odd fill
+rule. A pose that is several hundred KB as a PNG becomes a few KB of SVG that
+scales to any screen density.
+
+silhouette_generator.py uses this module when the output path ends in .svg.
+
+Requirements:
+- pip install pillow numpy
+
+Usage:
+python silhouette_vector.py silhouette.png silhouette.svg
+python silhouette_vector.py ../images/png output_dir/ --tolerance 1.5
+python silhouette_vector.py silhouette.png silhouette.svg --no-curves --background transparent
+"""
+
+import os
+import sys
+import glob
+import argparse
+import numpy as np
+from PIL import Image
+
+
+DEFAULT_TOLERANCE = 1.0      # Douglas-Peucker distance in pixels
+DEFAULT_MIN_AREA = 8.0       # Contours enclosing less than this many pixels are dropped
+CORNER_ANGLE = 60.0          # Turns sharper than this (degrees) stay corners when smoothing
+CURVE_TENSION = 1.0          # Catmull-Rom tension; 0 gives straight segments
+
+IMAGE_EXTENSIONS = {'.png', '.webp', '.gif', '.tiff', '.bmp'}
+
+
+def silhouette_mask(img, threshold=128):
+    """
+    Return the subject of a silhouette image as a bool mask.
+    
+    Transparent images use their alpha channel; opaque ones count dark
+    pixels as subject.
+    
+    Args:
+        img (PIL.Image): Silhouette image
+        threshold (int): Alpha (or darkness) level separating subject from background
+    
+    Returns:
+        np.ndarray: HxW bool array, True inside the subject
+    """
+    if img.mode in ('RGBA', 'LA', 'PA') or (img.mode == 'P' and 'transparency' in img.info):
+        alpha = np.array(img.convert('RGBA').getchannel('A'))
+        if alpha.min() < 255:
+            return alpha >= threshold
+    return np.array(img.convert('L')) < threshold
+
+
+def trace_contours(mask):
+    """
+    Trace every boundary of a mask along the pixel edges.
+    
+    Each boundary between a subject and a background pixel becomes a unit
+    edge, directed so the subject is on its left; the edges are then chained
+    into closed loops. Outer outlines and holes come out as separate loops
+    running in opposite directions. Where two pixels touch only at a corner
+    the walk turns left, towards the pixel it is tracing, so diagonal
+    neighbours come out as separate loops; diagonal holes, walked as one
+    figure-eight, are split at the shared corner.
+    
+    Args:
+        mask (np.ndarray): HxW bool array
+    
+    Returns:
+        list: One (N, 2) float array of (x, y) corner points per loop
+    """
+    height, width = mask.shape
+    stride = width + 1  # Corner (x, y) is numbered y * stride + x
+    padded = np.pad(mask.astype(bool), 1)
+    
+    starts = []
+    ends = []
+    
+    # Horizontal edges on the line between pixel rows y - 1 and y
+    above, below = padded[:-1, 1:-1], padded[1:, 1:-1]
+    ys, xs = np.nonzero(below & ~above)        # Subject below: walk right to left
+    starts.append(ys * stride + xs + 1)
+    ends.append(ys * stride + xs)
+    ys, xs = np.nonzero(above & ~below)        # Subject above: walk left to right
+    starts.append(ys * stride + xs)
+    ends.append(ys * stride + xs + 1)
+    
+    # Vertical edges on the line between pixel columns x - 1 and x
+    left, right = padded[1:-1, :-1], padded[1:-1, 1:]
+    ys, xs = np.nonzero(right & ~left)         # Subject to the right: walk down
+    starts.append(ys * stride + xs)
+    ends.append((ys + 1) * stride + xs)
+    ys, xs = np.nonzero(left & ~right)         # Subject to the left: walk up
+    starts.append((ys + 1) * stride + xs)
+    ends.append(ys * stride + xs)
+    
+    starts = np.concatenate(starts).tolist()
+    ends = np.concatenate(ends).tolist()
+    if not starts:
+        return []
+    
+    # Outgoing edges per corner; only corners where two pixels touch diagonally have two
+    outgoing = {}
+    for edge, start in enumerate(starts):
+        outgoing.setdefault(start, []).append(edge)
+    
+    # Step that turns left, towards the subject, from a given step (y grows downwards)
+    left_turn = {1: -stride, -stride: -1, -1: stride, stride: 1}
+    
+    used = bytearray(len(starts))
+    loops = []
+    for first in range(len(starts)):
+        if used[first]:
+            continue
+        corners = []
+        edge = first
+        while not used[edge]:
+            used[edge] = 1
+            corners.append(starts[edge])
+            corner = ends[edge]
+            candidates = outgoing[corner]
+            if len(candidates) == 1:
+                edge = candidates[0]
+                continue
+            preferred = corner + left_turn[corner - starts[edge]]
+            free = [candidate for candidate in candidates if not used[candidate]]
+            edge = next((candidate for candidate in free if ends[candidate] == preferred),
+                        free[0] if free else candidates[0])
+        
+        for loop in _split_at_repeats(corners):
+            loop = np.array(loop, dtype=np.int64)
+            loops.append(np.column_stack((loop % stride, loop // stride)).astype(np.float64))
+    return loops
+
+
+def _split_at_repeats(corners):
+    """
+    Split a closed walk that passes through a corner twice into simple loops.
+    
+    Background pixels touching at a corner (two holes meeting diagonally)
+    are still walked as one figure-eight; simplifying that as a single
+    polygon would fill subject pixels, so each lobe becomes its own loop.
+    """
+    loops = []
+    path = []
+    position = {}
+    for corner in corners:
+        if corner in position:
+            start = position[corner]
+            loops.append(path[start:])
+            for dropped in path[start:]:
+                del position[dropped]
+            del path[start:]
+        position[corner] = len(path)
+        path.append(corner)
+    loops.append(path)
+    return [loop for loop in loops if len(loop) >= 4]
+
+
+def _drop_collinear(points):
+    """Keep only the points of a closed loop where the direction changes."""
+    steps = np.diff(points, axis=0, append=points[:1])
+    incoming = np.roll(steps, 1, axis=0)
+    turns = (steps != incoming).any(axis=1)
+    return points[turns]
+
+
+def _douglas_peucker(points, tolerance):
+    """Simplify an open polyline, always keeping its first and last points."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        segment = points[first + 1:last] - points[first]
+        direction = points[last] - points[first]
+        length = np.hypot(*direction)
+        if length == 0:
+            distances = np.hypot(segment[:, 0], segment[:, 1])
+        else:
+            distances = np.abs(direction[0] * segment[:, 1] - direction[1] * segment[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+    return points[keep]
+
+
+def simplify_contour(points, tolerance=DEFAULT_TOLERANCE):
+    """
+    Simplify a closed loop with Douglas-Peucker.
+    
+    The loop is cut at its first point and the point farthest from it, and
+    both halves are simplified separately.
+    
+    Args:
+        points (np.ndarray): (N, 2) loop points
+        tolerance (float): Largest allowed deviation in pixels
+    
+    Returns:
+        np.ndarray: Simplified loop (not repeating its first point)
+    """
+    # Edge midpoints turn one-pixel stairs into diagonals, which simplify cleanly
+    points = _drop_collinear((points + np.roll(points, -1, axis=0)) / 2)
+    if len(points) < 4:
+        return points
+    
+    far = int(np.argmax(np.hypot(*(points - points[0]).T)))
+    first_half = _douglas_peucker(points[:far + 1], tolerance)
+    second_half = _douglas_peucker(np.vstack((points[far:], points[:1])), tolerance)
+    return np.vstack((first_half[:-1], second_half[:-1]))
+
+
+def polygon_area(points):
+    """Signed shoelace area of a closed loop."""
+    x, y = points[:, 0], points[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1)))
+
+
+def bezier_controls(points, tension=CURVE_TENSION, corner_angle=CORNER_ANGLE):
+    """
+    Cubic Bezier control points through a closed loop (Catmull-Rom).
+    
+    Segment i runs from points[i] to points[i + 1] with controls
+    first[i] and second[i]. At corners sharper than corner_angle the
+    tangent is zero, so the curve keeps the corner instead of rounding it.
+    Control points stay within a third of their segment's length, so a
+    short segment next to a long one cannot overshoot.
+    
+    Returns:
+        tuple: (first controls, second controls), each (N, 2)
+    """
+    previous = np.roll(points, 1, axis=0)
+    following = np.roll(points, -1, axis=0)
+    tangents = (following - previous) * (tension / 6.0)
+    
+    incoming = points - previous
+    outgoing = following - points
+    norms = np.hypot(*incoming.T) * np.hypot(*outgoing.T)
+    cosines = np.einsum('ij,ij->i', incoming, outgoing) / np.maximum(norms, 1e-12)
+    tangents[cosines < np.cos(np.radians(corner_angle))] = 0.0
+    
+    segment_lengths = np.hypot(*outgoing.T)[:, None]
+    
+    def clamp(offsets):
+        lengths = np.hypot(*offsets.T)[:, None]
+        return offsets * np.minimum(1.0, segment_lengths / np.maximum(3.0 * lengths, 1e-12))
+    
+    return points + clamp(tangents), following - clamp(np.roll(tangents, -1, axis=0))
+
+
+def _number(value):
+    """Format a coordinate as compactly as SVG allows (0.5 -> .5, -2.0 -> -2)."""
+    text = f"{value:.1f}".rstrip('0').rstrip('.')
+    if text in ('-0', ''):
+        return '0'
+    if text.startswith('0.'):
+        return text[1:]
+    if text.startswith('-0.'):
+        return '-' + text[2:]
+    return text
+
+
+def _join(values):
+    """Join numbers, letting a minus sign or leading dot double as the separator."""
+    parts = []
+    previous = ''
+    for value in values:
+        text = _number(value)
+        if parts and not (text[0] == '-' or (text[0] == '.' and '.' in previous)):
+            parts.append(' ')
+        parts.append(text)
+        previous = text
+    return ''.join(parts)
+
+
+def contour_path(points, curves=True):
+    """
+    SVG path data for one closed loop, using relative commands.
+    
+    Args:
+        points (np.ndarray): (N, 2) simplified loop
+        curves (bool): Smooth with cubic Beziers instead of straight segments
+    
+    Returns:
+        str: Path data such as "M10 20l5 0 0 5z"
+    """
+    points = np.round(points, 1)
+    if not curves:
+        steps = np.diff(points, axis=0)
+        return f"M{_join(points[0])}l{_join(steps.ravel())}z"
+    
+    first, second = bezier_controls(points)
+    first, second = np.round(first, 1), np.round(second, 1)
+    following = np.roll(points, -1, axis=0)
+    # Each segment relative to its start point: c dx1 dy1 dx2 dy2 dx dy
+    segments = np.hstack((first - points, second - points, following - points))
+    return f"M{_join(points[0])}c{_join(segments.ravel())}z"
+
+
+def mask_to_svg(mask, background_color='white', tolerance=DEFAULT_TOLERANCE, curves=True,
+                min_area=DEFAULT_MIN_AREA, fill='#000'):
+    """
+    Vectorize a silhouette mask.
+    
+    Args:
+        mask (np.ndarray): HxW bool array, True inside the subject
+        background_color (str): 'white' to paint a background, 'transparent' for none
+        tolerance (float): Douglas-Peucker tolerance in pixels
+        curves (bool): Smooth contours with Bezier curves
+        min_area (float): Drop contours (specks or pinholes) smaller than this
+        fill (str): Silhouette color
+    
+    Returns:
+        bytes: UTF-8 SVG document
+    """
+    height, width = mask.shape
+    paths = []
+    for loop in trace_contours(mask):
+        simplified = simplify_contour(loop, tolerance)
+        if len(simplified) < 3 or abs(polygon_area(simplified)) < min_area:
+            continue
+        paths.append(contour_path(simplified, curves))
+    
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width} {height}" '
+             f'width="{width}" height="{height}">']
+    if background_color != 'transparent':
+        parts.append(f'<rect width="{width}" height="{height}" fill="{background_color}"/>')
+    if paths:
+        parts.append(f'<path fill="{fill}" fill-rule="evenodd" d="{"".join(paths)}"/>')
+    parts.append('</svg>')
+    return ''.join(parts).encode('utf-8')
+
+
+def image_to_svg(img, background_color=None, tolerance=DEFAULT_TOLERANCE, curves=True,
+                 min_area=DEFAULT_MIN_AREA):
+    """
+    Vectorize a silhouette image produced by the silhouette pipeline.
+    
+    Args:
+        img (PIL.Image): Black silhouette on white, or on transparency
+        background_color (str): 'white' or 'transparent' (default: follow the image)
+    
+    Returns:
+        bytes: UTF-8 SVG document
+    """
+    if background_color is None:
+        has_alpha = img.mode in ('RGBA', 'LA', 'PA') and img.getchannel('A').getextrema()[0] < 255
+        background_color = 'transparent' if has_alpha else 'white'
+    return mask_to_svg(silhouette_mask(img), background_color, tolerance, curves, min_area)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert silhouette images to SVG')
+    parser.add_argument('input', help='Silhouette image, directory or glob pattern')
+    parser.add_argument('output', help='Output .svg file (output directory for several inputs)')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                       help=f'Simplification tolerance in pixels (default: {DEFAULT_TOLERANCE})')
+    parser.add_argument('--min-area', type=float, default=DEFAULT_MIN_AREA,
+                       help=f'Drop specks and holes smaller than this many pixels (default: {DEFAULT_MIN_AREA:g})')
+    parser.add_argument('--no-curves', action='store_true', help='Write straight-edged polygons')
+    parser.add_argument('--background', choices=['white', 'transparent'], default=None,
+                       help='Background (default: transparent if the input has transparency)')
+    
+    args = parser.parse_args()
+    
+    if os.path.isdir(args.input):
+        inputs = sorted(os.path.join(args.input, name) for name in os.listdir(args.input)
+                        if os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS)
+    else:
+        inputs = sorted(glob.glob(args.input)) if glob.has_magic(args.input) else [args.input]
+    if not inputs or not all(os.path.isfile(path) for path in inputs):
+        print(f"Error: No input images found for '{args.input}'.")
+        sys.exit(1)
+    
+    batch = len(inputs) > 1 or os.path.isdir(args.input)
+    if batch:
+        os.makedirs(args.output, exist_ok=True)
+    
+    total_in = total_out = 0
+    for path in inputs:
+        output_path = (os.path.join(args.output, os.path.splitext(os.path.basename(path))[0] + '.svg')
+                       if batch else args.output)
+        try:
+            with Image.open(path) as img:
+                svg = image_to_svg(img, args.background, args.tolerance, not args.no_curves, args.min_area)
+        except OSError as e:
+            print(f"Error: Could not read '{path}': {e}")
+            sys.exit(1)
+        with open(output_path, 'wb') as output_file:
+            output_file.write(svg)
+        
+        total_in += os.path.getsize(path)
+        total_out += len(svg)
+        print(f"{path} -> {output_path}: {os.path.getsize(path) / 1024:.1f}KB -> {len(svg) / 1024:.1f}KB")
+    
+    if batch:
+        print(f"Converted {len(inputs)} image(s): {total_in / 1024:.0f}KB -> {total_out / 1024:.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,32 +12,365 @@ Requirements:
 Usage:
 python silhouette_web.py
 Then open http://localhost:5000 in your browser
+
+Monitoring:
+/metrics serves per-stage latency histograms plus job queue, result store
+and cache counters in the Prometheus text format. Set
+SILHOUETTE_SAMPLE_MEMORY=1 to also sample process memory after each stage.
 """
 
+import io
 import os
 import sys
+import json
+import hashlib
 import tempfile
+import zipfile
 import uuid
 from pathlib import Path
-from flask import Flask, render_template_string, request, jsonify, send_file, redirect, url_for
+from flask import Flask, Request, Response, render_template_string, request, jsonify, send_file, redirect, url_for
+from werkzeug.http import is_resource_modified
 from werkzeug.utils import secure_filename
 import threading
+import time
 import webbrowser
+from datetime import datetime, timezone
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 # Import silhouette functions
 try:
-    from silhouette_generator import create_silhouette, create_simple_silhouette
-    from PIL import Image
+    from silhouette_generator import IMAGE_EXTENSIONS, generate_silhouette, preload_rembg_session, add_stage_hook
+    from silhouette_cache import get_default_cache
     DEPENDENCIES_AVAILABLE = True
 except ImportError as e:
     print(f"Warning: Some dependencies not available: {e}")
     DEPENDENCIES_AVAILABLE = False
 
+# Long edge used for background-removal inference (0 = full resolution); large
+# photos are segmented on a downscaled copy and refined at full size
+INFERENCE_SIZE = int(os.environ.get('SILHOUETTE_WEB_INFERENCE_SIZE', 1024)) or None
+
+# Uploads larger than this are spooled to a temporary file instead of memory
+UPLOAD_SPOOL_BYTES = int(float(os.environ.get('SILHOUETTE_WEB_SPOOL_MB', 4)) * 1024 * 1024)
+
+
+# Limits for /batch, which accepts many files (or zip archives) in one request
+BATCH_MAX_BYTES = int(float(os.environ.get('SILHOUETTE_WEB_BATCH_MB', 256)) * 1024 * 1024)
+BATCH_MAX_FILES = int(os.environ.get('SILHOUETTE_WEB_BATCH_FILES', 500))
+
+
+class SpooledRequest(Request):
+    """Request that keeps uploads in memory, spilling to disk only above UPLOAD_SPOOL_BYTES"""
+    
+    @property
+    def max_content_length(self):
+        if self.endpoint == 'batch_process':
+            return BATCH_MAX_BYTES
+        return super().max_content_length
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+
+
 app = Flask(__name__)
+app.request_class = SpooledRequest
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 
+class ResultStore:
+    """
+    Thread-safe store of finished silhouettes on disk.
+    
+    Entries expire after ttl seconds and the least recently used entries are
+    evicted as soon as the total size exceeds max_bytes. Files are deleted
+    the moment their entry leaves the store, so disk use stays bounded
+    between periodic cleanups.
+    """
+    
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024, ttl=3600):
+        self.directory = directory or tempfile.mkdtemp(prefix='silhouette_results_')
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        self.evictions = 0
+        self.expirations = 0
+        
+        self._entries = OrderedDict()  # result_id -> info, least recently used first
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def add(self, result_id, data):
+        """
+        Write a result to disk and register it, evicting old entries if needed.
+        
+        Returns:
+            dict: The stored entry (path, size, timestamp, etag)
+        """
+        path = os.path.join(self.directory, f"silhouette_{result_id}.png")
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as output_file:
+            output_file.write(data)
+        
+        info = {
+            'path': path,
+            'size': len(data),
+            'timestamp': time.time(),
+            'etag': hashlib.sha256(data).hexdigest()[:32],
+        }
+        with self._lock:
+            # Drop any previous result under this id before the new file takes its path
+            self._discard(result_id)
+            os.replace(temp_path, path)
+            self._entries[result_id] = info
+            self.total_bytes += info['size']
+            
+            # Never evict the entry we just added, even if it alone exceeds the budget
+            while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+                oldest_id = next(iter(self._entries))
+                self._discard(oldest_id)
+                self.evictions += 1
+        return dict(info)
+    
+    def get(self, result_id):
+        """Return a copy of the entry and mark it recently used, or None."""
+        with self._lock:
+            info = self._entries.get(result_id)
+            if info is None:
+                return None
+            if time.time() - info['timestamp'] > self.ttl:
+                self._discard(result_id)
+                self.expirations += 1
+                return None
+            self._entries.move_to_end(result_id)
+            return dict(info)
+    
+    def cleanup(self):
+        """
+        Remove every expired entry.
+        
+        Returns:
+            int: Number of entries removed
+        """
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [result_id for result_id, info in self._entries.items() if info['timestamp'] < cutoff]
+            for result_id in expired:
+                self._discard(result_id)
+            self.expirations += len(expired)
+        return len(expired)
+    
+    def _discard(self, result_id):
+        # Caller holds the lock
+        info = self._entries.pop(result_id, None)
+        if info is None:
+            return
+        self.total_bytes -= info['size']
+        try:
+            os.remove(info['path'])
+        except OSError:
+            pass
+    
+    def stats(self):
+        """Return entry count, byte usage and eviction counters."""
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.total_bytes,
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+            }
+
+
 # Store processing results temporarily
-results = {}
+results = ResultStore(
+    max_bytes=int(float(os.environ.get('SILHOUETTE_WEB_RESULTS_MB', 256)) * 1024 * 1024),
+    ttl=int(os.environ.get('SILHOUETTE_WEB_RESULTS_TTL', 3600))
+)
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no room for another job."""
+
+
+class JobQueue:
+    """
+    Bounded pool of background workers for silhouette jobs.
+    
+    Jobs move through 'queued' -> 'running' -> 'done' or 'failed'. At most
+    max_pending jobs may be queued or running at once, so a burst of uploads
+    is rejected quickly instead of piling up behind slow requests.
+    """
+    
+    def __init__(self, max_workers=2, max_pending=32, on_finished=None):
+        self.max_pending = max_pending
+        self.on_finished = on_finished  # Called with the job dict once it is done or failed
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='silhouette-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, job_id, func, *args, **kwargs):
+        """
+        Queue func(*args, **kwargs) to run in the worker pool.
+        
+        The return value of func is stored as the job's result.
+        
+        Raises:
+            QueueFullError: If max_pending jobs are already queued or running
+        """
+        with self._lock:
+            pending = sum(1 for job in self._jobs.values() if job['status'] in ('queued', 'running'))
+            if pending >= self.max_pending:
+                self.rejected += 1
+                raise QueueFullError(f"Server busy: {pending} jobs already in progress")
+            
+            self._jobs[job_id] = {
+                'status': 'queued',
+                'error': None,
+                'result': None,
+                'created': time.time(),
+                'started': None,
+                'finished': None,
+            }
+        
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+    
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status='running', started=time.time())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            job = self._update(job_id, status='failed', error=str(e), finished=time.time())
+        else:
+            job = self._update(job_id, status='done', result=result, finished=time.time())
+        
+        if job is not None and self.on_finished is not None:
+            self.on_finished(job)
+    
+    def _update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job.update(fields)
+            if fields.get('status') == 'done':
+                self.completed += 1
+            elif fields.get('status') == 'failed':
+                self.failed += 1
+            return dict(job)
+    
+    def counts(self):
+        """Return the number of queued and running jobs."""
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {'queued': statuses.count('queued'), 'running': statuses.count('running')}
+    
+    def get(self, job_id):
+        """Return a copy of the job's state, or None if it is unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+    
+    def forget_finished(self, max_age):
+        """Drop finished jobs older than max_age seconds."""
+        cutoff = time.time() - max_age
+        with self._lock:
+            for job_id in [job_id for job_id, job in self._jobs.items()
+                           if job['finished'] is not None and job['finished'] < cutoff]:
+                del self._jobs[job_id]
+
+
+class Histogram:
+    """
+    Thread-safe cumulative histogram in the Prometheus exposition format.
+    
+    Observations can be split by the value of a single label (for example
+    the pipeline stage); each label value gets its own bucket counts.
+    """
+    
+    def __init__(self, name, help_text, buckets, label=None):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self.label = label
+        self._series = {}  # label value -> {'counts': [...], 'sum': float, 'count': int}
+        self._lock = threading.Lock()
+    
+    def observe(self, value, label_value=None):
+        with self._lock:
+            series = self._series.setdefault(label_value, {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series['counts'][index] += 1
+            series['sum'] += value
+            series['count'] += 1
+    
+    def render(self):
+        """Return the histogram as exposition-format lines."""
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted(self._series.items(), key=lambda item: str(item[0]))
+            series_items = [(label_value, dict(series, counts=list(series['counts'])))
+                            for label_value, series in series_items]
+        
+        for label_value, series in series_items:
+            labels = f'{self.label}="{label_value}",' if self.label else ''
+            for bound, count in zip(self.buckets, series['counts']):
+                lines.append(f'{self.name}_bucket{{{labels}le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels}le="+Inf"}} {series["count"]}')
+            suffix = '{' + labels.rstrip(',') + '}' if labels else ''
+            lines.append(f"{self.name}_sum{suffix} {series['sum']:.6f}")
+            lines.append(f"{self.name}_count{suffix} {series['count']}")
+        return lines
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+stage_seconds = Histogram('silhouette_stage_seconds', 'Time spent in each pipeline stage.', LATENCY_BUCKETS, label='stage')
+job_queue_seconds = Histogram('silhouette_job_queue_seconds', 'Time jobs waited in the queue before starting.', LATENCY_BUCKETS)
+job_run_seconds = Histogram('silhouette_job_run_seconds', 'Time jobs spent processing.', LATENCY_BUCKETS, label='status')
+
+# Per-stage pixel and failure counters, fed by the pipeline stage hook
+stage_counters = {}
+stage_counters_lock = threading.Lock()
+last_rss_bytes = None
+
+
+def record_stage(event):
+    """Pipeline stage hook: feed the stage histogram and counters"""
+    global last_rss_bytes
+    stage_seconds.observe(event['seconds'], event['stage'])
+    with stage_counters_lock:
+        counters = stage_counters.setdefault(event['stage'], {'pixels': 0, 'bytes': 0, 'failures': 0})
+        counters['pixels'] += event['pixels']
+        counters['bytes'] += event.get('bytes', 0)
+        counters['failures'] += event['failed']
+        if event.get('rss_bytes') is not None:
+            last_rss_bytes = event['rss_bytes']
+
+
+def record_job(job):
+    """Job queue callback: feed the queue wait and processing time histograms"""
+    job_queue_seconds.observe(job['started'] - job['created'])
+    job_run_seconds.observe(job['finished'] - job['started'], job['status'])
+
+
+if DEPENDENCIES_AVAILABLE:
+    add_stage_hook(record_stage)
+
+jobs = JobQueue(
+    max_workers=int(os.environ.get('SILHOUETTE_WEB_WORKERS', 2)),
+    max_pending=int(os.environ.get('SILHOUETTE_WEB_MAX_QUEUE', 32)),
+    on_finished=record_job
+)
+
+# Separate pool for /batch so a large upload can't starve single-image jobs
+BATCH_WORKERS = int(os.environ.get('SILHOUETTE_WEB_BATCH_WORKERS', 2))
+batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='silhouette-batch')
 
 # HTML template
 HTML_TEMPLATE = """
@@ -219,8 +552,8 @@ HTML_TEMPLATE = """
         
         <div id="dropZone" class="drop-zone">
             <div class="drop-text">Drop your image here</div>
-            <div class="drop-subtext">or click to select a file</div>
-            <input type="file" id="fileInput" accept="image/*" class="hidden">
+            <div class="drop-subtext">or click to select a file (several images or a .zip for a batch)</div>
+            <input type="file" id="fileInput" accept="image/*,.zip" multiple class="hidden">
         </div>
         
         <div class="options">
@@ -254,7 +587,7 @@ HTML_TEMPLATE = """
             Supports JPG, PNG, BMP, GIF, TIFF, WebP formats
         </div>
     </div>
-
+    
     <script>
         const dropZone = document.getElementById('dropZone');
         const fileInput = document.getElementById('fileInput');
@@ -270,9 +603,7 @@ HTML_TEMPLATE = """
         
         // File selection
         fileInput.addEventListener('change', (e) => {
-            if (e.target.files.length > 0) {
-                handleFile(e.target.files[0]);
-            }
+            handleFiles(e.target.files);
         });
         
         // Drag and drop
@@ -289,11 +620,57 @@ HTML_TEMPLATE = """
             e.preventDefault();
             dropZone.classList.remove('dragover');
             
-            if (e.dataTransfer.files.length > 0) {
-                handleFile(e.dataTransfer.files[0]);
-            }
+            handleFiles(e.dataTransfer.files);
         });
         
+        function handleFiles(files) {
+            if (files.length === 0) {
+                return;
+            }
+            if (files.length > 1 || files[0].name.toLowerCase().endsWith('.zip')) {
+                handleBatch(files);
+            } else {
+                handleFile(files[0]);
+            }
+        }
+        
+        function handleBatch(files) {
+            dropZone.classList.add('processing');
+            progress.style.display = 'block';
+            result.style.display = 'none';
+            
+            const formData = new FormData();
+            for (const file of files) {
+                formData.append('images', file);
+            }
+            formData.append('transparent', document.getElementById('transparentBg').checked);
+            formData.append('method', document.getElementById('method').value);
+            
+            fetch('/batch', {
+                method: 'POST',
+                body: formData
+            })
+            .then(response => {
+                if (!response.ok) {
+                    return response.json().then(data => { throw new Error(data.error); });
+                }
+                return response.blob();
+            })
+            .then(blob => {
+                finishProcessing();
+                showResult(`Processed ${files.length} upload(s) 🎉`, false);
+                resultContent.innerHTML = `
+                    <a href="${URL.createObjectURL(blob)}" class="download-btn" download="silhouettes.zip">
+                        📥 Download silhouettes.zip
+                    </a>
+                `;
+            })
+            .catch(error => {
+                finishProcessing();
+                showResult('Error: ' + error.message, true);
+            });
+        }
+        
         function handleFile(file) {
             // Validate file type
             const validTypes = ['image/jpeg', 'image/jpg', 'image/png', 'image/bmp', 'image/gif', 'image/tiff', 'image/webp'];
@@ -320,22 +697,46 @@ HTML_TEMPLATE = """
             })
             .then(response => response.json())
             .then(data => {
-                dropZone.classList.remove('processing');
-                progress.style.display = 'none';
-                
                 if (data.success) {
-                    showResult('Silhouette created successfully! 🎉', false, data.result_id);
+                    pollJob(data.job_id);
                 } else {
+                    finishProcessing();
                     showResult('Error: ' + data.error, true);
                 }
             })
             .catch(error => {
-                dropZone.classList.remove('processing');
-                progress.style.display = 'none';
+                finishProcessing();
+                showResult('Network error: ' + error.message, true);
+            });
+        }
+        
+        function pollJob(jobId) {
+            fetch(`/status/${jobId}`)
+            .then(response => response.json())
+            .then(data => {
+                if (data.status === 'queued' || data.status === 'running') {
+                    setTimeout(() => pollJob(jobId), 500);
+                    return;
+                }
+                
+                finishProcessing();
+                if (data.status === 'done') {
+                    showResult('Silhouette created successfully! 🎉', false, jobId);
+                } else {
+                    showResult('Error: ' + (data.error || 'Failed to create silhouette'), true);
+                }
+            })
+            .catch(error => {
+                finishProcessing();
                 showResult('Network error: ' + error.message, true);
             });
         }
         
+        function finishProcessing() {
+            dropZone.classList.remove('processing');
+            progress.style.display = 'none';
+        }
+        
         function showResult(message, isError, resultId = null) {
             result.style.display = 'block';
             result.className = isError ? 'result error' : 'result';
@@ -388,107 +789,362 @@ def process_image():
         transparent = request.form.get('transparent') == 'true'
         method = request.form.get('method', 'auto')
         
-        # Generate unique ID for this processing job
+        # Generate unique ID for this processing job (also the result ID)
         result_id = str(uuid.uuid4())
         
-        # Save uploaded file temporarily
-        temp_dir = tempfile.gettempdir()
-        input_path = os.path.join(temp_dir, f"input_{result_id}.{file.filename.split('.')[-1]}")
-        output_path = os.path.join(temp_dir, f"silhouette_{result_id}.png")
+        # Hand the spooled upload stream to the job as-is; a placeholder takes its
+        # place so Flask's end-of-request cleanup doesn't close it under the worker
+        upload_stream = file.stream
+        file.stream = io.BytesIO()
+        background = 'transparent' if transparent else 'white'
         
-        file.save(input_path)
+        try:
+            jobs.submit(result_id, run_silhouette_job, result_id, upload_stream, method, background)
+        except QueueFullError:
+            upload_stream.close()
+            raise
         
-        # Process the image
-        background = 'transparent' if transparent else 'white'
-        success = False
+        return jsonify({'success': True, 'job_id': result_id, 'status': 'queued'}), 202
+    
+    except QueueFullError as e:
+        return jsonify({'success': False, 'error': str(e)}), 503
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+class ZipStreamBuffer(io.RawIOBase):
+    """Write-only, non-seekable sink that lets zipfile produce an archive chunk by chunk"""
+    
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self._position
+    
+    def take(self):
+        """Return and forget everything written since the last call"""
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+def collect_batch_inputs(uploads):
+    """
+    Expand uploaded images and zip archives into (name, read_data) entries.
+    
+    Returns:
+        tuple: (entries, streams) where streams must be closed after processing
+    """
+    entries = []
+    streams = []
+    uncompressed_bytes = 0
+    
+    for upload in uploads:
+        # Detach the stream: the response is streamed after the request context ends
+        stream = upload.stream
+        upload.stream = io.BytesIO()
+        streams.append(stream)
         
-        if method == 'auto':
-            success = create_silhouette(input_path, output_path, background, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=True, padding=10)
-        else:
-            if transparent:
-                # For simple method with transparency
-                temp_path = output_path.replace('.png', '_temp.png')
-                success = create_simple_silhouette(input_path, temp_path, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=True, padding=10, background_color='white')
+        if not upload.filename:
+            continue
+        
+        if upload.filename.lower().endswith('.zip'):
+            archive = zipfile.ZipFile(stream)
+            streams.append(archive)
+            for member in archive.infolist():
+                if member.is_dir() or Path(member.filename).suffix.lower() not in IMAGE_EXTENSIONS:
+                    continue
+                # Guard against archives that expand far beyond the upload limit
+                uncompressed_bytes += member.file_size
+                if uncompressed_bytes > BATCH_MAX_BYTES:
+                    raise ValueError("Archive contents exceed the batch size limit")
+                entries.append((member.filename, lambda archive=archive, member=member: archive.read(member)))
+        elif Path(upload.filename).suffix.lower() in IMAGE_EXTENSIONS:
+            entries.append((upload.filename, stream.read))
+        
+        if len(entries) > BATCH_MAX_FILES:
+            raise ValueError(f"Too many images (limit is {BATCH_MAX_FILES})")
+    
+    return entries, streams
+
+def process_batch_entry(name, read_data, method, background):
+    """Create one silhouette for /batch; never raises, errors go in the manifest"""
+    start = time.perf_counter()
+    try:
+        silhouette_data = generate_silhouette(
+            read_data(),
+            method='auto' if method == 'auto' else 'simple',
+            background_color=background,
+            smooth_edges=True,
+            blur_radius=1,
+            vector_style=True,
+            crop_to_subject_flag=True,
+            padding=10,
+            inference_size=INFERENCE_SIZE
+        )
+        return {'input': name, 'success': True, 'bytes': len(silhouette_data),
+                'seconds': round(time.perf_counter() - start, 3)}, silhouette_data
+    except Exception as e:
+        return {'input': name, 'success': False, 'error': str(e),
+                'seconds': round(time.perf_counter() - start, 3)}, None
+
+def unique_output_name(name, used):
+    """Map an input name to a unique 'silhouettes/<stem>.png' archive path"""
+    stem = secure_filename(Path(name).stem) or 'image'
+    candidate = f"silhouettes/{stem}.png"
+    counter = 2
+    while candidate in used:
+        candidate = f"silhouettes/{stem}-{counter}.png"
+        counter += 1
+    used.add(candidate)
+    return candidate
+
+def stream_batch_zip(entries, streams, method, background):
+    """Yield a zip of silhouettes, adding each one as soon as it is ready"""
+    buffer = ZipStreamBuffer()
+    manifest = []
+    used_names = set()
+    batch_start = time.perf_counter()
+    
+    # Keep only a couple of images per worker in flight, so finished
+    # silhouettes never pile up in memory waiting to be written
+    max_in_flight = max(1, BATCH_WORKERS * 2)
+    pending_entries = iter(entries)
+    in_flight = set()
+    
+    try:
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+            while True:
+                for name, read_data in pending_entries:
+                    in_flight.add(batch_executor.submit(process_batch_entry, name, read_data, method, background))
+                    if len(in_flight) >= max_in_flight:
+                        break
+                if not in_flight:
+                    break
                 
-                if success:
-                    try:
-                        # Convert white background to transparent
-                        img = Image.open(temp_path).convert("RGBA")
-                        datas = img.getdata()
-                        
-                        newData = []
-                        for item in datas:
-                            if item[0] > 200 and item[1] > 200 and item[2] > 200:
-                                newData.append((255, 255, 255, 0))  # Transparent
-                            else:
-                                newData.append(item)
-                        
-                        img.putdata(newData)
-                        img.save(output_path, "PNG")
-                        os.remove(temp_path)
-                    except Exception as e:
-                        if os.path.exists(temp_path):
-                            os.rename(temp_path, output_path)
-            else:
-                success = create_simple_silhouette(input_path, output_path, smooth_edges=True, blur_radius=1, vector_style=True, crop_to_subject_flag=True, padding=10, background_color=background)
-        
-        # Clean up input file
-        os.remove(input_path)
-        
-        if success and os.path.exists(output_path):
-            # Store result info
-            results[result_id] = {
-                'path': output_path,
-                'timestamp': os.path.getmtime(output_path)
-            }
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    entry, silhouette_data = future.result()
+                    if silhouette_data is not None:
+                        entry['output'] = unique_output_name(entry['input'], used_names)
+                        archive.writestr(entry['output'], silhouette_data)
+                    manifest.append(entry)
+                yield buffer.take()
             
-            return jsonify({'success': True, 'result_id': result_id})
-        else:
-            return jsonify({'success': False, 'error': 'Failed to create silhouette'})
-            
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)})
+            succeeded = sum(1 for entry in manifest if entry['success'])
+            archive.writestr('manifest.json', json.dumps({
+                'total': len(manifest),
+                'succeeded': succeeded,
+                'failed': len(manifest) - succeeded,
+                'seconds': round(time.perf_counter() - batch_start, 3),
+                'files': manifest,
+            }, indent=2))
+        yield buffer.take()
+    finally:
+        for future in in_flight:
+            future.cancel()
+        for stream in reversed(streams):
+            stream.close()
 
-@app.route('/download/<result_id>')
-def download_result(result_id):
-    if result_id not in results:
-        return "Result not found", 404
+@app.route('/batch', methods=['POST'])
+def batch_process():
+    if not DEPENDENCIES_AVAILABLE:
+        return jsonify({'success': False, 'error': 'Required dependencies not installed'})
+    
+    uploads = request.files.getlist('images')
+    if not uploads:
+        return jsonify({'success': False, 'error': 'No image files provided'}), 400
+    
+    transparent = request.form.get('transparent') == 'true'
+    method = request.form.get('method', 'auto')
+    background = 'transparent' if transparent else 'white'
     
-    file_path = results[result_id]['path']
-    if not os.path.exists(file_path):
-        return "File not found", 404
+    try:
+        entries, streams = collect_batch_inputs(uploads)
+    except (ValueError, zipfile.BadZipFile) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if not entries:
+        for stream in streams:
+            stream.close()
+        return jsonify({'success': False, 'error': 'No supported images found'}), 400
     
-    return send_file(file_path, as_attachment=True, download_name=f'silhouette_{result_id}.png')
+    return Response(
+        stream_batch_zip(entries, streams, method, background),
+        mimetype='application/zip',
+        headers={'Content-Disposition': 'attachment; filename=silhouettes.zip'}
+    )
 
-@app.route('/preview/<result_id>')
-def preview_result(result_id):
-    if result_id not in results:
-        return "Result not found", 404
+def run_silhouette_job(result_id, upload_stream, method, background):
+    """Worker-side half of /process: create the silhouette and record the result"""
+    try:
+        silhouette_data = generate_silhouette(
+            upload_stream,
+            method='auto' if method == 'auto' else 'simple',
+            background_color=background,
+            smooth_edges=True,
+            blur_radius=1,
+            vector_style=True,
+            crop_to_subject_flag=True,
+            padding=10,
+            inference_size=INFERENCE_SIZE
+        )
+    finally:
+        upload_stream.close()
+    
+    # Store result info
+    results.add(result_id, silhouette_data)
+    return result_id
+
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'status': 'unknown', 'error': 'Job not found'}), 404
+    
+    response = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'failed':
+        response['error'] = job['error']
+    if job['started'] is not None:
+        response['queued_seconds'] = round(job['started'] - job['created'], 3)
+    if job['finished'] is not None:
+        response['processing_seconds'] = round(job['finished'] - job['started'], 3)
+    return jsonify(response)
+
+@app.route('/result/<job_id>')
+def job_result(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    if job['status'] == 'failed':
+        return jsonify({'success': False, 'status': 'failed', 'error': job['error']})
+    if job['status'] != 'done':
+        return jsonify({'success': False, 'status': job['status']}), 202
+    
+    return jsonify({
+        'success': True,
+        'status': 'done',
+        'result_id': job['result'],
+        'preview_url': url_for('preview_result', result_id=job['result']),
+        'download_url': url_for('download_result', result_id=job['result']),
+    })
+
+def pending_response(result_id):
+    """Response for a result whose job has not finished yet, or None"""
+    job = jobs.get(result_id)
+    if job is not None and job['status'] in ('queued', 'running'):
+        return jsonify({'status': job['status']}), 202
+    return None
+
+def send_result(result_id, as_attachment=False):
+    """Send a stored result with validators, answering revalidations with 304"""
+    info = results.get(result_id)
+    if info is None:
+        return pending_response(result_id) or ("Result not found", 404)
+    
+    last_modified = datetime.fromtimestamp(int(info['timestamp']), timezone.utc)
     
-    file_path = results[result_id]['path']
-    if not os.path.exists(file_path):
-        return "File not found", 404
+    # Results never change once written, so a matching validator needs no disk access
+    if not is_resource_modified(request.environ, etag=info['etag'], last_modified=last_modified):
+        response = Response(status=304)
+    else:
+        if not os.path.exists(info['path']):
+            return "File not found", 404
+        response = send_file(
+            info['path'],
+            mimetype='image/png',
+            as_attachment=as_attachment,
+            download_name=f'silhouette_{result_id}.png',
+            conditional=True,
+            etag=False
+        )
     
-    return send_file(file_path)
+    response.set_etag(info['etag'])
+    response.last_modified = last_modified
+    response.cache_control.no_cache = None
+    response.cache_control.private = True
+    response.cache_control.max_age = results.ttl
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/download/<result_id>')
+def download_result(result_id):
+    return send_result(result_id, as_attachment=True)
+
+@app.route('/preview/<result_id>')
+def preview_result(result_id):
+    return send_result(result_id)
 
 def cleanup_old_results():
-    """Clean up old temporary files"""
-    import time
-    current_time = time.time()
-    to_remove = []
-    
-    for result_id, info in results.items():
-        # Remove files older than 1 hour
-        if current_time - info['timestamp'] > 3600:
-            try:
-                if os.path.exists(info['path']):
-                    os.remove(info['path'])
-                to_remove.append(result_id)
-            except:
-                pass
-    
-    for result_id in to_remove:
-        del results[result_id]
+    """Clean up expired results and finished jobs"""
+    results.cleanup()
+    jobs.forget_finished(results.ttl)
+
+@app.route('/stats')
+def stats():
+    return jsonify({'results': results.stats()})
+
+def metric_lines(name, metric_type, help_text, samples):
+    """Format one metric family; samples are (label string, value) pairs"""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+    for labels, value in samples:
+        lines.append(f"{name}{labels} {value}")
+    return lines
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus scrape endpoint: stage latencies, job queue, result store and cache counters"""
+    lines = stage_seconds.render() + job_queue_seconds.render() + job_run_seconds.render()
+    
+    with stage_counters_lock:
+        counters = {stage: dict(values) for stage, values in sorted(stage_counters.items())}
+        rss_bytes = last_rss_bytes
+    lines += metric_lines('silhouette_stage_pixels_total', 'counter', 'Pixels processed by each pipeline stage.',
+                          [(f'{{stage="{stage}"}}', values['pixels']) for stage, values in counters.items()])
+    lines += metric_lines('silhouette_stage_failures_total', 'counter', 'Pipeline stages that raised an error.',
+                          [(f'{{stage="{stage}"}}', values['failures']) for stage, values in counters.items()])
+    lines += metric_lines('silhouette_encoded_bytes_total', 'counter', 'Bytes of encoded silhouettes produced.',
+                          [('', counters.get('encode', {}).get('bytes', 0))])
+    if rss_bytes is not None:
+        lines += metric_lines('silhouette_process_rss_bytes', 'gauge', 'Resident memory sampled after the last stage.',
+                              [('', rss_bytes)])
+    
+    queue_counts = jobs.counts()
+    lines += metric_lines('silhouette_jobs', 'gauge', 'Jobs currently queued or running.',
+                          [(f'{{status="{status}"}}', count) for status, count in sorted(queue_counts.items())])
+    lines += metric_lines('silhouette_jobs_finished_total', 'counter', 'Jobs that finished, by outcome.',
+                          [('{status="done"}', jobs.completed), ('{status="failed"}', jobs.failed)])
+    lines += metric_lines('silhouette_jobs_rejected_total', 'counter', 'Jobs rejected because the queue was full.',
+                          [('', jobs.rejected)])
+    lines += metric_lines('silhouette_queue_capacity', 'gauge', 'Maximum queued plus running jobs.',
+                          [('', jobs.max_pending)])
+    
+    result_stats = results.stats()
+    lines += metric_lines('silhouette_results', 'gauge', 'Results held in the result store.',
+                          [('', result_stats['entries'])])
+    lines += metric_lines('silhouette_results_bytes', 'gauge', 'Bytes held in the result store.',
+                          [('', result_stats['bytes'])])
+    lines += metric_lines('silhouette_results_removed_total', 'counter', 'Results removed from the store.',
+                          [('{reason="evicted"}', result_stats['evictions']),
+                           ('{reason="expired"}', result_stats['expirations'])])
+    
+    if DEPENDENCIES_AVAILABLE:
+        # Counters only; SilhouetteCache.stats() walks the cache directory
+        cache = get_default_cache()
+        lines += metric_lines('silhouette_cache_requests_total', 'counter', 'Output cache lookups, by outcome.',
+                              [('{result="hit"}', cache.hits), ('{result="miss"}', cache.misses)])
+        lines += metric_lines('silhouette_cache_evictions_total', 'counter', 'Output cache entries evicted.',
+                              [('', cache.evictions)])
+    
+    return Response('\n'.join(lines) + '\n', content_type='text/plain; version=0.0.4; charset=utf-8')
 
 def open_browser():
     """Open browser after a short delay"""
@@ -507,6 +1163,9 @@ if __name__ == '__main__':
     print("Open your browser to: http://localhost:8080")
     print("Press Ctrl+C to stop the server")
     
+    # Load the background removal model once, shared by all request threads
+    preload_rembg_session()
+    
     # Start browser opener in separate thread
     threading.Thread(target=open_browser, daemon=True).start()
     
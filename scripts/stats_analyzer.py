@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Practice Statistics Analyzer
+
+Summarises CSVs written by the app's "Export Stats" button (exportStatsCSV
+in main.js): time per pose, tag, chakra and difficulty, completion rates,
+day streaks and left/right balance. Merged exports from many members are
+supported; every "Session Summary" block starts a new member, and several
+files can be given at once.
+
+The CSV is streamed in fixed-size chunks. Each chunk is turned into NumPy
+columns, strings are encoded to integer codes, and group-bys are weighted
+bincounts folded into running totals, so memory depends on the number of
+distinct poses, flows and practice days, not on the number of rows.
+
+Chakras are not in the export; they are looked up from the pose catalog by
+pose name.
+
+Requirements:
+- pip install numpy
+- asana_catalog.py and flow_generator.py (same directory)
+
+Usage:
+python stats_analyzer.py flowbuilder-stats.csv
+python stats_analyzer.py exports/*.csv --top 20
+python stats_analyzer.py studio-merged.csv --today 2026-10-18 --json > summary.json
+"""
+
+import sys
+import csv
+import glob
+import json
+import time
+import argparse
+from itertools import compress
+from operator import itemgetter
+from datetime import date
+import numpy as np
+
+from asana_catalog import DEFAULT_XML, load_asanas
+from flow_generator import pose_slug
+
+
+CHUNK_BYTES = 4 * 1024 * 1024  # CSV text parsed per chunk; larger chunks only add GC work
+
+SESSION_COLUMNS = 6  # Date,Type,Flow Name,Duration (min),Poses,Completed
+POSE_COLUMNS = 8     # Date,Flow Name,Pose,Sanskrit,Duration (s),Difficulty,Tags,Side
+
+# Member days are packed as member << 32 | day so they sort by member, then day
+_DAY_BITS = 32
+
+
+class Codebook:
+    """Assigns stable integer codes to strings across chunks."""
+    
+    def __init__(self):
+        self.index = {}
+        self.values = []
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def encode(self, strings):
+        """
+        Encode a column of strings.
+        
+        Returns:
+            numpy.ndarray: int64 code per string
+        """
+        codes = list(map(self.index.get, strings))
+        if None in codes:
+            for value in dict.fromkeys(strings):
+                if value not in self.index:
+                    self.index[value] = len(self.values)
+                    self.values.append(value)
+            codes = list(map(self.index.get, strings))
+        return np.array(codes, dtype=np.int64)
+
+
+def _columns(rows, *positions):
+    """Pull the given columns out of a list of rows (much faster than zip(*rows) on big chunks)."""
+    return [list(map(itemgetter(position), rows)) for position in positions]
+
+
+def _accumulate(totals, codes, size, weights=None):
+    """Add a weighted bincount of codes to a running totals array, growing it as needed."""
+    counts = np.bincount(codes, weights=weights, minlength=size)
+    if len(totals) < size:
+        totals = np.pad(totals, (0, size - len(totals)))
+    totals[:len(counts)] += counts
+    return totals
+
+
+def _to_float(column):
+    """Parse a column of numbers; unparseable values become NaN."""
+    try:
+        return np.array(column, dtype=np.float64)
+    except ValueError:
+        values = np.empty(len(column), dtype=np.float64)
+        for position, value in enumerate(column):
+            try:
+                values[position] = float(value)
+            except ValueError:
+                values[position] = np.nan
+        return values
+
+
+def _to_days(column):
+    """Parse ISO timestamps to days since 1970-01-01 (UTC); unparseable values become NaT."""
+    truncated = np.array(column, dtype='U10')  # "2026-10-18T06:12:33.123Z" -> "2026-10-18"
+    try:
+        return truncated.astype('datetime64[D]')
+    except ValueError:
+        days = np.empty(len(truncated), dtype='datetime64[D]')
+        for position, value in enumerate(truncated):
+            try:
+                days[position] = np.datetime64(value, 'D')
+            except ValueError:
+                days[position] = np.datetime64('NaT')
+        return days
+
+
+class PracticeStats:
+    """Running aggregates over session and pose rows, fed one chunk at a time."""
+    
+    def __init__(self):
+        self.members = []  # Label per member ("file.csv#2")
+        self.flows = Codebook()
+        self.types = Codebook()
+        self.step_kinds = Codebook()  # (pose name, difficulty, tags, side)
+        
+        empty = np.zeros(0, dtype=np.float64)
+        self.flow_sessions = empty
+        self.flow_completed = empty
+        self.type_sessions = empty
+        self.type_completed = empty
+        self.type_minutes = empty
+        self.member_days = np.zeros(0, dtype=np.int64)
+        
+        self.kind_seconds = empty
+        self.kind_holds = empty
+        
+        self.session_rows = 0
+        self.pose_rows = 0
+        self.skipped_rows = 0
+    
+    def add_sessions(self, rows):
+        """Fold Session Summary rows ([date, type, flow, minutes, poses, completed, member]) into the totals."""
+        dates, types, flows, minutes, completed, members = _columns(rows, 0, 1, 2, 3, 5, 6)
+        days = _to_days(dates)
+        minutes = _to_float(minutes)
+        valid = ~np.isnat(days) & ~np.isnan(minutes)
+        self.skipped_rows += int(len(rows) - valid.sum())
+        self.session_rows += int(valid.sum())
+        
+        type_codes = self.types.encode(types)[valid]
+        flow_codes = self.flows.encode(flows)[valid]
+        done = (np.array(completed) == 'Yes')[valid].astype(np.float64)
+        
+        self.type_sessions = _accumulate(self.type_sessions, type_codes, len(self.types))
+        self.type_completed = _accumulate(self.type_completed, type_codes, len(self.types), done)
+        self.type_minutes = _accumulate(self.type_minutes, type_codes, len(self.types), minutes[valid])
+        self.flow_sessions = _accumulate(self.flow_sessions, flow_codes, len(self.flows))
+        self.flow_completed = _accumulate(self.flow_completed, flow_codes, len(self.flows), done)
+        
+        keys = (np.array(members, dtype=np.int64)[valid] << _DAY_BITS) | days[valid].astype(np.int64)
+        self.member_days = np.union1d(self.member_days, keys)
+    
+    def add_poses(self, rows):
+        """
+        Fold Pose Detail rows into the totals.
+        
+        Rows are grouped by one composite key, (pose, difficulty, tags, side).
+        There are only a few thousand distinct keys however many rows there
+        are, so one encode and one bincount per chunk cover every group-by;
+        per-pose, per-tag, per-difficulty and per-side totals are split out of
+        the keys at report time.
+        """
+        seconds = _to_float(list(map(itemgetter(4), rows)))
+        valid = ~np.isnan(seconds)
+        self.skipped_rows += int(len(rows) - valid.sum())
+        self.pose_rows += int(valid.sum())
+        
+        kind_codes = self.step_kinds.encode(list(map(itemgetter(2, 5, 6, 7), rows)))[valid]
+        self.kind_seconds = _accumulate(self.kind_seconds, kind_codes, len(self.step_kinds), seconds[valid])
+        self.kind_holds = _accumulate(self.kind_holds, kind_codes, len(self.step_kinds))
+    
+    def group_kinds(self, field, mask=None):
+        """
+        Total the step kinds by one part of their key.
+        
+        Args:
+            field (int): 0 pose name, 1 difficulty, 2 tags, 3 side
+            mask (numpy.ndarray): Only count the kinds where this is True
+        
+        Returns:
+            tuple: (group values, seconds per group, holds per group)
+        """
+        groups = Codebook()
+        codes = groups.encode([kind[field] for kind in self.step_kinds.values])
+        seconds, holds = self.kind_seconds, self.kind_holds
+        if mask is not None:
+            codes, seconds, holds = codes[mask], seconds[mask], holds[mask]
+        return (groups.values, np.bincount(codes, weights=seconds, minlength=len(groups)),
+                np.bincount(codes, weights=holds, minlength=len(groups)))
+    
+    def read_csv(self, path, chunk_bytes=CHUNK_BYTES):
+        """
+        Stream one exported CSV into the totals, about chunk_bytes of text at a time.
+        
+        Rows are told apart by column count. Pose rows make up nearly all of
+        an export, so each chunk is parsed in one go and only the other rows
+        (titles, headers, blanks and session rows) are visited one by one.
+        Each "Session Summary" title starts a new member.
+        """
+        member = None
+        skip_header = False
+        with open(path, 'r', encoding='utf-8-sig', newline='') as csv_file:
+            while True:
+                lines = csv_file.readlines(chunk_bytes)
+                if not lines:
+                    break
+                rows = list(csv.reader(lines))
+                is_pose = np.fromiter(map(len, rows), dtype=np.int64, count=len(rows)) == POSE_COLUMNS
+                header = None
+                if skip_header:
+                    # The previous chunk ended on the "Pose Detail" title
+                    header = 0
+                    is_pose[0] = False
+                    skip_header = False
+                
+                sessions = []
+                for position in np.flatnonzero(~is_pose):
+                    row = rows[position]
+                    if position == header:
+                        continue
+                    if len(row) == SESSION_COLUMNS:
+                        if row[0] == 'Date':
+                            continue
+                        if member is None:
+                            member = self._new_member(path)
+                        row.append(member)
+                        sessions.append(row)
+                    elif row == ['Session Summary']:
+                        member = self._new_member(path)
+                    elif row == ['Pose Detail']:
+                        # The column header row follows the title
+                        if position + 1 < len(rows):
+                            is_pose[position + 1] = False
+                        else:
+                            skip_header = True
+                    elif any(row):
+                        self.skipped_rows += 1
+                
+                if sessions:
+                    self.add_sessions(sessions)
+                if is_pose.any():
+                    self.add_poses(list(compress(rows, is_pose)))
+    
+    def _new_member(self, path):
+        self.members.append(f"{path}#{len(self.members) + 1}")
+        return len(self.members) - 1
+    
+    def streaks(self, today):
+        """
+        Longest and current run of consecutive practice days for every member.
+        
+        A current streak must include today or yesterday, as in the app.
+        
+        Args:
+            today (numpy.datetime64): Reference day
+        
+        Returns:
+            tuple: (longest per member, current per member) int arrays
+        """
+        longest = np.zeros(len(self.members), dtype=np.int64)
+        current = np.zeros(len(self.members), dtype=np.int64)
+        if len(self.member_days) == 0:
+            return longest, current
+        
+        members = self.member_days >> _DAY_BITS
+        days = self.member_days & ((1 << _DAY_BITS) - 1)
+        run_start = np.ones(len(days), dtype=bool)
+        run_start[1:] = (members[1:] != members[:-1]) | (days[1:] - days[:-1] != 1)
+        run_end = np.append(run_start[1:], True)
+        
+        run_lengths = np.bincount(np.cumsum(run_start) - 1)
+        run_members = members[run_start]
+        np.maximum.at(longest, run_members, run_lengths)
+        
+        live = days[run_end] >= today.astype(np.int64) - 1
+        np.maximum.at(current, run_members[live], run_lengths[live])
+        return longest, current
+    
+    def tag_totals(self):
+        """Return {tag: (seconds, holds)}; tags arrive joined as "Standing;Balance"."""
+        totals = {}
+        for tag_set, seconds, holds in zip(*self.group_kinds(2)):
+            for tag in filter(None, tag_set.split(';')):
+                previous = totals.get(tag, (0.0, 0.0))
+                totals[tag] = (previous[0] + seconds, previous[1] + holds)
+        return totals
+    
+    def chakra_totals(self, pose_chakras):
+        """
+        Return {chakra: seconds} using a pose -> chakras lookup.
+        
+        Args:
+            pose_chakras (dict): Lowercase pose name or slug -> list of chakras
+        """
+        totals = {}
+        names, pose_seconds, _ = self.group_kinds(0)
+        for name, seconds in zip(names, pose_seconds):
+            chakras = pose_chakras.get(name.lower()) or pose_chakras.get(name.lower().replace(' ', '-'), [])
+            for chakra in chakras:
+                totals[chakra] = totals.get(chakra, 0.0) + seconds
+        return totals
+    
+    def summary(self, today, top=10, pose_chakras=None):
+        """
+        Build the report.
+        
+        Args:
+            today (numpy.datetime64): Reference day for current streaks
+            top (int): Entries kept in each ranked list
+            pose_chakras (dict): Pose name -> chakras, or None to skip chakras
+        
+        Returns:
+            dict: JSON-serialisable summary
+        """
+        def ranked(names, values, extra=None):
+            order = np.argsort(-values, kind='stable')[:top]
+            return [dict({'name': names[index], 'seconds': float(values[index])},
+                         **(extra(index) if extra else {})) for index in order]
+        
+        sessions = float(self.type_sessions.sum())
+        completed = float(self.type_completed.sum())
+        longest, current = self.streaks(today)
+        
+        poses, pose_seconds, pose_holds = self.group_kinds(0)
+        # Exports write 'Left'/'Right', flow files 'left'/'right'
+        sides = [kind[3].lower() for kind in self.step_kinds.values]
+        _, left, _ = self.group_kinds(0, np.array([side == 'left' for side in sides], dtype=bool))
+        _, right, _ = self.group_kinds(0, np.array([side == 'right' for side in sides], dtype=bool))
+        sided = left + right
+        # +1 is all on the left, -1 all on the right
+        imbalance = (left - right) / np.maximum(sided, 1e-9)
+        unbalanced = [index for index in np.argsort(-np.abs(imbalance), kind='stable') if sided[index] > 0][:top]
+        
+        tags = self.tag_totals()
+        tag_names = sorted(tags, key=lambda tag: -tags[tag][0])[:top]
+        chakras = self.chakra_totals(pose_chakras) if pose_chakras is not None else {}
+        
+        return {
+            'members': len(self.members),
+            'sessions': int(sessions),
+            'practice_minutes': float(self.type_minutes.sum()),
+            'completion_rate': completed / sessions if sessions else 0.0,
+            'by_type': [
+                {'type': name, 'sessions': int(count), 'completion_rate': float(done / count), 'minutes': float(minutes)}
+                for name, count, done, minutes in zip(self.types.values, self.type_sessions,
+                                                      self.type_completed, self.type_minutes) if count
+            ],
+            'top_flows': [
+                {'name': self.flows.values[index], 'sessions': int(self.flow_sessions[index]),
+                 'completion_rate': float(self.flow_completed[index] / self.flow_sessions[index])}
+                for index in np.argsort(-self.flow_sessions, kind='stable')[:top] if self.flow_sessions[index]
+            ],
+            'streaks': {
+                'longest': int(longest.max()) if len(longest) else 0,
+                'mean_longest': float(longest.mean()) if len(longest) else 0.0,
+                'members_on_streak': int((current > 0).sum()),
+                'mean_current': float(current[current > 0].mean()) if (current > 0).any() else 0.0,
+            },
+            'time_per_pose': ranked(poses, pose_seconds, lambda index: {'holds': int(pose_holds[index])}),
+            'time_per_tag': [{'name': tag, 'seconds': tags[tag][0], 'holds': int(tags[tag][1])} for tag in tag_names],
+            'time_per_chakra': [{'name': chakra, 'seconds': seconds}
+                                for chakra, seconds in sorted(chakras.items(), key=lambda item: -item[1])],
+            'time_per_difficulty': ranked(*self.group_kinds(1)[:2]),
+            'side_balance': {
+                'left_seconds': float(left.sum()),
+                'right_seconds': float(right.sum()),
+                'most_unbalanced': [
+                    {'name': poses[index], 'left_seconds': float(left[index]),
+                     'right_seconds': float(right[index]), 'imbalance': float(imbalance[index])}
+                    for index in unbalanced
+                ],
+            },
+            'rows': {'sessions': self.session_rows, 'poses': self.pose_rows, 'skipped': self.skipped_rows},
+        }
+
+
+def load_pose_chakras(source):
+    """Map lowercase pose names and slugs to their chakras."""
+    pose_chakras = {}
+    for asana in load_asanas(source):
+        pose_chakras[asana['name'].lower()] = asana['chakras']
+        pose_chakras.setdefault(pose_slug(asana), asana['chakras'])
+    return pose_chakras
+
+
+def _format_duration(seconds):
+    """Same format as formatDuration in main.js ("1h 5m", "12m")."""
+    hours, minutes = int(seconds // 3600), int(seconds % 3600 // 60)
+    return f"{hours}h {minutes}m" if hours else f"{minutes}m"
+
+
+def print_report(summary):
+    """Print a summary from PracticeStats.summary as text."""
+    print(f"Members: {summary['members']}   Sessions: {summary['sessions']}   "
+          f"Practice time: {_format_duration(summary['practice_minutes'] * 60)}   "
+          f"Completion rate: {summary['completion_rate']:.0%}")
+    streaks = summary['streaks']
+    print(f"Streaks: longest {streaks['longest']} days, mean longest {streaks['mean_longest']:.1f}; "
+          f"{streaks['members_on_streak']} member(s) on a current streak (mean {streaks['mean_current']:.1f} days)")
+    
+    print("\nBy session type:")
+    for entry in summary['by_type']:
+        print(f"  {entry['type']:<28} {entry['sessions']:>9} sessions  {entry['completion_rate']:>5.0%} completed  "
+              f"{_format_duration(entry['minutes'] * 60)}")
+    
+    print("\nTop flows:")
+    for entry in summary['top_flows']:
+        print(f"  {entry['name'][:40]:<40} {entry['sessions']:>9} sessions  {entry['completion_rate']:>5.0%} completed")
+    
+    for title, key in (('Time per pose', 'time_per_pose'), ('Time per tag', 'time_per_tag'),
+                       ('Time per chakra', 'time_per_chakra'), ('Time per difficulty', 'time_per_difficulty')):
+        if not summary[key]:
+            continue
+        print(f"\n{title}:")
+        for entry in summary[key]:
+            holds = f"  {entry['holds']:>9} holds" if 'holds' in entry else ''
+            print(f"  {entry['name'][:40]:<40} {_format_duration(entry['seconds']):>10}{holds}")
+    
+    balance = summary['side_balance']
+    print(f"\nLeft/right balance: left {_format_duration(balance['left_seconds'])}, right {_format_duration(balance['right_seconds'])}")
+    for entry in balance['most_unbalanced']:
+        left_share = (1 + entry['imbalance']) / 2
+        print(f"  {entry['name'][:40]:<40} L {_format_duration(entry['left_seconds']):>9}  R {_format_duration(entry['right_seconds']):>9}  "
+              f"{left_share:.0%} on the left")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarise practice statistics CSV exports')
+    parser.add_argument('inputs', nargs='+', help='Exported stats CSV files or glob patterns')
+    parser.add_argument('--source', default=DEFAULT_XML, help='asanas.xml or a compiled catalog (for chakras)')
+    parser.add_argument('--today', help='Reference day for current streaks, YYYY-MM-DD (default: today)')
+    parser.add_argument('--top', type=int, default=10, help='Entries in each ranked list (default: 10)')
+    parser.add_argument('--chunk-mb', type=int, default=CHUNK_BYTES // (1024 * 1024),
+                       help='Megabytes of CSV text processed per chunk (default: %(default)s)')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON')
+    
+    args = parser.parse_args()
+    
+    paths = [path for pattern in args.inputs for path in (sorted(glob.glob(pattern)) or [pattern])]
+    try:
+        today = np.datetime64(args.today or date.today().isoformat(), 'D')
+    except ValueError:
+        print(f"Error: Invalid --today '{args.today}' (expected YYYY-MM-DD)")
+        sys.exit(1)
+    
+    try:
+        pose_chakras = load_pose_chakras(args.source)
+    except (OSError, ValueError) as e:
+        print(f"Warning: Could not load the pose catalog, chakras skipped: {e}", file=sys.stderr)
+        pose_chakras = None
+    
+    stats = PracticeStats()
+    start_time = time.perf_counter()
+    for path in paths:
+        try:
+            stats.read_csv(path, args.chunk_mb * 1024 * 1024)
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            print(f"Error: Could not read '{path}': {e}")
+            sys.exit(1)
+    elapsed = time.perf_counter() - start_time
+    
+    summary = stats.summary(today, args.top, pose_chakras)
+    if args.json:
+        print(json.dumps(summary, indent=2, ensure_ascii=False))
+        return
+    
+    print_report(summary)
+    rows = summary['rows']
+    print(f"\nRead {rows['sessions']} session and {rows['poses']} pose rows from {len(paths)} file(s) "
+          f"in {elapsed:.2f}s ({(rows['sessions'] + rows['poses']) / max(elapsed, 1e-9):,.0f} rows/s), "
+          f"skipped {rows['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Round-trip tests for silhouette_vector.trace_contours
+
+Every traced mask is filled back with the even-odd rule (the rule the SVG
+uses) and must reproduce the mask pixel for pixel.
+
+Usage:
+python -m pytest test_silhouette_vector.py
+"""
+
+import numpy as np
+import pytest
+
+from silhouette_vector import polygon_area, trace_contours
+
+
+def fill_even_odd(loops, shape):
+    """
+    Rasterize closed pixel-edge loops with the even-odd rule.
+    
+    A ray from each pixel center towards +x crosses exactly the vertical
+    edges to the right of the pixel on its row, so the fill is the parity
+    of those crossings.
+    """
+    height, width = shape
+    crossings = np.zeros((height, width + 1), dtype=np.int64)
+    for loop in loops:
+        starts = loop.astype(np.int64)
+        ends = np.roll(starts, -1, axis=0)
+        steps = np.abs(ends - starts).sum(axis=1)
+        assert (steps == 1).all(), "loops must step along unit pixel edges"
+        for (x, y0), (_, y1) in zip(starts, ends):
+            if y0 != y1:
+                crossings[min(y0, y1), x] += 1
+    # Crossings at column x count for every pixel left of it
+    parity = np.cumsum(crossings[:, ::-1], axis=1)[:, ::-1] % 2
+    return parity[:, 1:].astype(bool)
+
+
+def assert_round_trip(mask):
+    mask = np.asarray(mask, dtype=bool)
+    loops = trace_contours(mask)
+    np.testing.assert_array_equal(fill_even_odd(loops, mask.shape), mask)
+    
+    # Outlines and holes run in opposite directions, so signed areas add up to the pixel count
+    assert abs(sum(polygon_area(loop) for loop in loops)) == mask.sum()
+    for loop in loops:
+        assert len({tuple(point) for point in loop}) == len(loop), "loops must not revisit a corner"
+
+
+def square(size, top, left, side):
+    mask = np.zeros((size, size), dtype=bool)
+    mask[top:top + side, left:left + side] = True
+    return mask
+
+
+CASES = {
+    'empty': np.zeros((4, 5), dtype=bool),
+    'full': np.ones((4, 5), dtype=bool),
+    'single pixel': square(3, 1, 1, 1),
+    'square': square(8, 2, 3, 4),
+    'square with hole': square(7, 1, 1, 5) & ~square(7, 3, 3, 1),
+    'diagonal pixels': [[1, 0], [0, 1]],
+    'anti-diagonal pixels': [[0, 1], [1, 0]],
+    'diagonal squares': square(8, 0, 0, 4) | square(8, 4, 4, 4),
+    'diagonal holes': square(6, 0, 0, 6) & ~square(6, 1, 1, 2) & ~square(6, 3, 3, 2),
+    'checkerboard': np.indices((6, 7)).sum(axis=0) % 2 == 0,
+    'ring of diagonal holes': [
+        [1, 1, 1, 1, 1],
+        [1, 0, 1, 0, 1],
+        [1, 1, 0, 1, 1],
+        [1, 0, 1, 0, 1],
+        [1, 1, 1, 1, 1],
+    ],
+}
+
+
+@pytest.mark.parametrize('name', list(CASES))
+def test_shapes_round_trip(name):
+    assert_round_trip(CASES[name])
+
+
+@pytest.mark.parametrize('density', [0.1, 0.3, 0.5, 0.7, 0.9])
+@pytest.mark.parametrize('seed', range(5))
+def test_random_masks_round_trip(density, seed):
+    rng = np.random.default_rng(seed)
+    assert_round_trip(rng.random((23, 31)) < density)